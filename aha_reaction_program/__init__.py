@@ -0,0 +1 @@
+"""aha-reaction-program 내부 모듈 모음 (main.py에서 사용)"""
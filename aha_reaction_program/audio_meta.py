@@ -0,0 +1,384 @@
+"""오디오 메타데이터(길이 등) 헤더 기반 측정 + 디스크 캐시"""
+
+import json
+import os
+import struct
+import threading
+import wave
+
+from aha_reaction_program import logs
+
+# 캐시 기본 위치 (실행 디렉토리 기준)
+DEFAULT_CACHE_DIR = '.aha_cache'
+METADATA_FILE = 'metadata.json'
+CACHE_VERSION = 1
+
+# MPEG 오디오 헤더 테이블 (kbps / Hz)
+_MP3_BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {
+    1: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    2.5: (11025, 12000, 8000),
+}
+
+
+def _parse_mp3_header(header):
+    """4바이트 MPEG 프레임 헤더 해석 (유효하지 않으면 None)"""
+    b0, b1, b2, b3 = header
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    version = {0: 2.5, 2: 2, 3: 1}.get((b1 >> 3) & 0x03)
+    layer = {1: 3, 2: 2, 3: 1}.get((b1 >> 1) & 0x03)
+    bitrate_index = (b2 >> 4) & 0x0F
+    rate_index = (b2 >> 2) & 0x03
+    if version is None or layer is None or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    table_version = 1 if version == 1 else 2
+    bitrate = _MP3_BITRATES[(table_version, layer)][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    if layer == 1:
+        samples_per_frame = 384
+    elif layer == 3 and version != 1:
+        samples_per_frame = 576
+    else:
+        samples_per_frame = 1152
+    return {
+        'version': version,
+        'layer': layer,
+        'bitrate': bitrate,
+        'sample_rate': sample_rate,
+        'samples_per_frame': samples_per_frame,
+        'mono': ((b3 >> 6) & 0x03) == 3,
+    }
+
+
+def probe_mp3(path):
+    """MP3 길이: Xing/Info/VBRI 헤더의 프레임 수, 없으면 CBR 비트레이트로 추정"""
+    file_size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        head = f.read(10)
+        audio_start = 0
+        # ID3v2 태그 건너뛰기 (syncsafe 정수)
+        if len(head) == 10 and head[:3] == b'ID3':
+            tag_size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+            audio_start = 10 + tag_size + (10 if head[5] & 0x10 else 0)
+        f.seek(audio_start)
+        data = f.read(65536)
+
+        # ID3v1 태그 (파일 끝 128바이트)
+        f.seek(max(0, file_size - 128))
+        tail_tag = 128 if f.read(3) == b'TAG' else 0
+
+    for offset in range(len(data) - 4):
+        if data[offset] != 0xFF:
+            continue
+        info = _parse_mp3_header(data[offset:offset + 4])
+        if info is None:
+            continue
+        frame = data[offset:offset + 192]
+
+        # Xing/Info (VBR) 헤더 위치는 사이드 정보 크기에 따라 다름
+        if info['version'] == 1:
+            side_info = 17 if info['mono'] else 32
+        else:
+            side_info = 9 if info['mono'] else 17
+        xing = frame[4 + side_info:4 + side_info + 12]
+        if xing[:4] in (b'Xing', b'Info') and len(xing) == 12:
+            flags = struct.unpack('>I', xing[4:8])[0]
+            if flags & 0x01:
+                frames = struct.unpack('>I', xing[8:12])[0]
+                return frames * info['samples_per_frame'] / info['sample_rate']
+        if frame[36:40] == b'VBRI' and len(frame) >= 54:
+            frames = struct.unpack('>I', frame[50:54])[0]
+            return frames * info['samples_per_frame'] / info['sample_rate']
+
+        audio_bytes = file_size - audio_start - offset - tail_tag
+        return audio_bytes * 8 / info['bitrate']
+    return None
+
+
+def probe_ogg(path):
+    """OGG(Vorbis/Opus) 길이: 첫 페이지의 샘플레이트 + 마지막 페이지의 granule position"""
+    file_size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        first = f.read(128)
+        if first[:4] != b'OggS':
+            return None
+        segments = first[26]
+        packet = first[27 + segments:]
+        pre_skip = 0
+        if packet[:7] == b'\x01vorbis':
+            sample_rate = struct.unpack('<I', packet[12:16])[0]
+        elif packet[:8] == b'OpusHead':
+            pre_skip = struct.unpack('<H', packet[10:12])[0]
+            sample_rate = 48000  # Opus granule은 항상 48kHz 기준
+        else:
+            return None
+
+        f.seek(max(0, file_size - 65536))
+        tail = f.read()
+    last_page = tail.rfind(b'OggS')
+    while last_page >= 0:
+        granule = struct.unpack('<q', tail[last_page + 6:last_page + 14])[0]
+        if granule > 0:
+            return max(0, granule - pre_skip) / sample_rate
+        last_page = tail.rfind(b'OggS', 0, last_page)
+    return None
+
+
+def probe_m4a(path):
+    """M4A/MP4 길이: moov/mvhd 아톰의 timescale, duration (mdat은 읽지 않고 건너뜀)"""
+    file_size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        def walk(start, end):
+            position = start
+            while position + 8 <= end:
+                f.seek(position)
+                header = f.read(8)
+                if len(header) < 8:
+                    return None
+                size, atom = struct.unpack('>I4s', header)
+                header_size = 8
+                if size == 1:
+                    size = struct.unpack('>Q', f.read(8))[0]
+                    header_size = 16
+                elif size == 0:
+                    size = end - position
+                if size < header_size:
+                    return None
+                if atom == b'moov':
+                    return walk(position + header_size, position + size)
+                if atom == b'mvhd':
+                    body = f.read(32)
+                    if body[0] == 1:
+                        timescale, duration = struct.unpack('>IQ', body[20:32])
+                    else:
+                        timescale, duration = struct.unpack('>II', body[12:20])
+                    return duration / timescale if timescale else None
+                position += size
+            return None
+
+        return walk(0, file_size)
+
+
+def probe_wav(path):
+    """WAV 길이: RIFF 청크에서 fmt 바이트레이트와 data 크기만 읽음"""
+    with open(path, 'rb') as f:
+        riff = f.read(12)
+        if riff[:4] != b'RIFF' or riff[8:12] != b'WAVE':
+            return None
+        byte_rate = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            chunk_id, chunk_size = struct.unpack('<4sI', header)
+            if chunk_id == b'fmt ':
+                fmt = f.read(chunk_size + (chunk_size & 1))
+                byte_rate = struct.unpack('<I', fmt[8:12])[0]
+                continue
+            if chunk_id == b'data':
+                return chunk_size / byte_rate if byte_rate else None
+            f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+
+_PROBES = {
+    '.wav': probe_wav,
+    '.mp3': probe_mp3,
+    '.ogg': probe_ogg,
+    '.m4a': probe_m4a,
+}
+
+
+def probe_duration(path):
+    """헤더만 읽어서 오디오 길이(초) 측정, 실패하면 None"""
+    probe = _PROBES.get(os.path.splitext(path)[1].lower())
+    if probe is None:
+        return None
+    try:
+        duration = probe(path)
+    except (OSError, struct.error, IndexError, ZeroDivisionError):
+        return None
+    if duration is None or duration <= 0:
+        return None
+    return duration
+
+
+_pydub_lock = threading.Lock()
+_audio_segment = None  # 지연 로드한 pydub.AudioSegment (False = 설치 안 됨)
+
+
+def load_pydub():
+    """pydub는 처음 필요할 때만 import (ffmpeg 탐색 때문에 느림), 없으면 None"""
+    global _audio_segment
+    with _pydub_lock:
+        if _audio_segment is None:
+            try:
+                from pydub import AudioSegment
+                _audio_segment = AudioSegment
+                logs.library.info(">> pydub 지원: 다양한 오디오 형식 길이 측정 가능")
+            except ImportError:
+                _audio_segment = False
+                logs.library.warning("-- pydub 없음: WAV 파일만 정확한 길이 측정 (기타 형식은 5초 추정)")
+    return _audio_segment or None
+
+
+def decode_duration(path):
+    """헤더로 길이를 알 수 없는 파일만 pydub로 전체 디코딩해서 측정"""
+    AudioSegment = load_pydub()
+    if AudioSegment is None:
+        return None  # 기본값(5초) 사용
+    try:
+        audio = AudioSegment.from_file(path)
+        return len(audio) / 1000.0  # milliseconds to seconds
+    except Exception as e:
+        logs.library.error("오디오 길이 측정 오류 (%s): %s", os.path.basename(path), e)
+        return None
+
+
+def decode_pcm(path, frame_rate=None, channels=None):
+    """파일을 16bit PCM으로 디코딩: (PCM 바이트, 채널 수, 샘플레이트)
+
+    오디오 장치 없이 동작하므로 분석/변환 워커 프로세스에서 사용.
+    형식 변환이 필요 없는 16bit WAV는 wave 모듈로 바로 읽고, 그 외에는 pydub(ffmpeg)로 디코딩.
+    frame_rate/channels를 주면 그 형식으로 변환.
+    """
+    if os.path.splitext(path)[1].lower() == '.wav':
+        try:
+            with wave.open(path, 'rb') as f:
+                if (f.getsampwidth() == 2 and frame_rate in (None, f.getframerate())
+                        and channels in (None, f.getnchannels())):
+                    return f.readframes(f.getnframes()), f.getnchannels(), f.getframerate()
+        except (wave.Error, EOFError):
+            pass  # 압축 WAV 등은 pydub로
+    AudioSegment = load_pydub()
+    if AudioSegment is None:
+        raise RuntimeError("pydub가 없어 WAV(16bit) 외 형식은 디코딩할 수 없습니다")
+    segment = AudioSegment.from_file(path).set_sample_width(2)
+    if frame_rate is not None:
+        segment = segment.set_frame_rate(frame_rate)
+    if channels is not None:
+        segment = segment.set_channels(channels)
+    return segment.raw_data, segment.channels, segment.frame_rate
+
+
+class MetadataCache:
+    """파일 경로 + mtime + 크기로 무효화되는 오디오 메타데이터 디스크 캐시 (JSON)"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, fallback=None, default_duration=5.0):
+        self.cache_path = os.path.join(cache_dir, METADATA_FILE)
+        self.fallback = fallback  # 헤더 측정 실패시 호출할 함수 (예: pydub 디코딩)
+        self.default_duration = default_duration
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """디스크에서 캐시 읽기 (버전이 다르거나 깨진 파일은 무시)"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get('version') == CACHE_VERSION:
+            self.entries = data.get('entries', {})
+
+    def save(self):
+        """변경 사항이 있을 때만 원자적으로 저장 (임시 파일 → rename)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {'version': CACHE_VERSION, 'entries': dict(self.entries)}
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            tmp_path = self.cache_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logs.library.error("메타데이터 캐시 저장 오류: %s", e)
+
+    def _entry(self, file_path):
+        """현재 mtime/크기와 일치하는 캐시 항목 반환 (불일치시 새 항목)"""
+        key = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        entry = self.entries.get(key)
+        if entry and entry.get('mtime_ns') == stat.st_mtime_ns and entry.get('size') == stat.st_size:
+            return key, entry, True
+        return key, {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}, False
+
+    def get(self, file_path, field):
+        """유효한 캐시 항목의 필드 값 (없으면 None)"""
+        try:
+            _, entry, valid = self._entry(file_path)
+        except OSError:
+            return None
+        return entry.get(field) if valid else None
+
+    def update(self, file_path, **fields):
+        """파일 항목에 필드 저장 (파일이 바뀌었으면 기존 필드는 버림)"""
+        try:
+            key, entry, _ = self._entry(file_path)
+        except OSError:
+            return
+        with self._lock:
+            entry = dict(entry)
+            entry.update(fields)
+            self.entries[key] = entry
+            self._dirty = True
+
+    def increment(self, file_path, field, amount=1):
+        """숫자 필드 증가 (재생 횟수 기록 등)"""
+        try:
+            key, entry, _ = self._entry(file_path)
+        except OSError:
+            return
+        with self._lock:
+            # 그 사이 다른 스레드가 늘린 값은 유지하되, 파일이 바뀌었으면 새 항목에서 시작 (update()와 같음)
+            stored = self.entries.get(key)
+            if stored and stored.get('mtime_ns') == entry['mtime_ns'] and stored.get('size') == entry['size']:
+                entry = stored
+            entry = dict(entry)
+            entry[field] = entry.get(field, 0) + amount
+            self.entries[key] = entry
+            self._dirty = True
+
+    def invalidate(self, file_path):
+        """파일 하나의 캐시 항목 제거"""
+        with self._lock:
+            if self.entries.pop(os.path.abspath(file_path), None) is not None:
+                self._dirty = True
+
+    def get_duration(self, file_path):
+        """오디오 길이(초): 캐시 → 헤더 측정 → fallback → 기본값 순서"""
+        duration = self.get(file_path, 'duration')
+        if duration is not None:
+            self.hits += 1
+            return duration
+        self.misses += 1
+
+        duration = probe_duration(file_path)
+        if duration is None and self.fallback is not None:
+            duration = self.fallback(file_path)
+        if duration is None:
+            return self.default_duration  # 측정 실패는 캐시하지 않음
+        self.update(file_path, duration=duration)
+        return duration
+
+    def index(self, file_paths):
+        """여러 파일의 길이를 한 번에 인덱싱하고 (적중, 새로 측정) 개수 반환"""
+        hits_before, misses_before = self.hits, self.misses
+        for file_path in file_paths:
+            self.get_duration(file_path)
+        return self.hits - hits_before, self.misses - misses_before
@@ -0,0 +1,267 @@
+"""오디오 백엔드: 실제 pygame 믹서 또는 장치 없이 재생 이벤트만 기록하는 null 백엔드
+
+두 백엔드 모두 pygame.mixer와 같은 모양의 인터페이스를 제공한다.
+    init(), get_init(), set_num_channels(n), set_reserved(n), Channel(index),
+    load_sound(path), sound_from_buffer(buffer), music.{load, play, pause, unpause, stop,
+    get_pos, get_busy, set_volume}
+"""
+
+import time
+
+from aha_reaction_program.audio_meta import probe_duration
+
+# 믹서 기본 출력 형식 (pygame.mixer.init() 기본값과 같음)
+DEFAULT_FREQUENCY = 44100
+DEFAULT_SIZE = -16
+DEFAULT_CHANNELS = 2
+
+
+class PygameBackend:
+    """pygame.mixer를 그대로 사용 (pygame은 init()에서 import)"""
+
+    name = 'pygame'
+
+    def __init__(self):
+        self.mixer = None
+        self.music = None
+
+    def init(self):
+        import pygame
+        pygame.mixer.init()
+        self.mixer = pygame.mixer
+        self.music = pygame.mixer.music
+
+    def get_init(self):
+        return self.mixer.get_init()
+
+    def set_num_channels(self, count):
+        self.mixer.set_num_channels(count)
+
+    def set_reserved(self, count):
+        self.mixer.set_reserved(count)
+
+    def Channel(self, index):
+        return self.mixer.Channel(index)
+
+    def load_sound(self, file_path):
+        from aha_reaction_program.sound_pool import load_sound
+        return load_sound(file_path)
+
+    def sound_from_buffer(self, buffer):
+        return self.mixer.Sound(buffer=buffer)
+
+
+class NullSound(bytearray):
+    """PCM 크기만큼의 무음 바이트를 가진 가짜 Sound (memoryview 슬라이스 가능)"""
+
+    def __init__(self, data, bytes_per_second):
+        super().__init__(data)
+        self.bytes_per_second = bytes_per_second
+        self.volume = 1.0
+
+    def set_volume(self, volume):
+        self.volume = volume
+
+    def get_volume(self):
+        return self.volume
+
+    def get_length(self):
+        return len(self) / self.bytes_per_second
+
+
+class NullChannel:
+    """재생 시작/정지를 백엔드 이벤트로 기록, 재생 중 여부는 Sound 길이로 계산"""
+
+    def __init__(self, backend, index):
+        self.backend = backend
+        self.index = index
+        self.sound = None
+        self.queued = None  # queue()로 이어 붙인 다음 Sound (이벤트는 기록하지 않음)
+        self.ends_ns = 0
+
+    def play(self, sound, loops=0, maxtime=0, fade_ms=0):
+        if self.get_busy():
+            self.backend.record('stop', self.index)
+        self.sound = sound
+        self.queued = None
+        duration = sound.get_length() * (loops + 1) if loops >= 0 else float('inf')
+        if maxtime > 0:
+            duration = min(duration, maxtime / 1000.0)
+        self.ends_ns = time.perf_counter_ns() + duration * 1e9  # loops=-1이면 무한
+        self.backend.record('play', self.index, duration)
+
+    def queue(self, sound):
+        """재생 중이면 끝난 직후 이어서 재생, 비어 있으면 바로 재생 (스트리밍 블록용)"""
+        if self.get_busy():
+            self.queued = sound
+        else:
+            self.sound = sound
+            self.ends_ns = time.perf_counter_ns() + sound.get_length() * 1e9
+
+    def _advance(self):
+        """재생이 끝났으면 대기 중인 Sound로 넘어감"""
+        now = time.perf_counter_ns()
+        if self.queued is not None and now >= self.ends_ns:
+            self.sound, self.queued = self.queued, None
+            self.ends_ns += self.sound.get_length() * 1e9  # 앞 Sound가 끝난 시각부터 이어서
+
+    def stop(self):
+        if self.get_busy():
+            self.backend.record('stop', self.index)
+        self.sound = None
+        self.queued = None
+
+    def get_busy(self):
+        self._advance()
+        return self.sound is not None and time.perf_counter_ns() < self.ends_ns
+
+    def get_sound(self):
+        return self.sound if self.get_busy() else None
+
+    def get_queue(self):
+        self._advance()
+        return self.queued
+
+
+class NullMusic:
+    """pygame.mixer.music 흉내 (곡 길이는 헤더로 측정, 모르면 기본값)"""
+
+    def __init__(self, backend, default_duration=5.0):
+        self.backend = backend
+        self.default_duration = default_duration
+        self.path = None
+        self.duration = 0.0
+        self.volume = 1.0
+        self._started_ns = None  # 재생 시작 시각 (일시정지한 시간만큼 뒤로 밀림)
+        self._paused_ns = None
+        self._queued = None  # (경로, 길이) - 현재 곡이 끝나면 이어서 재생
+
+    def load(self, path):
+        self.stop()
+        self.path = path
+        self.duration = probe_duration(path) or self.default_duration
+        self.backend.record('music_load', path, self.duration)
+
+    def queue(self, path, namehint='', loops=0):
+        """현재 곡이 끝나면 바로 이어서 재생할 곡 (하나만, 다시 부르면 교체)"""
+        self._queued = (path, probe_duration(path) or self.default_duration)
+        self.backend.record('music_queue', path)
+
+    def _advance(self):
+        """현재 곡이 끝났으면 대기 중인 곡으로 넘어감 (재생 위치는 새 곡 기준)"""
+        if self._queued is None or self._started_ns is None or self._paused_ns is not None:
+            return
+        ended_ns = self._started_ns + int(self.duration * 1e9)
+        if time.perf_counter_ns() >= ended_ns:
+            (self.path, self.duration), self._queued = self._queued, None
+            self._started_ns = ended_ns
+            self.backend.record('music_play', self.path)
+
+    def play(self, loops=0, start=0.0, fade_ms=0):
+        self._started_ns = time.perf_counter_ns() - int(start * 1e9)
+        self._paused_ns = None
+        self.backend.record('music_play', self.path)
+
+    def pause(self):
+        if self._started_ns is not None and self._paused_ns is None:
+            self._paused_ns = time.perf_counter_ns()
+            self.backend.record('music_pause', self.path)
+
+    def unpause(self):
+        if self._paused_ns is not None:
+            self._started_ns += time.perf_counter_ns() - self._paused_ns
+            self._paused_ns = None
+            self.backend.record('music_unpause', self.path)
+
+    def stop(self):
+        if self._started_ns is not None:
+            self.backend.record('music_stop', self.path)
+        self._started_ns = None
+        self._paused_ns = None
+        self._queued = None
+
+    def get_pos(self):
+        """재생 위치 (ms, 일시정지 시간 제외), 재생 중이 아니면 -1"""
+        self._advance()
+        if self._started_ns is None:
+            return -1
+        now = self._paused_ns if self._paused_ns is not None else time.perf_counter_ns()
+        return int((now - self._started_ns) / 1e6)
+
+    def get_busy(self):
+        if self._started_ns is None or self._paused_ns is not None:
+            return False
+        return self.get_pos() < self.duration * 1000
+
+    def set_volume(self, volume):
+        self.volume = volume
+
+    def get_volume(self):
+        return self.volume
+
+
+class NullBackend:
+    """오디오 장치 없이 동작, 모든 재생 시작/정지를 (perf_counter_ns, 이벤트, 대상, 값)으로 기록
+
+    키 입력 타임스탬프(KeyPipeline)와 같은 시계를 쓰므로 이벤트 시각에서 바로 지연 시간을 계산할 수 있음.
+    """
+
+    name = 'null'
+
+    def __init__(self, frequency=DEFAULT_FREQUENCY, size=DEFAULT_SIZE, channels=DEFAULT_CHANNELS):
+        self.format = (frequency, size, channels)
+        self.num_channels = 8
+        self.reserved = 0
+        self.events = []  # list.append는 원자적이라 여러 스레드에서 기록해도 안전
+        self._channels = {}
+        self.music = NullMusic(self)
+
+    def init(self):
+        pass
+
+    def record(self, event, target=None, value=None):
+        self.events.append((time.perf_counter_ns(), event, target, value))
+
+    def get_init(self):
+        return self.format
+
+    def set_num_channels(self, count):
+        self.num_channels = count
+
+    def set_reserved(self, count):
+        self.reserved = count
+
+    def Channel(self, index):
+        channel = self._channels.get(index)
+        if channel is None:
+            channel = self._channels[index] = NullChannel(self, index)
+        return channel
+
+    def _bytes_per_second(self):
+        frequency, size, channels = self.format
+        return frequency * channels * (abs(size) // 8)
+
+    def load_sound(self, file_path):
+        """디코딩 없이 헤더로 잰 길이만큼의 무음 PCM (길이를 모르면 1초)"""
+        duration = probe_duration(file_path) or 1.0
+        bytes_per_second = self._bytes_per_second()
+        frame_bytes = bytes_per_second // self.format[0]
+        nbytes = int(duration * self.format[0]) * frame_bytes
+        return NullSound(nbytes, bytes_per_second)
+
+    def sound_from_buffer(self, buffer):
+        return NullSound(buffer, self._bytes_per_second())
+
+
+AUDIO_BACKENDS = {
+    PygameBackend.name: PygameBackend,
+    NullBackend.name: NullBackend,
+}
+
+
+def make_audio_backend(name):
+    """이름으로 오디오 백엔드 생성 ('pygame' 또는 'null')"""
+    backend_class = AUDIO_BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(f"지원하지 않는 오디오 백엔드: {name} (가능: {', '.join(AUDIO_BACKENDS)})")
+    return backend_class()
@@ -0,0 +1,113 @@
+"""믹서 채널 할당 + 보이스 스틸링 정책"""
+
+import time
+from collections import Counter
+
+# 빈 채널이 없을 때 빼앗을 채널을 고르는 정책
+#   oldest  : 가장 오래 재생 중인 채널
+#   priority: 우선순위가 가장 낮은 폴더의 채널 (같으면 오래된 것), 요청 폴더보다 높으면 빼앗지 않음
+STEAL_OLDEST = 'oldest'
+STEAL_PRIORITY = 'priority'
+STEAL_POLICIES = (STEAL_OLDEST, STEAL_PRIORITY)
+
+
+class ChannelManager:
+    """폴더별 예약 채널 + 공유 채널을 관리하고 폴더 단위로 정지"""
+
+    def __init__(self, backend, num_channels=16, reserved=None, policy=STEAL_OLDEST, priorities=None, default_priority=1):
+        if policy not in STEAL_POLICIES:
+            raise ValueError(f"지원하지 않는 채널 정책: {policy} (가능: {', '.join(STEAL_POLICIES)})")
+        self.policy = policy
+        self.priorities = dict(priorities or {})
+        self.default_priority = default_priority
+
+        reserved = dict(reserved or {})
+        total_reserved = sum(reserved.values())
+        if total_reserved >= num_channels:
+            raise ValueError(f"예약 채널({total_reserved}개)이 전체 채널({num_channels}개)보다 많습니다")
+        backend.set_num_channels(num_channels)
+        # 앞쪽 채널은 예약해서 Sound.play()의 자동 할당이 건드리지 못하게 함
+        backend.set_reserved(total_reserved)
+
+        self.channels = [backend.Channel(i) for i in range(num_channels)]
+        self.reserved = {}  # {folder_key: [channel_index, ...]}
+        index = 0
+        for folder_key, count in reserved.items():
+            self.reserved[folder_key] = list(range(index, index + count))
+            index += count
+        self.shared = list(range(index, num_channels))
+
+        self._owners = {}  # {channel_index: (folder_key, sound, started_at)}
+        self.plays = Counter()
+        self.dropped = Counter()  # 채널을 못 구해서 재생하지 못한 횟수 (폴더별)
+        self.stolen = Counter()  # 다른 폴더에게 채널을 빼앗긴 횟수 (폴더별)
+
+    def priority(self, folder_key):
+        return self.priorities.get(folder_key, self.default_priority)
+
+    def _is_free(self, index):
+        owner = self._owners.get(index)
+        if owner is None:
+            return True
+        # 재생이 끝났거나 다른 Sound로 바뀐 채널은 비어 있는 것으로 봄
+        channel = self.channels[index]
+        return not channel.get_busy() or channel.get_sound() is not owner[1]
+
+    def _acquire(self, folder_key):
+        """빈 채널 → 빼앗을 채널 순서로 채널 번호 선택 (없으면 None)"""
+        candidates = self.reserved.get(folder_key, []) + self.shared
+        for index in candidates:
+            if self._is_free(index):
+                return index
+
+        requester_priority = self.priority(folder_key)
+        victims = []
+        for index in candidates:
+            owner_key, _, started_at = self._owners[index]
+            owner_priority = self.priority(owner_key)
+            if self.policy == STEAL_PRIORITY:
+                if owner_priority > requester_priority:
+                    continue
+                victims.append(((owner_priority, started_at), index))
+            else:
+                victims.append(((started_at,), index))
+        if not victims:
+            return None
+        _, index = min(victims)
+        self.stolen[self._owners[index][0]] += 1
+        return index
+
+    def play(self, folder_key, sound, **kwargs):
+        """폴더 몫의 채널에서 재생 (채널이 없으면 None 반환, 드롭 카운트 증가)"""
+        index = self._acquire(folder_key)
+        if index is None:
+            self.dropped[folder_key] += 1
+            return None
+        channel = self.channels[index]
+        channel.play(sound, **kwargs)
+        self._owners[index] = (folder_key, sound, time.monotonic())
+        self.plays[folder_key] += 1
+        return channel
+
+    def stop_folder(self, folder_key):
+        """해당 폴더가 재생 중인 채널만 정지 (다른 폴더 소리는 유지)"""
+        for index, (owner_key, _, _) in list(self._owners.items()):
+            if owner_key == folder_key:
+                if not self._is_free(index):
+                    self.channels[index].stop()
+                del self._owners[index]
+
+    def stop_all(self):
+        for index in list(self._owners):
+            self.channels[index].stop()
+        self._owners.clear()
+
+    def stats(self):
+        """재생/드롭/스틸 카운터"""
+        return {
+            'channels': len(self.channels),
+            'busy': sum(1 for index in self._owners if not self._is_free(index)),
+            'plays': dict(self.plays),
+            'dropped': dict(self.dropped),
+            'stolen': dict(self.stolen),
+        }
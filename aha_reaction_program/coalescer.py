@@ -0,0 +1,92 @@
+"""빠른 타이핑에서 연달아 매칭되는 패턴 트리거를 하나로 합치고 속도 제한
+
+ㅋㅋ/kk/zz처럼 짧은 패턴은 빠르게 치면 거의 매 키마다 매칭되어, 연장 최소 간격(0.5초) 안에 들어온
+트리거마다 반응을 멈췄다 다시 시작하게 된다. TriggerCoalescer는 키 입력 처리 스레드에서 스케줄러로 넘기기 전에
+    1. 같은 폴더의 직전 트리거로부터 debounce초 안에 온 트리거는 진행 중인 반응에 합치고 (버림)
+    2. 폴더별 토큰 버킷(rate/burst)과 전체 토큰 버킷(global_rate/global_burst)으로 시작/연장 횟수를 제한한다.
+버려진 트리거는 스케줄러에 작업을 만들지 않으므로 빠르게 계속 쳐도 CPU 사용량이 일정하다.
+"""
+
+import threading
+from collections import Counter
+
+# offer 결과 (decide 반환값)
+ACCEPTED = 'accepted'
+COALESCED = 'coalesced'
+LIMITED = 'limited'
+
+
+class TokenBucket:
+    """초당 rate개씩 최대 capacity개까지 차는 토큰 버킷 (rate가 0이면 제한 없음)"""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate, capacity, now=0.0):
+        self.rate = rate
+        self.capacity = max(1.0, float(capacity))
+        self.tokens = self.capacity
+        self.updated = now
+
+    def refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def available(self, now):
+        if self.rate <= 0:
+            return True
+        self.refill(now)
+        return self.tokens >= 1.0
+
+    def take(self, now):
+        """토큰 하나 사용 (없으면 False)"""
+        if not self.available(now):
+            return False
+        if self.rate > 0:
+            self.tokens -= 1.0
+        return True
+
+
+class TriggerCoalescer:
+    """폴더별 debounce + 토큰 버킷 (키 입력 처리 스레드와 데몬 연결 스레드에서 호출, 판단은 락 안에서)"""
+
+    def __init__(self, debounce=0.5, rate=1.0, burst=3, global_rate=3.0, global_burst=6):
+        self._lock = threading.Lock()
+        self._last_accepted = {}  # {folder_key: 마지막으로 통과한 트리거 시각 (초)}
+        self.accepted = Counter()
+        self.coalesced = Counter()  # debounce 안에 와서 합쳐진 트리거 (폴더별)
+        self.limited = Counter()  # 토큰이 없어 버린 트리거 (폴더별)
+        self.configure(debounce, rate, burst, global_rate, global_burst)
+
+    def configure(self, debounce=0.5, rate=1.0, burst=3, global_rate=3.0, global_burst=6):
+        """설정 변경 (버킷은 가득 찬 상태로 새로 시작, 카운터는 유지)"""
+        with self._lock:
+            self.debounce = debounce
+            self.rate = rate
+            self.burst = burst
+            self.global_bucket = TokenBucket(global_rate, global_burst)
+            self._buckets = {}  # {folder_key: TokenBucket}
+
+    def offer(self, folder_key, now):
+        """트리거를 스케줄러로 보낼지 결정 (now: 단조 시계 초)"""
+        return self.decide(folder_key, now) == ACCEPTED
+
+    def decide(self, folder_key, now):
+        """offer와 같지만 결과를 ACCEPTED / COALESCED / LIMITED로 반환"""
+        with self._lock:
+            last = self._last_accepted.get(folder_key)
+            if last is not None and now - last < self.debounce:
+                self.coalesced[folder_key] += 1
+                return COALESCED
+            bucket = self._buckets.get(folder_key)
+            if bucket is None:
+                bucket = self._buckets[folder_key] = TokenBucket(self.rate, self.burst, now)
+            # 두 버킷 모두 토큰이 있을 때만 사용 (한쪽만 줄어들지 않도록)
+            if not (bucket.available(now) and self.global_bucket.available(now)):
+                self.limited[folder_key] += 1
+                return LIMITED
+            bucket.take(now)
+            self.global_bucket.take(now)
+            self._last_accepted[folder_key] = now
+            self.accepted[folder_key] += 1
+            return ACCEPTED
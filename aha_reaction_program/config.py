@@ -0,0 +1,314 @@
+"""TOML 설정 파일 로드 (폴더/패턴/볼륨/타이머 등) - 파일에 없는 값은 기본값 사용"""
+
+import copy
+import os
+import tomllib
+
+from aha_reaction_program import logs
+from aha_reaction_program.backends import AUDIO_BACKENDS
+from aha_reaction_program.channels import STEAL_POLICIES
+from aha_reaction_program.inputs import INPUT_SOURCES
+from aha_reaction_program.matcher import POLICIES as MATCH_POLICIES
+
+DEFAULT_CONFIG_PATH = 'aha.toml'
+MIXER_ENGINES = ('channels', 'numpy')
+
+
+class ConfigError(ValueError):
+    """설정 파일 형식/값 오류"""
+
+
+# 기본 설정 (aha.toml이 없거나 값이 빠졌을 때 사용)
+DEFAULT_CONFIG = {
+    'log': {
+        'level': 'INFO',  # 'DEBUG'면 키 입력/구간 재생까지 모두 출력
+        'categories': None,  # 예: {keys = 'DEBUG'} 또는 ['playback', 'timer'] (목록에 없으면 끔)
+        'quiet': False,  # True면 경고/오류만 출력
+    },
+    'reaction': {
+        'base_duration': 5.0,  # 반응 기본 재생 시간 (초)
+        'min_extend_interval': 0.5,  # 이보다 빨리 같은 폴더 반응이 오면 연장 대신 새로 시작
+    },
+    'triggers': {
+        'debounce': 0.5,  # 같은 폴더 패턴이 이 시간(초) 안에 다시 매칭되면 진행 중인 반응에 합침 (0이면 끔)
+        'rate': 1.0,  # 폴더별 초당 반응 시작/연장 횟수 (토큰 버킷, 0이면 제한 없음)
+        'burst': 3,  # 폴더별로 한꺼번에 허용하는 횟수
+        'global_rate': 3.0,  # 모든 폴더를 합친 초당 반응 시작/연장 횟수 (0이면 제한 없음)
+        'global_burst': 6,
+    },
+    'matcher': {
+        'policy': 'priority',  # 'priority' (폴더 순서) 또는 'longest' (긴 패턴 우선)
+    },
+    'work': {
+        'reminder_interval': 180,  # 타이핑이 없으면 알림까지 (초)
+        'repeat_interval': 60,  # 첫 알림 후 반복 간격 (초)
+        'adaptive': False,  # True면 평소 쉬는 시간(평균 + 3σ)이 지나면 알림 (reminder_interval이 최대, min_interval이 최소)
+        'min_interval': 30,  # 적응형 알림 최소 대기 시간 (초)
+    },
+    'dynamics': {
+        'window': 60.0,  # 타자 속도(분당 키) 측정 구간 (초)
+        'burst_window': 2.0,  # 순간 속도(초당 키) 측정 구간 (초)
+        'pause': 2.0,  # 이 시간(초) 이상 멈추면 쉬는 시간으로 기록 (적응형 일 재촉용)
+        'rules': {},  # {폴더 = {rate = 분당 키, burst = 초당 키, cooldown = 초}} 속도가 임계값을 넘으면 그 폴더 반응
+    },
+    'ambient': {
+        'volume': 0.1,
+    },
+    'selection': {
+        'recent': 3,  # 최근 재생한 파일 N개는 다시 고르지 않음 (폴더 파일 수 - 1까지)
+        'history': 0.0,  # 0보다 크면 적게 재생된 파일을 더 자주 고름 (가중치 × (1 + 재생 횟수)^-history)
+    },
+    'sound_cache': {
+        'budget_mb': 256,  # 디코딩된 사운드 최대 메모리 사용량
+        'warm': True,  # 시작할 때 자주 쓰는 폴더 미리 로드
+    },
+    'channels': {
+        'num_channels': 16,  # 전체 믹서 채널 수 (pygame 기본값 8)
+        'reserved': {'work': 1},  # 폴더 전용 채널 수
+        'policy': 'oldest',  # 'oldest' 또는 'priority'
+        'priorities': {'work': 2},  # 폴더 우선순위 (기본 1, 높을수록 안 뺏김)
+    },
+    'mixer': {
+        'engine': 'channels',  # 'channels' (채널마다 재생) 또는 'numpy' (블록 믹싱 + 배경음악 ducking, numpy 필요)
+        'block_ms': 10,  # numpy 엔진 출력 블록 길이 (짧을수록 지연이 작고 CPU 사용이 늘어남)
+        'duck_gain': 0.3,  # 반응 재생 중 배경음악 볼륨 배율
+        'duck_ramp_ms': 150,  # 배경음악 볼륨을 내리고 올리는 시간
+        'duck_hold_ms': 300,  # 반응이 끝난 뒤 배경음악을 다시 올리기까지 기다리는 시간
+        'max_voices': 32,  # 동시에 섞을 최대 구간 수 (넘으면 가장 오래된 것부터)
+    },
+    'loudness': {
+        'normalize': False,  # True면 파일별 음량(RMS)을 target_db에 맞춰 재생 (numpy 필요, 분석은 백그라운드 프로세스에서 한 번만)
+        'target_db': -20.0,  # 목표 RMS 음량 (dBFS)
+        'max_gain_db': 12.0,  # 파일별로 올리거나 내리는 최대 게인 (dB)
+        'workers': 0,  # 분석 프로세스 수 (0이면 CPU 코어 수)
+    },
+    'transcode': {
+        'enabled': False,  # True면 반응 사운드를 믹서 형식 PCM으로 미리 변환해 두고 mmap으로 불러오기 (변환은 백그라운드 프로세스)
+        'dir': '.aha_cache/pcm',  # 변환된 PCM 저장 위치
+        'workers': 0,  # 변환 프로세스 수 (0이면 CPU 코어 수)
+    },
+    'soundbank': {
+        'enabled': False,  # True면 폴더별 사운드 뱅크(python -m aha_reaction_program.soundbank로 생성)를 mmap으로 열어 재생
+        'dir': '.aha_cache/banks',  # 사운드 뱅크 위치
+    },
+    'montage': {
+        'enabled': False,  # True면 폴더마다 반응 몽타주(여러 구간을 이어 붙인 기본 재생 시간 길이의 소리)를 미리 만들어 두고 한 번에 재생 (numpy 필요)
+        'pool_size': 2,  # 폴더마다 미리 만들어 둘 몽타주 수
+        'crossfade_ms': 30,  # 구간 사이 크로스페이드 길이
+    },
+    'library': {
+        'watch': True,  # 실행 중 폴더 변경 반영
+        'poll_interval': 2.0,  # inotify를 못 쓸 때 폴링 간격 (초)
+    },
+    'audio': {
+        'backend': 'pygame',  # 'pygame' 또는 'null' (오디오 장치 없이 재생 이벤트만 기록)
+    },
+    'input': {
+        'source': 'keyboard',  # 'keyboard' (pynput), 'trace' (기록된 키 입력 재생) 또는 'none' (데몬 클라이언트 입력만)
+        'trace': '',  # source = 'trace'일 때 재생할 파일
+        'speed': 1.0,  # trace 재생 속도 배율 (0이면 기다리지 않고 최대 속도)
+        'record': '',  # 경로를 지정하면 실제 키 입력을 trace 파일로 기록
+    },
+    'stats': {
+        'http': False,  # True면 http://127.0.0.1:<port>/stats (JSON), /metrics (Prometheus)
+        'port': 9464,
+        'dump_path': '.aha_cache/stats.json',  # F3 키로 통계를 저장할 파일
+    },
+    'journal': {
+        'enabled': False,  # True면 패턴 매칭/반응 시작·연장·중지/재생 파일/일 재촉을 줄 단위 JSON으로 기록
+        'path': '.aha_cache/events.jsonl',  # 저널 파일 (python -m aha_reaction_program.journal stats로 패턴별 통계)
+        'max_mb': 8,  # 파일이 이보다 커지면 .1, .2 ...로 밀어내고 새 파일에 씀
+        'backups': 3,  # 남겨 둘 이전 파일 수
+        'flush_interval': 1.0,  # 모아서 쓰는 간격 (초)
+    },
+    'daemon': {
+        'enabled': False,  # True면 유닉스 소켓으로 여러 클라이언트의 키/반응 이벤트를 받음 (python -m aha_reaction_program.daemon)
+        'socket': '.aha_cache/aha.sock',  # 소켓 경로
+    },
+    'startup': {
+        'fast': False,  # True면 키보드 리스너를 먼저 켜고 폴더 스캔/길이 측정은 백그라운드에서
+    },
+    'config': {
+        'watch': True,  # 설정 파일이 바뀌면 자동으로 다시 불러오기
+        'check_interval': 1.0,  # 설정 파일 변경 확인 간격 (초)
+    },
+    # 폴더 순서 = 패턴 매칭 우선순위
+    'folders': {
+        'aha': {'patterns': ['dkgk', 'akwsp', 'akwdk', 'aha'], 'volume': 0.5, 'emoji': '>>'},  # 아하, 맞네, 맞아
+        'crazy': {'patterns': ['alcls', 'crazy'], 'volume': 0.5, 'emoji': '!!'},  # 미친
+        'wow': {'patterns': ['dhk', 'dndhk', 'dh', 'eoqkr', 'gjf', 'wow'], 'volume': 0.5, 'emoji': '😮'},  # 와, 우와, 오, 대박, 헐
+        'yeah': {'patterns': ['dP~', 'dhdP', 'dPtm', 'dptm', 'yes', 'whgdk', 'yeah', 'yes'], 'volume': 0.5, 'emoji': '🎉'},  # 예~, 오예, 예스, 에스, 좋아
+        'no': {'patterns': ['dksl', 'dkseho', 'dpdl', 'no', 'never'], 'volume': 0.5, 'emoji': '❌'},  # 아니, 안돼, 에이
+        'hmm': {'patterns': ['dma', 'gma', 'dj...', 'dj..', 'umm', 'hmm'], 'volume': 0.5, 'emoji': '🤔'},  # 음, 흠, 어...
+        'lol': {'patterns': ['ㅋㅋㅋ', 'ㅋㅋ', 'zzz', 'zz', 'kkk', 'kk', 'lol', 'gkgk', 'glgl', 'gpgp', 'dntru', 'dntrlek'],
+                'volume': 0.5, 'emoji': '😂'},  # 하하, 히히, 헤헤, 웃겨, 웃기다
+        'confused': {'patterns': ['antmsakfdldi', 'dlgodksrk', 'ahfmrpTek', 'ahfmrpTdj', 'anjfRk', 'anjdi', 'anjrk', 'gjr', 'what'],
+                     'volume': 0.5, 'emoji': '❓'},  # 무슨말이야, 이해안가, 모르겠다, 모르겠어, 뭘까, 뭐야, 뭐가, 헉
+        'but': {'patterns': ['rmsep', 'rmfjgwlaks', 'rmfjsk', 'but', 'well', 'anyway', 'btw'], 'volume': 0.5, 'emoji': '↔️'},  # 근데, 그렇지만, 그러나
+        'work': {'patterns': [], 'volume': 0.9, 'emoji': '⏰'},  # 타이머 전용, 패턴 없음 / 일 재촉은 좀 크게
+    },
+}
+
+# 폴더 항목 기본값 (weights: {파일 이름 glob: 가중치 배율}, 예: {"*_best.wav" = 3.0, "noisy.mp3" = 0})
+DEFAULT_FOLDER = {'patterns': [], 'volume': 0.5, 'emoji': '🎵', 'weights': {}}
+
+
+def _merge(base, override, path=''):
+    """override 값을 base 위에 덮어쓴 새 dict (folders 테이블은 통째로 교체)"""
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        name = f'{path}.{key}' if path else key
+        if name == 'folders':
+            merged[key] = copy.deepcopy(value)
+        elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value, name)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _check(condition, message):
+    if not condition:
+        raise ConfigError(message)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate(config):
+    """값 범위/타입 확인 후 폴더 항목 기본값 채우기"""
+    _check(isinstance(config.get('folders'), dict) and config['folders'], "[folders]에 폴더가 하나 이상 있어야 합니다")
+    for folder_key, folder in config['folders'].items():
+        _check(isinstance(folder, dict), f"[folders.{folder_key}]는 테이블이어야 합니다")
+        for key, value in DEFAULT_FOLDER.items():
+            folder.setdefault(key, copy.deepcopy(value))
+        folder.setdefault('folder', f'{folder_key}/')
+        _check(isinstance(folder['patterns'], list) and all(isinstance(p, str) and p for p in folder['patterns']),
+               f"folders.{folder_key}.patterns는 빈 문자열이 아닌 문자열 목록이어야 합니다")
+        _check(_is_number(folder['volume']) and 0.0 <= folder['volume'] <= 1.0,
+               f"folders.{folder_key}.volume은 0.0 ~ 1.0 사이여야 합니다")
+        _check(isinstance(folder['folder'], str) and folder['folder'], f"folders.{folder_key}.folder는 경로 문자열이어야 합니다")
+        _check(isinstance(folder['weights'], dict) and all(_is_number(w) and w >= 0 for w in folder['weights'].values()),
+               f"folders.{folder_key}.weights는 {{파일 이름 패턴 = 0 이상의 숫자}} 테이블이어야 합니다")
+
+    for key, parse in (('level', logs.parse_level), ('categories', logs.parse_categories)):
+        try:
+            parse(config['log'][key])
+        except (TypeError, ValueError) as e:
+            raise ConfigError(f"log.{key}: {e}") from e
+    _check(_is_number(config['ambient']['volume']) and 0.0 <= config['ambient']['volume'] <= 1.0,
+           "ambient.volume은 0.0 ~ 1.0 사이여야 합니다")
+    for section, key in (('reaction', 'base_duration'), ('reaction', 'min_extend_interval'),
+                         ('work', 'reminder_interval'), ('work', 'repeat_interval'), ('work', 'min_interval'),
+                         ('sound_cache', 'budget_mb'), ('library', 'poll_interval'), ('config', 'check_interval'),
+                         ('input', 'speed'), ('selection', 'history'), ('mixer', 'block_ms'), ('mixer', 'duck_ramp_ms'),
+                         ('mixer', 'duck_hold_ms'), ('loudness', 'max_gain_db'),
+                         ('loudness', 'workers'), ('transcode', 'workers'), ('montage', 'crossfade_ms'),
+                         ('journal', 'max_mb'), ('journal', 'flush_interval')):
+        value = config[section][key]
+        _check(_is_number(value) and value >= 0, f"{section}.{key}는 0 이상의 숫자여야 합니다")
+    for key in ('debounce', 'rate', 'global_rate'):
+        value = config['triggers'][key]
+        _check(_is_number(value) and value >= 0, f"triggers.{key}는 0 이상의 숫자여야 합니다")
+    for key in ('burst', 'global_burst'):
+        value = config['triggers'][key]
+        _check(_is_number(value) and value >= 1, f"triggers.{key}는 1 이상의 숫자여야 합니다")
+    channels = config['channels']
+    _check(isinstance(channels['num_channels'], int) and channels['num_channels'] >= 1,
+           "channels.num_channels는 1 이상의 정수여야 합니다")
+    _check(isinstance(channels['reserved'], dict) and
+           all(isinstance(count, int) and count >= 0 for count in channels['reserved'].values()),
+           "channels.reserved는 {폴더 = 0 이상의 정수} 테이블이어야 합니다")
+    _check(sum(channels['reserved'].values()) < channels['num_channels'],
+           "channels.reserved 합계는 channels.num_channels보다 작아야 합니다")
+    _check(channels['policy'] in STEAL_POLICIES, f"channels.policy는 {', '.join(STEAL_POLICIES)} 중 하나여야 합니다")
+    _check(isinstance(channels['priorities'], dict) and all(_is_number(p) for p in channels['priorities'].values()),
+           "channels.priorities는 {폴더 = 숫자} 테이블이어야 합니다")
+    _check(config['matcher']['policy'] in MATCH_POLICIES,
+           f"matcher.policy는 {', '.join(MATCH_POLICIES)} 중 하나여야 합니다")
+    _check(config['audio']['backend'] in AUDIO_BACKENDS,
+           f"audio.backend는 {', '.join(AUDIO_BACKENDS)} 중 하나여야 합니다")
+    _check(config['input']['source'] in INPUT_SOURCES, f"input.source는 {', '.join(INPUT_SOURCES)} 중 하나여야 합니다")
+    _check(config['input']['source'] != 'trace' or config['input']['trace'],
+           "input.source = 'trace'이면 input.trace에 파일 경로가 필요합니다")
+    _check(isinstance(config['stats']['port'], int) and 0 <= config['stats']['port'] <= 65535,
+           "stats.port는 0 ~ 65535 사이의 정수여야 합니다")
+    _check(config['mixer']['engine'] in MIXER_ENGINES,
+           f"mixer.engine은 {', '.join(MIXER_ENGINES)} 중 하나여야 합니다")
+    _check(isinstance(config['mixer']['max_voices'], int) and config['mixer']['max_voices'] >= 1,
+           "mixer.max_voices는 1 이상의 정수여야 합니다")
+    _check(_is_number(config['mixer']['duck_gain']) and 0.0 <= config['mixer']['duck_gain'] <= 1.0,
+           "mixer.duck_gain은 0.0 ~ 1.0 사이여야 합니다")
+    _check(_is_number(config['loudness']['target_db']) and config['loudness']['target_db'] <= 0,
+           "loudness.target_db는 0 이하의 숫자(dBFS)여야 합니다")
+    _check(isinstance(config['selection']['recent'], int) and config['selection']['recent'] >= 0,
+           "selection.recent는 0 이상의 정수여야 합니다")
+    _check(isinstance(config['loudness']['workers'], int), "loudness.workers는 정수여야 합니다")
+    _check(isinstance(config['transcode']['workers'], int), "transcode.workers는 정수여야 합니다")
+    _check(isinstance(config['transcode']['dir'], str) and config['transcode']['dir'],
+           "transcode.dir는 경로 문자열이어야 합니다")
+    _check(isinstance(config['journal']['path'], str) and config['journal']['path'],
+           "journal.path는 경로 문자열이어야 합니다")
+    _check(isinstance(config['journal']['backups'], int) and config['journal']['backups'] >= 0,
+           "journal.backups는 0 이상의 정수여야 합니다")
+    _check(isinstance(config['daemon']['socket'], str) and config['daemon']['socket'],
+           "daemon.socket은 경로 문자열이어야 합니다")
+    _check(isinstance(config['soundbank']['dir'], str) and config['soundbank']['dir'],
+           "soundbank.dir는 경로 문자열이어야 합니다")
+    for key in ('window', 'burst_window', 'pause'):
+        value = config['dynamics'][key]
+        _check(_is_number(value) and value > 0, f"dynamics.{key}는 0보다 큰 숫자여야 합니다")
+    _check(isinstance(config['dynamics']['rules'], dict), "dynamics.rules는 {폴더 = {rate, burst, cooldown}} 테이블이어야 합니다")
+    for folder_key, rule in config['dynamics']['rules'].items():
+        _check(folder_key in config['folders'], f"dynamics.rules.{folder_key}: [folders]에 없는 폴더입니다")
+        _check(isinstance(rule, dict) and set(rule) <= {'rate', 'burst', 'cooldown'} and
+               all(_is_number(value) and value >= 0 for value in rule.values()),
+               f"dynamics.rules.{folder_key}는 rate/burst/cooldown (0 이상의 숫자) 테이블이어야 합니다")
+    _check(isinstance(config['montage']['pool_size'], int) and config['montage']['pool_size'] >= 1,
+           "montage.pool_size는 1 이상의 정수여야 합니다")
+    _check(config['reaction']['base_duration'] > 0, "reaction.base_duration은 0보다 커야 합니다")
+    _check(config['work']['repeat_interval'] <= config['work']['reminder_interval'],
+           "work.repeat_interval은 work.reminder_interval보다 클 수 없습니다")
+    return config
+
+
+def load_config(path=DEFAULT_CONFIG_PATH):
+    """설정 파일을 읽어 기본값과 합친 설정 반환 (파일이 없으면 기본값)"""
+    override = {}
+    if path and os.path.exists(path):
+        try:
+            with open(path, 'rb') as f:
+                override = tomllib.load(f)
+        except tomllib.TOMLDecodeError as e:
+            raise ConfigError(f"{path} 파싱 오류: {e}") from e
+        except OSError as e:
+            raise ConfigError(f"{path} 읽기 오류: {e}") from e
+    return validate(_merge(DEFAULT_CONFIG, override))
+
+
+def config_mtime(path):
+    """설정 파일 변경 감지용 (mtime_ns, 크기), 파일이 없으면 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def build_sound_folders(config, previous=None):
+    """설정에서 sound_folders 딕셔너리 생성 (previous에 같은 폴더가 있으면 파일 목록 리스트를 그대로 재사용)"""
+    previous = previous or {}
+    sound_folders = {}
+    for folder_key, folder in config['folders'].items():
+        old = previous.get(folder_key)
+        files = old['files'] if old is not None and old['folder'] == folder['folder'] else []
+        sound_folders[folder_key] = {'folder': folder['folder'], 'patterns': list(folder['patterns']), 'files': files}
+    return sound_folders
+
+
+def build_volume_settings(config):
+    """폴더별 볼륨 + ambient 볼륨 테이블"""
+    volume_settings = {folder_key: folder['volume'] for folder_key, folder in config['folders'].items()}
+    volume_settings['ambient'] = config['ambient']['volume']
+    return volume_settings
@@ -0,0 +1,209 @@
+"""데몬 모드: 유닉스 도메인 소켓으로 여러 클라이언트의 반응 이벤트를 받아 한 프로세스에서 재생
+
+터미널마다 프로그램을 따로 띄우면 폴더 스캔, 디코딩, 사운드 캐시가 모두 중복된다.
+[daemon] enabled = true로 실행한 프로세스 하나가 라이브러리/사운드 캐시/믹서를 들고 있고,
+클라이언트는 소켓으로 이벤트만 보낸다 (키보드 리스너도 클라이언트 중 하나일 뿐).
+
+프로토콜 (줄 단위 JSON, 요청 한 줄 = 이벤트 하나 또는 이벤트 목록 = 응답 한 줄):
+    {"op": "key", "key": "a"}          키 입력 (패턴 매칭부터 키보드와 같은 경로, 특수 키는 이름)
+    {"op": "trigger", "folder": "aha"}  폴더 반응 시작 (진행 중이면 연장, 키보드 매칭과 같은 [triggers] 합치기/속도 제한)
+    {"op": "extend", "folder": "aha"}   진행 중인 반응만 연장
+    {"op": "stop", "folder": "aha"}     반응 중지 (folder가 없으면 전체)
+    {"op": "stats"}                    통계 (/stats와 같은 JSON)
+    {"op": "ping"} / {"op": "quit"}
+    응답: {"ok": 처리한 이벤트 수, "errors": [...], "stats": {...},
+           "triggers": {"accepted": 반응 시작/연장, "coalesced": 진행 중인 반응에 합침, "limited": 속도 제한}}
+
+클라이언트:
+    python -m aha_reaction_program.daemon trigger aha
+    python -m aha_reaction_program.daemon keys "dkgk"
+    python -m aha_reaction_program.daemon stop [폴더]
+    python -m aha_reaction_program.daemon stats
+    python -m aha_reaction_program.daemon listen     # 이 터미널의 키보드 입력을 데몬으로 보냄 (ESC로 종료)
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+
+from aha_reaction_program import logs
+
+DEFAULT_SOCKET = os.path.join('.aha_cache', 'aha.sock')
+# 응답에 담는 오류 메시지 최대 개수 (큰 배치가 전부 실패해도 응답은 작게)
+MAX_ERRORS = 8
+OPS = ('key', 'trigger', 'extend', 'stop', 'stats', 'ping', 'quit')
+
+
+class DaemonError(RuntimeError):
+    """데몬 연결/응답 오류"""
+
+
+class _DaemonHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                events = request if isinstance(request, list) else [request]
+                response = self.server.handle_events(events)
+            except ValueError as e:
+                response = {'ok': 0, 'errors': [f"JSON 형식 오류: {e}"]}
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class DaemonServer:
+    """유닉스 소켓 서버 (연결마다 스레드 하나, handle_events는 여러 스레드에서 동시에 호출됨)"""
+
+    def __init__(self, path, handle_events):
+        self.path = path
+        self.handle_events = handle_events
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path):
+            if is_listening(self.path):
+                raise OSError(f"이미 실행 중인 데몬이 있습니다: {self.path}")
+            os.unlink(self.path)  # 이전 실행이 남긴 소켓 파일
+        old_umask = os.umask(0o177)  # 소켓은 실행한 사용자만 (0600)
+        try:
+            self._server = _UnixServer(self.path, _DaemonHandler)
+        finally:
+            os.umask(old_umask)
+        self._server.handle_events = self.handle_events
+        self._thread = threading.Thread(target=self._server.serve_forever, name='aha-daemon', daemon=True)
+        self._thread.start()
+        logs.app.info(">> 데몬 소켓: %s", self.path)
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+
+def is_listening(path):
+    """소켓 파일에 데몬이 연결을 받고 있는지"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except OSError:
+            return False
+    return True
+
+
+class DaemonClient:
+    """데몬 소켓 클라이언트 (연결 하나를 계속 사용, 스레드 하나에서만 사용)"""
+
+    def __init__(self, path=DEFAULT_SOCKET, timeout=5.0):
+        self.path = path
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        try:
+            self._sock.connect(path)
+        except OSError as e:
+            self._sock.close()
+            raise DaemonError(f"데몬에 연결할 수 없습니다 ({path}): {e}") from e
+        self._reader = self._sock.makefile('rb')
+
+    def close(self):
+        self._reader.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def send(self, events):
+        """이벤트 하나(dict) 또는 여러 개(list)를 한 줄로 보내고 응답 반환"""
+        self._sock.sendall(json.dumps(events, ensure_ascii=False).encode('utf-8') + b'\n')
+        line = self._reader.readline()
+        if not line:
+            raise DaemonError("데몬이 연결을 끊었습니다")
+        return json.loads(line)
+
+    def keys(self, text):
+        return self.send([{'op': 'key', 'key': 'space' if char == ' ' else char} for char in text])
+
+    def trigger(self, folder_key):
+        return self.send({'op': 'trigger', 'folder': folder_key})
+
+    def extend(self, folder_key):
+        return self.send({'op': 'extend', 'folder': folder_key})
+
+    def stop(self, folder_key=None):
+        return self.send({'op': 'stop', 'folder': folder_key} if folder_key else {'op': 'stop'})
+
+    def stats(self):
+        return self.send({'op': 'stats'}).get('stats')
+
+
+def listen(client):
+    """이 터미널의 키보드 입력(pynput)을 데몬으로 보냄 (ESC는 보내지 않고 클라이언트만 종료)"""
+    from pynput import keyboard
+
+    from aha_reaction_program.inputs import key_name
+
+    lock = threading.Lock()
+
+    def on_press(key):
+        if key == keyboard.Key.esc:
+            return False
+        with lock:
+            client.send({'op': 'key', 'key': key_name(key)})
+
+    print(">> 키 입력을 데몬으로 보내는 중... (ESC로 종료)")
+    with keyboard.Listener(on_press=on_press) as listener:
+        listener.join()
+
+
+def main():
+    """실행 중인 데몬에 이벤트 보내기"""
+    import argparse
+
+    from aha_reaction_program.config import DEFAULT_CONFIG_PATH, load_config
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--config', default=os.environ.get('AHA_CONFIG', DEFAULT_CONFIG_PATH))
+    parser.add_argument('--socket', help='소켓 경로 (기본: 설정의 daemon.socket)')
+    parser.add_argument('command', choices=('trigger', 'extend', 'stop', 'keys', 'stats', 'ping', 'quit', 'listen'))
+    parser.add_argument('arg', nargs='?', help='폴더 이름 (trigger/extend/stop) 또는 보낼 문자열 (keys)')
+    args = parser.parse_args()
+
+    path = args.socket or load_config(args.config)['daemon']['socket']
+    with DaemonClient(path) as client:
+        if args.command == 'listen':
+            listen(client)
+            return
+        if args.command in ('trigger', 'extend', 'keys') and not args.arg:
+            parser.error(f"{args.command}에는 폴더 이름 또는 문자열이 필요합니다")
+        if args.command == 'keys':
+            response = client.keys(args.arg)
+        elif args.command == 'stop':
+            response = client.stop(args.arg)
+        elif args.command in ('trigger', 'extend'):
+            response = client.send({'op': args.command, 'folder': args.arg})
+        else:
+            response = client.send({'op': args.command})
+    print(json.dumps(response, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
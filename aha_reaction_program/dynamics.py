@@ -0,0 +1,183 @@
+"""타이핑 다이내믹스: 고정 크기 링 버퍼로 타자 속도/버스트/쉬는 시간 통계 (키마다 O(1), 메모리 일정)
+
+지금까지 타이핑 신호는 마지막 타이핑 시각 하나뿐이었다. TypingDynamics는 키 입력 처리 스레드에서 키마다
+    - 최근 window초 동안의 타자 속도 (분당 키)
+    - 최근 burst_window초 동안의 순간 속도 (초당 키)
+    - pause초 이상 멈췄던 쉬는 시간의 최근 PAUSE_HISTORY개 평균/표준편차
+를 갱신하고, 설정한 폴더 규칙(rate/burst 임계값)을 넘는 순간 그 폴더를 트리거한다.
+쉬는 시간 통계는 일 재촉 타이머의 적응형 대기 시간(평소 쉬는 시간 + 3σ)에 사용된다.
+"""
+
+import math
+from collections import Counter
+
+# 쉬는 시간 기록 개수 (링 버퍼 크기)
+PAUSE_HISTORY = 32
+# 속도 측정 버킷 수 (window / 버킷 수 = 버킷 하나의 길이)
+RATE_BUCKETS = 60
+BURST_BUCKETS = 20
+# 적응형 대기 시간 = 평균 + IDLE_SIGMAS × 표준편차 (쉬는 시간이 이만큼 기록되기 전에는 고정 간격)
+IDLE_SIGMAS = 3.0
+MIN_PAUSES = 4
+
+
+class RollingCounter:
+    """window초를 buckets개로 나눈 링 버퍼 카운터 (지난 버킷만 비우므로 갱신은 분할 상환 O(1))"""
+
+    __slots__ = ('window', 'width', 'counts', 'total', 'slot')
+
+    def __init__(self, window, buckets):
+        self.window = window
+        self.width = window / buckets
+        self.counts = [0] * buckets
+        self.total = 0
+        self.slot = None  # 마지막으로 갱신한 버킷 번호 (시각 / width)
+
+    def _advance(self, now):
+        slot = int(now / self.width)
+        if self.slot is None or slot - self.slot >= len(self.counts):
+            if self.total:
+                self.counts = [0] * len(self.counts)
+                self.total = 0
+        else:
+            for index in range(self.slot + 1, slot + 1):
+                i = index % len(self.counts)
+                self.total -= self.counts[i]
+                self.counts[i] = 0
+        if self.slot is None or slot > self.slot:
+            self.slot = slot
+        return self.slot % len(self.counts)
+
+    def add(self, now, count=1):
+        self.counts[self._advance(now)] += count
+        self.total += count
+
+    def rate(self, now):
+        """초당 개수 (버퍼는 바꾸지 않으므로 다른 스레드에서 읽어도 됨)"""
+        if self.slot is None:
+            return 0.0
+        slot = int(now / self.width)
+        n = len(self.counts)
+        if slot - self.slot >= n:
+            return 0.0
+        # now 기준으로 window를 벗어난 버킷 (slot - n 이하)은 빼고 계산
+        expired = sum(self.counts[index % n] for index in range(self.slot - n + 1, slot - n + 1))
+        return (self.total - expired) / self.window
+
+
+class RollingStats:
+    """최근 size개 값의 평균/표준편차 (링 버퍼 + 누적 합)"""
+
+    __slots__ = ('values', 'index', 'count', 'sum', 'sum_sq')
+
+    def __init__(self, size):
+        self.values = [0.0] * size
+        self.index = 0
+        self.count = 0
+        self.sum = 0.0
+        self.sum_sq = 0.0
+
+    def add(self, value):
+        if self.count == len(self.values):
+            old = self.values[self.index]
+            self.sum -= old
+            self.sum_sq -= old * old
+        else:
+            self.count += 1
+        self.values[self.index] = value
+        self.index = (self.index + 1) % len(self.values)
+        self.sum += value
+        self.sum_sq += value * value
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    @property
+    def stdev(self):
+        if self.count < 2:
+            return 0.0
+        return math.sqrt(max(0.0, self.sum_sq / self.count - self.mean ** 2))
+
+
+class RateRule:
+    """폴더 트리거 규칙: 분당 키(rate) 또는 초당 순간 속도(burst)가 임계값을 넘는 순간 한 번 (0이면 사용 안 함)
+
+    한 번 트리거되면 속도가 임계값 아래로 내려갔다가 다시 넘고, cooldown초가 지나야 다시 트리거된다.
+    """
+
+    __slots__ = ('folder_key', 'rate', 'burst', 'cooldown', 'armed', 'last_fired')
+
+    def __init__(self, folder_key, rate=0.0, burst=0.0, cooldown=30.0):
+        self.folder_key = folder_key
+        self.rate = rate
+        self.burst = burst
+        self.cooldown = cooldown
+        self.armed = True
+        self.last_fired = None
+
+    def check(self, now, keys_per_minute, keys_per_second):
+        over = ((self.rate and keys_per_minute >= self.rate) or
+                (self.burst and keys_per_second >= self.burst))
+        if not over:
+            self.armed = True
+            return False
+        if not self.armed or (self.last_fired is not None and now - self.last_fired < self.cooldown):
+            return False
+        self.armed = False
+        self.last_fired = now
+        return True
+
+
+class TypingDynamics:
+    """키 입력 처리 스레드 하나에서만 feed() (다른 스레드는 통계 값만 읽음)"""
+
+    def __init__(self, window=60.0, burst_window=2.0, pause=2.0, rules=None):
+        self.pauses = RollingStats(PAUSE_HISTORY)
+        self.pause_count = 0  # 지금까지 기록한 쉬는 시간 수 (적응형 대기 시간이 바뀌었는지 확인용)
+        self.last_key = None
+        self.keys = 0
+        self.fired = Counter()
+        self.configure(window, burst_window, pause, rules)
+
+    def configure(self, window=60.0, burst_window=2.0, pause=2.0, rules=None):
+        """설정 변경 (속도 버퍼는 새로 시작, 쉬는 시간 기록은 유지)"""
+        self.pause = pause
+        self.rate_counter = RollingCounter(window, RATE_BUCKETS)
+        self.burst_counter = RollingCounter(burst_window, BURST_BUCKETS)
+        self.rules = [RateRule(folder_key, **rule) for folder_key, rule in (rules or {}).items()]
+
+    def feed(self, now):
+        """키 하나 반영 (now: 단조 시계 초), 이번 키로 트리거된 폴더 목록 반환"""
+        if self.last_key is not None and now - self.last_key >= self.pause:
+            self.pauses.add(now - self.last_key)
+            self.pause_count += 1
+        self.last_key = now
+        self.keys += 1
+        self.rate_counter.add(now)
+        self.burst_counter.add(now)
+        if not self.rules:
+            return []
+        keys_per_minute = self.rate_counter.rate(now) * 60
+        keys_per_second = self.burst_counter.rate(now)
+        fired = [rule.folder_key for rule in self.rules if rule.check(now, keys_per_minute, keys_per_second)]
+        for folder_key in fired:
+            self.fired[folder_key] += 1
+        return fired
+
+    def idle_threshold(self, default, minimum=0.0):
+        """일 재촉까지 기다릴 시간: 평소 쉬는 시간 + 3σ (minimum ~ default 사이, 기록이 적으면 default)"""
+        if self.pauses.count < MIN_PAUSES:
+            return default
+        return min(default, max(minimum, self.pauses.mean + IDLE_SIGMAS * self.pauses.stdev))
+
+    def stats(self, now):
+        return {
+            'keys': self.keys,
+            'keys_per_minute': round(self.rate_counter.rate(now) * 60, 1),
+            'burst_keys_per_second': round(self.burst_counter.rate(now), 2),
+            'pauses': self.pause_count,
+            'pause_mean': round(self.pauses.mean, 2),
+            'pause_stdev': round(self.pauses.stdev, 2),
+            'fired': dict(self.fired),
+        }
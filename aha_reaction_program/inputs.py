@@ -0,0 +1,205 @@
+"""키 입력 소스: 실제 키보드(pynput), 기록된 키 입력 trace 파일 재생, 또는 없음 (데몬 클라이언트만)
+
+trace 파일 형식 (한 줄에 키 하나, #으로 시작하면 주석):
+    <첫 키로부터 경과 시간(초)>\\t<키>
+키는 한 글자면 문자 키, 그 외에는 특수 키 이름 (f1, f2, esc, space ...).
+"""
+
+import threading
+import time
+
+from aha_reaction_program import logs
+
+SOURCE_KEYBOARD = 'keyboard'
+SOURCE_TRACE = 'trace'
+SOURCE_NONE = 'none'
+INPUT_SOURCES = (SOURCE_KEYBOARD, SOURCE_TRACE, SOURCE_NONE)
+
+
+class CharKey:
+    """trace 재생용 문자 키 (pynput KeyCode처럼 .char 제공)"""
+
+    __slots__ = ('char',)
+
+    def __init__(self, char):
+        self.char = char
+
+    def __repr__(self):
+        return f"'{self.char}'"
+
+
+class SpecialKey:
+    """trace 재생용 특수 키 (이름으로 비교)"""
+
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __eq__(self, other):
+        return isinstance(other, SpecialKey) and other.name == self.name
+
+    def __hash__(self):
+        return hash(self.name)
+
+    def __repr__(self):
+        return f'Key.{self.name}'
+
+
+class TraceKeys:
+    """pynput.keyboard.Key 대신 쓰는 특수 키 모음 (Key.f1처럼 속성으로 접근)"""
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        key = SpecialKey(name)
+        setattr(self, name, key)
+        return key
+
+
+def key_name(key):
+    """키를 trace 파일에 쓸 이름으로 변환 (문자 키는 글자, 특수 키는 이름)"""
+    char = getattr(key, 'char', None)
+    if char:
+        return char
+    name = getattr(key, 'name', None)
+    return name if name else str(key)
+
+
+def read_trace(path):
+    """trace 파일을 [(경과 초, 키 이름), ...]으로 읽기"""
+    events = []
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.rstrip('\n')
+            if not line or line.startswith('#'):
+                continue
+            offset, sep, name = line.partition('\t')
+            if not sep or not name:
+                raise ValueError(f"{path}:{line_number}: '<초>\\t<키>' 형식이 아닙니다")
+            events.append((float(offset), name))
+    return events
+
+
+class TraceRecorder:
+    """실제 키 입력을 trace 파일로 기록 (소비자 스레드에서 호출)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+        self._first_ns = None
+
+    def record(self, timestamp_ns, key):
+        if self._first_ns is None:
+            self._first_ns = timestamp_ns
+        name = key_name(key)
+        if name in ('\t', '\n', '\r'):
+            return  # 형식이 깨지는 제어 문자는 기록하지 않음
+        self._file.write(f"{(timestamp_ns - self._first_ns) / 1e9:.6f}\t{name}\n")
+
+    def close(self):
+        self._file.close()
+
+
+class KeyboardInput:
+    """pynput 키보드 리스너 (pynput은 이 객체를 만들 때 import)"""
+
+    name = SOURCE_KEYBOARD
+
+    def __init__(self, on_press):
+        from pynput import keyboard
+        self.keyboard = keyboard
+        self.key_codes = keyboard.Key
+        self.on_press = on_press
+        self.listener = None
+
+    def start(self):
+        self.listener = self.keyboard.Listener(on_press=self.on_press)
+        self.listener.start()
+        self.listener.wait()  # 훅이 설치될 때까지 대기
+
+    def stop(self):
+        if self.listener is not None:
+            self.listener.stop()
+
+    @property
+    def finished(self):
+        return self.listener is not None and not self.listener.running
+
+
+class TraceInput:
+    """trace 파일의 키 입력을 기록된 간격대로 재생 (speed배 빠르게, 0이면 기다리지 않음)
+
+    마지막까지 재생하면 ESC를 눌러 프로그램을 종료 (trace에 이미 있으면 생략).
+    """
+
+    name = SOURCE_TRACE
+
+    def __init__(self, on_press, path, speed=1.0):
+        self.on_press = on_press
+        self.path = path
+        self.speed = speed
+        self.key_codes = TraceKeys()
+        self.events = [(offset, self._make_key(name)) for offset, name in read_trace(path)]
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _make_key(self, name):
+        return CharKey(name) if len(name) == 1 else getattr(self.key_codes, name)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._replay, name='aha-trace', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def finished(self):
+        return self._thread is not None and not self._thread.is_alive()
+
+    def _replay(self):
+        started = time.perf_counter()
+        esc = self.key_codes.esc
+        for offset, key in self.events:
+            if self.speed > 0:
+                delay = started + offset / self.speed - time.perf_counter()
+                if delay > 0 and self._stop.wait(delay):
+                    return
+            elif self._stop.is_set():
+                return
+            if self.on_press(key) is False or key == esc:
+                return
+        logs.keys.info("-- trace 재생 완료: %d개 키 (%.2f초)", len(self.events), time.perf_counter() - started)
+        self.on_press(esc)
+
+
+class NullInput:
+    """직접 받는 키 입력 없음 (데몬 모드에서 소켓 클라이언트의 이벤트만 처리)"""
+
+    name = SOURCE_NONE
+
+    def __init__(self):
+        self.key_codes = TraceKeys()
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    @property
+    def finished(self):
+        return False
+
+
+def make_input_source(settings, on_press):
+    """[input] 설정으로 키 입력 소스 생성"""
+    source = settings['source']
+    if source == SOURCE_KEYBOARD:
+        return KeyboardInput(on_press)
+    if source == SOURCE_TRACE:
+        return TraceInput(on_press, settings['trace'], speed=settings['speed'])
+    if source == SOURCE_NONE:
+        return NullInput()
+    raise ValueError(f"지원하지 않는 입력 소스: {source} (가능: {', '.join(INPUT_SOURCES)})")
@@ -0,0 +1,240 @@
+"""이벤트 저널: 패턴 매칭, 반응 시작/연장/중지, 재생 파일, 일 재촉을 줄 단위 JSON으로 계속 덧붙여 기록
+
+기록 (키 입력 처리/스케줄러 스레드)은 큐에 넣기만 하고, 파일 쓰기는 백그라운드 스레드 하나가
+flush_interval마다 모아서 한 번에 한다 (키 입력 경로에 동기 I/O 없음). 파일이 max_bytes를 넘으면
+events.jsonl → events.jsonl.1 → ... → events.jsonl.<backups>로 밀어내고 새 파일에 쓴다.
+
+레코드 형식 (한 줄에 하나, t = 단조 시계 perf_counter_ns):
+    {"t": ..., "e": "session", "wall": 시작 시각(time.time()), "pid": ...}   실행(파일)마다 처음에 한 번
+    {"t": ..., "e": "match", "folder": "aha", "pattern": "dkgk", "ok": true}  ok=false면 합쳐짐/속도 제한
+    {"t": ..., "e": "start" | "extend" | "stop" | "play" | "timer", "folder": ..., ...}
+
+읽기:
+    python -m aha_reaction_program.journal stats                       # 패턴별 매칭 수/반응 비율/시간당 횟수
+    python -m aha_reaction_program.journal replay --out keys.trace     # 마지막 실행의 패턴 입력을 trace로 ([input] source = "trace")
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from collections import Counter, defaultdict
+
+from aha_reaction_program import logs
+
+DEFAULT_PATH = os.path.join('.aha_cache', 'events.jsonl')
+_STOP = object()
+
+
+class EventJournal:
+    """줄 단위 JSON 이벤트 기록기 (record는 여러 스레드에서 호출 가능, 블로킹 없음)"""
+
+    def __init__(self, path=DEFAULT_PATH, max_bytes=8 * 1024 * 1024, backups=3, flush_interval=1.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.recorded = 0
+        self.written = 0
+        self.rotations = 0
+        self._queue = queue.SimpleQueue()
+        self._stopping = threading.Event()
+        self._file = None
+        self._thread = None
+
+    def start(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._open()
+        self._thread = threading.Thread(target=self._run, name='aha-journal', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """남은 레코드를 모두 쓰고 닫기"""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def record(self, event, timestamp_ns=None, **fields):
+        """이벤트 하나 기록 (큐에 넣기만 함, timestamp_ns가 없으면 지금)"""
+        self._queue.put((timestamp_ns or time.perf_counter_ns(), event, fields))
+        self.recorded += 1
+
+    def _open(self):
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._size = self._file.tell()
+        self._write_lines([self._encode(time.perf_counter_ns(), 'session', {'wall': time.time(), 'pid': os.getpid()})])
+
+    def _rotate(self):
+        self._file.close()
+        for index in range(self.backups - 1, 0, -1):
+            source = f'{self.path}.{index}'
+            if os.path.exists(source):
+                os.replace(source, f'{self.path}.{index + 1}')
+        if self.backups > 0:
+            os.replace(self.path, f'{self.path}.1')
+        else:
+            os.remove(self.path)
+        self.rotations += 1
+        self._open()
+
+    @staticmethod
+    def _encode(timestamp_ns, event, fields):
+        return json.dumps(dict(t=timestamp_ns, e=event, **fields), ensure_ascii=False, separators=(',', ':')) + '\n'
+
+    def _write_lines(self, lines):
+        data = ''.join(lines)
+        size = len(data.encode('utf-8'))
+        if self._size and self._size + size > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._size += size
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            items = [self._queue.get()]
+            if items[0] is not _STOP:
+                self._stopping.wait(self.flush_interval)  # 모아서 한 번에 쓰기 (종료 요청이면 바로)
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if _STOP in items:
+                stopping = True
+                items = [item for item in items if item is not _STOP]
+            try:
+                if items:
+                    self._write_lines([self._encode(*item) for item in items])
+                    self.written += len(items)
+            except (OSError, TypeError, ValueError) as e:
+                logs.app.error("이벤트 저널 쓰기 오류 (%s): %s", self.path, e)
+        self._file.close()
+
+    def stats(self):
+        return {'recorded': self.recorded, 'written': self.written, 'rotations': self.rotations,
+                'pending': self._queue.qsize()}
+
+
+def journal_files(path=DEFAULT_PATH):
+    """오래된 순서의 저널 파일 목록 (events.jsonl.N ... events.jsonl.1, events.jsonl)"""
+    files = []
+    index = 1
+    while os.path.exists(f'{path}.{index}'):
+        files.append(f'{path}.{index}')
+        index += 1
+    files.reverse()
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def read_events(path=DEFAULT_PATH):
+    """저널의 레코드를 오래된 순서로 (잘린 마지막 줄 등 깨진 줄은 건너뜀)"""
+    for file_path in journal_files(path):
+        with open(file_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and 'e' in record:
+                    yield record
+
+
+def split_sessions(events):
+    """실행(프로세스)별 레코드 목록, 회전으로 생긴 session 레코드는 같은 실행으로 이어 붙임"""
+    sessions = []
+    current_pid = None
+    for record in events:
+        if record['e'] == 'session':
+            if record.get('pid') != current_pid or not sessions:
+                sessions.append([])
+                current_pid = record.get('pid')
+        elif sessions:
+            sessions[-1].append(record)
+    return sessions
+
+
+def pattern_stats(events):
+    """패턴별 {'matches', 'accepted', 'per_hour'} (per_hour: 기록된 시간 동안 시간당 매칭 수)"""
+    stats = defaultdict(Counter)
+    active_ns = 0
+    for session in split_sessions(events):
+        if session:
+            active_ns += session[-1]['t'] - session[0]['t']
+        for record in session:
+            if record['e'] == 'match':
+                counts = stats[(record.get('folder'), record.get('pattern'))]
+                counts['matches'] += 1
+                counts['accepted'] += bool(record.get('ok'))
+    hours = active_ns / 3.6e12
+    return {key: {'matches': counts['matches'], 'accepted': counts['accepted'],
+                  'per_hour': counts['matches'] / hours if hours else 0.0}
+            for key, counts in stats.items()}
+
+
+def session_trace(session, key_interval=0.05):
+    """실행 하나의 패턴 매칭을 [(경과 초, 키 이름)] trace로 (패턴의 마지막 글자가 매칭 시각에 오도록)"""
+    matches = [record for record in session if record['e'] == 'match' and record.get('pattern')]
+    if not matches:
+        return []
+    base = matches[0]['t'] / 1e9 - len(matches[0]['pattern']) * key_interval
+    trace = []
+    last = 0.0
+    for record in matches:
+        pattern = record['pattern']
+        start = max(last, record['t'] / 1e9 - base - (len(pattern) - 1) * key_interval)
+        for index, char in enumerate(pattern):
+            last = start + index * key_interval
+            trace.append((last, 'space' if char == ' ' else char))
+        last += key_interval
+        trace.append((last, 'space'))  # 다음 패턴과 이어서 매칭되지 않게
+        last += key_interval
+    return trace
+
+
+def main():
+    """이벤트 저널 읽기: 패턴별 통계 또는 실행 하나를 trace 파일로"""
+    import argparse
+
+    from aha_reaction_program.config import DEFAULT_CONFIG_PATH, load_config
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--config', default=os.environ.get('AHA_CONFIG', DEFAULT_CONFIG_PATH))
+    parser.add_argument('--path', help='저널 파일 (기본: 설정의 journal.path)')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('stats', help='패턴별 매칭 수, 반응으로 이어진 비율, 시간당 횟수')
+    replay = sub.add_parser('replay', help='실행 하나의 패턴 입력을 trace 파일로')
+    replay.add_argument('--session', type=int, default=-1, help='실행 번호 (기본: 마지막)')
+    replay.add_argument('--out', required=True, help='trace 파일 경로')
+    args = parser.parse_args()
+
+    path = args.path or load_config(args.config)['journal']['path']
+    if args.command == 'stats':
+        stats = pattern_stats(read_events(path))
+        print(f"{'폴더':<10}{'패턴':<16}{'매칭':>8}{'반응':>8}{'비율':>8}{'시간당':>9}")
+        for (folder_key, pattern), counts in sorted(stats.items(), key=lambda item: -item[1]['matches']):
+            print(f"{folder_key or '-':<10}{pattern or '-':<16}{counts['matches']:>8}{counts['accepted']:>8}"
+                  f"{counts['accepted'] / counts['matches']:>8.0%}{counts['per_hour']:>9.1f}")
+        return
+    sessions = split_sessions(read_events(path))
+    if not sessions:
+        parser.error(f"저널에 기록된 실행이 없습니다: {path}")
+    trace = session_trace(sessions[args.session])
+    with open(args.out, 'w', encoding='utf-8') as f:
+        f.write(f"# {path} 실행 {args.session}의 패턴 입력 ({len(trace)}개 키)\n")
+        for offset, name in trace:
+            f.write(f"{offset:.6f}\t{name}\n")
+    print(f">> {args.out}: {len(trace)}개 키")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""키보드 훅과 패턴 매칭/재생 처리를 분리하는 키 입력 파이프라인"""
+
+import queue
+import threading
+import time
+
+from aha_reaction_program import logs
+from aha_reaction_program.stats import LatencyHistogram
+
+_STOP = object()
+
+
+class KeyPipeline:
+    """훅 콜백은 (타임스탬프, 키)를 큐에 넣기만 하고, 소비자 스레드가 handler를 실행"""
+
+    def __init__(self, handler, maxsize=1024, hook_budget_us=50):
+        self.handler = handler  # handler(timestamp_ns, key) - 소비자 스레드에서 호출
+        self.maxsize = maxsize
+        self.dropped = 0  # 큐가 가득 차서 버린 키 입력 수
+        self._queue = queue.SimpleQueue()  # C 구현, put은 블로킹 없음
+        self._thread = None
+
+        # 훅 콜백 실행 시간 / 큐 대기 시간 (키 입력 → 소비자 처리 시작)
+        self.hook_latency = LatencyHistogram('훅 콜백', budget_ns=hook_budget_us * 1000)
+        self.queue_latency = LatencyHistogram('큐 대기')
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='aha-keys', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self._queue.put(_STOP)
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def push(self, timestamp_ns, key):
+        """훅 스레드에서 호출: 큐가 가득 차면 버리고 False"""
+        if self._queue.qsize() >= self.maxsize:
+            self.dropped += 1
+            return False
+        self._queue.put((timestamp_ns, key))
+        return True
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            timestamp_ns, key = item
+            self.queue_latency.record(time.perf_counter_ns() - timestamp_ns)
+            try:
+                self.handler(timestamp_ns, key)
+            except Exception as e:
+                logs.keys.error("키 입력 처리 오류: %s", e)
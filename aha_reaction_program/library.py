@@ -0,0 +1,276 @@
+"""사운드 라이브러리 폴더 감시 (inotify, 없으면 mtime 폴링) 및 증분 변경 감지"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from aha_reaction_program import logs
+
+# 지원하는 음악 파일 확장자
+SUPPORTED_FORMATS = ('.wav', '.mp3', '.ogg', '.m4a')
+
+# inotify 상수 (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+               | IN_DELETE_SELF | IN_MOVE_SELF)
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def is_supported(file_name):
+    return os.path.splitext(file_name.lower())[1] in SUPPORTED_FORMATS
+
+
+def scan_folder(folder):
+    """폴더의 지원 형식 파일 {경로: (mtime_ns, 크기)} (폴더가 없으면 빈 dict)"""
+    files = {}
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.is_file() and is_supported(entry.name):
+                    stat = entry.stat()
+                    files[os.path.join(folder, entry.name)] = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        pass
+    return files
+
+
+class _Inotify:
+    """ctypes로 감싼 최소한의 inotify (리눅스 전용)"""
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library('c')
+        if not sys.platform.startswith('linux') or not libc_name:
+            raise OSError("inotify를 사용할 수 없는 플랫폼")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 실패")
+
+    def add_watch(self, path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        return wd if wd >= 0 else None
+
+    def read(self, timeout):
+        """(wd, mask, name) 이벤트 목록 (timeout초 동안 없으면 빈 목록)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class LibraryWatcher:
+    """폴더별 파일 목록 스냅샷을 유지하며 추가/삭제/수정된 파일만 on_change로 전달
+
+    on_change(folder_key, added, removed, modified) - 감시 스레드에서 호출됨
+    """
+
+    def __init__(self, folders, on_change, poll_interval=2.0, sweep_batch=500, debounce=0.3, use_inotify=True):
+        self.folders = dict(folders)  # {folder_key: 폴더 경로}
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.sweep_batch = sweep_batch  # 폴링 모드에서 한 번에 수정 여부를 확인할 파일 수
+        self.debounce = debounce
+        self.use_inotify = use_inotify
+        self.backend = None
+        self._snapshots = {}  # {folder_key: {경로: (mtime_ns, 크기)}}
+        self._dir_mtimes = {}
+        self._sweep_cursor = 0
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='aha-library', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self._running = False
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def set_folders(self, folders):
+        """감시 폴더 목록 교체 (설정 다시 불러오기용, 새 폴더는 다음 확인 때 반영)"""
+        self.folders = dict(folders)
+
+    def snapshot(self):
+        """초기 스냅샷 (라이브러리 스캔 전에 떠 두면 스캔 도중 바뀐 파일도 시작 후 변경으로 전달됨)"""
+        for folder_key, folder in list(self.folders.items()):
+            self._dir_mtimes[folder_key] = self._dir_mtime(folder)
+            self._snapshots[folder_key] = scan_folder(folder)
+
+    def _run(self):
+        # 미리 떠 둔 스냅샷이 없으면 백그라운드에서 한 번만
+        if not self._snapshots:
+            self.snapshot()
+
+        inotify = None
+        if self.use_inotify:
+            try:
+                inotify = _Inotify()
+            except (OSError, AttributeError) as e:
+                logs.library.debug("inotify 사용 불가, mtime 폴링으로 감시: %s", e)
+        try:
+            if inotify is not None:
+                self.backend = 'inotify'
+                self._run_inotify(inotify)
+            else:
+                self.backend = 'polling'
+                self._run_polling()
+        except Exception as e:
+            logs.library.error("라이브러리 감시 오류: %s", e)
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+    @staticmethod
+    def _dir_mtime(folder):
+        try:
+            return os.stat(folder).st_mtime_ns
+        except OSError:
+            return None
+
+    def _reconcile(self, folder_key, names=None):
+        """스냅샷과 디스크를 비교해서 변경분 전달 (names가 있으면 그 파일들만 확인)"""
+        folder = self.folders.get(folder_key)
+        if folder is None:
+            return  # 감시 목록에서 빠진 폴더
+        snapshot = self._snapshots.setdefault(folder_key, {})
+        if names is None:
+            current = scan_folder(folder)
+            added = [path for path in current if path not in snapshot]
+            removed = [path for path in snapshot if path not in current]
+            modified = [path for path in current if path in snapshot and current[path] != snapshot[path]]
+            self._snapshots[folder_key] = current
+        else:
+            added, removed, modified = [], [], []
+            for name in names:
+                if not is_supported(name):
+                    continue
+                path = os.path.join(folder, name)
+                try:
+                    stat = os.stat(path)
+                    signature = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    signature = None
+                previous = snapshot.get(path)
+                if signature is None:
+                    if previous is not None:
+                        removed.append(path)
+                        del snapshot[path]
+                elif previous is None:
+                    added.append(path)
+                    snapshot[path] = signature
+                elif previous != signature:
+                    modified.append(path)
+                    snapshot[path] = signature
+        if added or removed or modified:
+            self.on_change(folder_key, added, removed, modified)
+
+    def _run_inotify(self, inotify):
+        watches = {}  # {wd: (folder_key, 폴더 경로)}
+
+        def add_missing_watches():
+            watched = set(watches.values())
+            for folder_key, folder in list(self.folders.items()):
+                if (folder_key, folder) in watched or not os.path.isdir(folder):
+                    continue
+                wd = inotify.add_watch(folder)
+                if wd is not None:
+                    watches[wd] = (folder_key, folder)
+                    self._reconcile(folder_key)  # 감시 시작 전 생긴 변경 반영
+
+        add_missing_watches()
+        pending = {}  # {folder_key: set(파일 이름)}, None이면 전체 재확인
+        last_event = 0.0
+        last_retry = time.monotonic()
+        while self._running:
+            timeout = self.debounce if pending else self.poll_interval
+            for wd, mask, name in inotify.read(timeout):
+                if mask & IN_Q_OVERFLOW:
+                    # 이벤트 유실 → 모든 폴더 다시 확인
+                    pending = {folder_key: None for folder_key in self.folders}
+                    continue
+                folder_key, folder = watches.get(wd, (None, None))
+                if folder_key is None or self.folders.get(folder_key) != folder:
+                    continue  # 설정에서 빠졌거나 경로가 바뀐 폴더
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                    del watches[wd]
+                    pending[folder_key] = None
+                    continue
+                if pending.get(folder_key, set()) is not None and name:
+                    pending.setdefault(folder_key, set()).add(name)
+                last_event = time.monotonic()
+
+            now = time.monotonic()
+            # 연속 이벤트(복사 중인 파일 등)가 잠잠해지면 한 번에 반영
+            if pending and now - last_event >= self.debounce:
+                for folder_key, names in pending.items():
+                    self._reconcile(folder_key, names)
+                pending = {}
+            # 나중에 생긴 폴더도 감시 시작
+            if now - last_retry >= self.poll_interval:
+                add_missing_watches()
+                last_retry = now
+
+    def _run_polling(self):
+        while self._running:
+            time.sleep(self.poll_interval)
+            # 파일 추가/삭제는 폴더 mtime이 바뀐 폴더만 다시 읽음
+            for folder_key, folder in list(self.folders.items()):
+                dir_mtime = self._dir_mtime(folder)
+                if dir_mtime != self._dir_mtimes.get(folder_key):
+                    self._dir_mtimes[folder_key] = dir_mtime
+                    snapshot = self._snapshots.get(folder_key, {})
+                    names = {os.path.basename(path) for path in snapshot}
+                    try:
+                        names.update(os.listdir(folder))
+                    except OSError:
+                        pass
+                    self._reconcile(folder_key, names)
+            self._sweep_modified()
+
+    def _sweep_modified(self):
+        """파일 내용 수정은 폴더 mtime에 안 나타나므로, 매번 일부 파일만 돌아가며 stat"""
+        paths = [(folder_key, path) for folder_key, snapshot in self._snapshots.items() for path in snapshot]
+        if not paths:
+            return
+        start = self._sweep_cursor % len(paths)
+        batch = paths[start:start + self.sweep_batch]
+        self._sweep_cursor = start + len(batch)
+        touched = {}
+        for folder_key, path in batch:
+            touched.setdefault(folder_key, set()).add(os.path.basename(path))
+        for folder_key, names in touched.items():
+            self._reconcile(folder_key, names)
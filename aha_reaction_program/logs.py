@@ -0,0 +1,134 @@
+"""카테고리별 레벨 로깅 (비동기 출력 + 꺼진 카테고리는 플래그 확인 한 번으로 끝)
+
+사용법:
+    from aha_reaction_program import logs
+    logs.keys.debug("키 입력: %r", char)   # 포맷팅은 출력 스레드에서만
+    if logs.playback.debug_enabled:        # 인자 계산이 비싸면 먼저 확인
+        logs.playback.debug("재생: %s", os.path.basename(path))
+"""
+
+import logging
+import logging.handlers
+import queue
+import sys
+
+ROOT_LOGGER = 'aha'
+CATEGORIES = ('app', 'keys', 'matcher', 'playback', 'ambient', 'timer', 'library')
+
+# 카테고리를 완전히 끌 때 쓰는 레벨
+OFF = logging.CRITICAL + 10
+
+
+class CategoryLogger:
+    """카테고리 하나의 로거 (활성 여부를 bool 속성으로 캐시해서 꺼져 있으면 비용 0에 가깝게)"""
+
+    __slots__ = ('name', 'logger', 'debug_enabled', 'info_enabled', 'warning_enabled')
+
+    def __init__(self, name):
+        self.name = name
+        self.logger = logging.getLogger(f'{ROOT_LOGGER}.{name}')
+        self.refresh()
+
+    def refresh(self):
+        self.debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+        self.info_enabled = self.logger.isEnabledFor(logging.INFO)
+        self.warning_enabled = self.logger.isEnabledFor(logging.WARNING)
+
+    def debug(self, msg, *args):
+        if self.debug_enabled:
+            self.logger.debug(msg, *args)
+
+    def info(self, msg, *args):
+        if self.info_enabled:
+            self.logger.info(msg, *args)
+
+    def warning(self, msg, *args):
+        if self.warning_enabled:
+            self.logger.warning(msg, *args)
+
+    def error(self, msg, *args):
+        self.logger.error(msg, *args)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """레코드를 포맷하지 않고 그대로 큐에 넣음 (메시지 포맷팅은 출력 스레드에서)"""
+
+    def prepare(self, record):
+        return record
+
+
+app = CategoryLogger('app')
+keys = CategoryLogger('keys')
+matcher = CategoryLogger('matcher')
+playback = CategoryLogger('playback')
+ambient = CategoryLogger('ambient')
+timer = CategoryLogger('timer')
+library = CategoryLogger('library')
+
+_CATEGORY_LOGGERS = {logger.name: logger for logger in (app, keys, matcher, playback, ambient, timer, library)}
+_listener = None
+
+
+def parse_level(value):
+    """레벨 이름('DEBUG', 'info', ...) 또는 숫자를 logging 레벨로 (모르는 이름이면 ValueError)"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    level = logging.getLevelName(str(value).upper())
+    if not isinstance(level, int):
+        raise ValueError(f"알 수 없는 로그 레벨: {value!r}")
+    return level
+
+
+def parse_categories(categories):
+    """categories 설정을 {카테고리: 레벨 또는 None}으로 (모르는 카테고리/레벨이면 ValueError)"""
+    if categories is None:
+        return {}
+    unknown = [name for name in categories if name not in CATEGORIES]
+    if unknown:
+        raise ValueError(f"알 수 없는 로그 카테고리: {', '.join(map(str, unknown))} (가능: {', '.join(CATEGORIES)})")
+    if isinstance(categories, dict):
+        return {name: parse_level(value) for name, value in categories.items()}
+    levels = {name: OFF for name in CATEGORIES}
+    levels.update({name: None for name in categories})
+    return levels
+
+
+def configure(level='INFO', categories=None, quiet=False, stream=None):
+    """로깅 설정 (레벨 값이 잘못됐으면 기존 설정을 건드리지 않고 ValueError)
+
+    level      : 기본 레벨 ('DEBUG', 'INFO', ...)
+    categories : {카테고리: 레벨} 또는 켤 카테고리 목록 (목록에 없는 카테고리는 꺼짐)
+    quiet      : True면 경고/오류만 출력
+    """
+    global _listener
+    root_level = logging.WARNING if quiet else parse_level(level)
+    levels = parse_categories(categories)
+    shutdown()
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers.clear()
+    root.propagate = False
+    root.setLevel(root_level)
+
+    for name, category in _CATEGORY_LOGGERS.items():
+        category_level = levels.get(name)
+        if quiet and category_level != OFF:
+            category_level = max(category_level or 0, logging.WARNING)
+        category.logger.setLevel(category_level if category_level is not None else logging.NOTSET)
+        category.refresh()
+
+    # 호출 스레드는 큐에 넣기만 하고 출력은 리스너 스레드가 담당
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(logging.Formatter('%(message)s'))
+    log_queue = queue.SimpleQueue()
+    root.addHandler(_DeferredQueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+
+
+def shutdown():
+    """남은 로그를 모두 출력하고 리스너 정지"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,123 @@
+"""반응 사운드 음량 분석 (RMS/피크, dBFS) + 파일별 정규화 게인
+
+같은 폴더 안에서도 파일마다 음량이 크게 달라서, 파일마다 한 번만 전체 PCM의 RMS와 피크를
+계산해 메타데이터 캐시(길이 인덱스와 같은 항목)에 저장하고, 재생할 때는 저장된 값으로 게인만 계산한다.
+분석은 프로세스 풀에서 돌아가므로 라이브러리가 커져도 코어 수만큼 빨라지고 재생 경로에서는 디코딩하지 않는다.
+
+설정 없이 한 번에 분석하기 (aha.toml의 반응 폴더 전체):
+    python -m aha_reaction_program.loudness [--workers 4]
+"""
+
+import importlib.util
+import math
+import os
+
+from aha_reaction_program import logs
+from aha_reaction_program.audio_meta import decode_pcm
+from aha_reaction_program.workers import BatchJob
+
+# 메타데이터 캐시 필드 이름 ({'rms_db': ..., 'peak_db': ...})
+LOUDNESS_FIELD = 'loudness'
+# 무음 파일의 dBFS (log(0) 대신)
+SILENCE_DB = -120.0
+# 게인을 올려도 피크가 넘지 않을 상한 (dBFS, 클리핑 방지)
+PEAK_CEILING_DB = -1.0
+
+
+def to_db(value):
+    """0~1 진폭을 dBFS로"""
+    return 20.0 * math.log10(value) if value > 0 else SILENCE_DB
+
+
+def measure_pcm(pcm):
+    """16bit PCM 바이트의 (RMS dBFS, 피크 dBFS) - 채널 구분 없이 전체 샘플 기준"""
+    import numpy as np  # 무거워서 워커 프로세스에서 처음 측정할 때 import (빠른 시작)
+    samples = np.frombuffer(pcm, dtype=np.int16)
+    if samples.size == 0:
+        return SILENCE_DB, SILENCE_DB
+    x = samples.astype(np.float64)
+    rms = math.sqrt(np.dot(x, x) / x.size) / 32768.0
+    peak = max(-int(samples.min()), int(samples.max())) / 32768.0
+    return round(to_db(rms), 2), round(to_db(peak), 2)
+
+
+def analyze_file(path):
+    """워커 프로세스: 파일 하나를 디코딩해서 음량 측정 ({'rms_db', 'peak_db'} 또는 실패시 None)"""
+    try:
+        pcm, _, _ = decode_pcm(path)
+    except Exception:
+        return None
+    rms_db, peak_db = measure_pcm(pcm)
+    return {'rms_db': rms_db, 'peak_db': peak_db}
+
+
+def gain_for(loudness, target_db=-20.0, max_gain_db=12.0):
+    """RMS를 target_db에 맞추는 선형 게인 (±max_gain_db 안에서, 피크가 PEAK_CEILING_DB를 넘지 않게)"""
+    if not loudness or loudness['rms_db'] <= SILENCE_DB:
+        return 1.0
+    gain_db = min(max(target_db - loudness['rms_db'], -max_gain_db), max_gain_db)
+    gain_db = min(gain_db, PEAK_CEILING_DB - loudness['peak_db'])
+    return 10.0 ** (gain_db / 20.0)
+
+
+class LoudnessAnalyzer(BatchJob):
+    """메타데이터 캐시에 음량이 없는 파일만 프로세스 풀에서 분석해 캐시에 저장"""
+
+    label = '음량 분석'
+    thread_name = 'aha-loudness'
+    task = analyze_file
+
+    def __init__(self, metadata_cache, workers=0):
+        super().__init__(workers)
+        self.metadata_cache = metadata_cache
+        self._warned = False
+
+    def available(self):
+        """numpy가 없으면 분석하지 않음 (경고는 한 번만, import하지 않고 설치 여부만 확인)"""
+        supported = importlib.util.find_spec('numpy') is not None
+        if not supported and not self._warned:
+            self._warned = True
+            logs.library.warning("-- numpy 없음: 음량 분석을 건너뜁니다 (pip install numpy)")
+        return supported
+
+    def pending(self, paths):
+        """캐시에 음량이 없는 파일 (중복 제거, 순서 유지)"""
+        return [path for path in dict.fromkeys(paths) if self.metadata_cache.get(path, LOUDNESS_FIELD) is None]
+
+    def store(self, path, result):
+        self.metadata_cache.update(path, **{LOUDNESS_FIELD: result})
+
+    def finish(self):
+        self.metadata_cache.save()
+
+
+def main():
+    """aha.toml의 반응 폴더 전체를 분석해서 .aha_cache/metadata.json에 저장"""
+    import argparse
+
+    from aha_reaction_program.audio_meta import MetadataCache
+    from aha_reaction_program.config import DEFAULT_CONFIG_PATH, load_config
+    from aha_reaction_program.library import scan_folder
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--config', default=os.environ.get('AHA_CONFIG', DEFAULT_CONFIG_PATH))
+    parser.add_argument('--workers', type=int, default=0, help='분석 프로세스 수 (0이면 CPU 코어 수)')
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    logs.configure(**config['log'])
+    settings = config['loudness']
+    files = [file for folder in config['folders'].values() for file in sorted(scan_folder(folder['folder'].rstrip('/')))]
+    metadata_cache = MetadataCache()
+    analyzer = LoudnessAnalyzer(metadata_cache, workers=args.workers or settings['workers'])
+    analyzer.run(files)
+    for file in files:
+        loudness = metadata_cache.get(file, LOUDNESS_FIELD)
+        if loudness:
+            gain = gain_for(loudness, settings['target_db'], settings['max_gain_db'])
+            print(f"{loudness['rms_db']:7.1f} dBFS  피크 {loudness['peak_db']:6.1f}  게인 {to_db(gain):+5.1f} dB  {file}")
+    logs.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""타이핑 패턴 매칭 엔진 (Aho-Corasick 오토마톤)"""
+
+from collections import deque
+
+# 매칭 우선순위 정책
+#   priority: 폴더 순서 → 패턴 순서 (기존 endswith 루프와 동일한 결과)
+#   longest : 가장 긴 패턴 우선, 길이가 같으면 priority 순서
+POLICY_PRIORITY = 'priority'
+POLICY_LONGEST = 'longest'
+POLICIES = (POLICY_PRIORITY, POLICY_LONGEST)
+
+
+class PatternMatcher:
+    """폴더별 패턴을 한 번 컴파일해서 키 입력마다 상태 하나만 전이시키는 매처"""
+
+    def __init__(self, folder_patterns, policy=POLICY_PRIORITY):
+        if policy not in POLICIES:
+            raise ValueError(f"지원하지 않는 매칭 정책: {policy} (가능: {', '.join(POLICIES)})")
+        self.policy = policy
+
+        # 상태별 전이 테이블 / 실패 링크 / 출력(매칭된 (folder_key, pattern) 목록)
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [[]]
+        self._state = 0
+        self.pattern_count = 0
+
+        for folder_index, (folder_key, patterns) in enumerate(folder_patterns):
+            seen = set()
+            for pattern_index, pattern in enumerate(patterns):
+                if not pattern or pattern in seen:  # 빈 패턴/중복 패턴은 무시
+                    continue
+                seen.add(pattern)
+                self._add(pattern, (folder_index, pattern_index, folder_key))
+                self.pattern_count += 1
+
+        self._build()
+
+    @classmethod
+    def from_sound_folders(cls, sound_folders, policy=POLICY_PRIORITY):
+        """sound_folders 딕셔너리(순서 = 우선순위)에서 매처 생성"""
+        return cls(
+            [(folder_key, folder_info['patterns']) for folder_key, folder_info in sound_folders.items()],
+            policy=policy,
+        )
+
+    @property
+    def state_count(self):
+        return len(self._goto)
+
+    def _add(self, pattern, rank):
+        """트라이에 패턴 하나 추가"""
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+                self._goto[state][ch] = next_state
+            state = next_state
+        self._outputs[state].append((rank, pattern))
+
+    def _build(self):
+        """BFS로 실패 링크를 만들고 상태별 출력 목록을 정책 순서대로 정렬"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in list(self._goto[state].items()):
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                # 접미사 상태의 출력은 BFS 순서상 이미 완성되어 있음
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+        if self.policy == POLICY_LONGEST:
+            def sort_key(item):
+                (folder_index, pattern_index, _), pattern = item
+                return (-len(pattern), folder_index, pattern_index)
+        else:
+            def sort_key(item):
+                return item[0][:2]
+
+        self._outputs = [
+            tuple((rank[2], pattern) for rank, pattern in sorted(outputs, key=sort_key))
+            for outputs in self._outputs
+        ]
+
+    def _transition(self, state, ch):
+        """실패 링크를 따라 전이 계산 후 결과를 캐시 (이후 같은 전이는 dict 조회 1번)"""
+        origin = state
+        while state and ch not in self._goto[state]:
+            state = self._fail[state]
+        target = self._goto[state].get(ch, 0)
+        self._goto[origin][ch] = target
+        return target
+
+    def feed(self, ch):
+        """문자 하나를 입력하고, 현재 위치에서 끝나는 매칭들을 정책 순서대로 반환"""
+        next_state = self._goto[self._state].get(ch)
+        if next_state is None:
+            next_state = self._transition(self._state, ch)
+        self._state = next_state
+        return self._outputs[next_state]
+
+    def reset(self):
+        """입력 상태 초기화"""
+        self._state = 0
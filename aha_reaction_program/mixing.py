@@ -0,0 +1,263 @@
+"""NumPy 믹싱 엔진: 반응 사운드를 블록 단위로 합쳐 출력 채널 하나로 스트리밍 + 배경음악 ducking
+
+채널마다 Sound를 재생하는 대신, 재생 중인 목소리(voice)를 모두 더한 블록을
+출력 채널에 queue()로 이어 붙인다. 배경음악은 백엔드 music 스트림이 그대로 재생하고,
+반응이 재생되는 동안 일시정지하지 않고 블록마다 볼륨을 부드럽게 낮추고(ducking), 반응이 모두 끝나면 다시 올린다.
+
+ChannelManager와 같은 인터페이스(play, stop_folder, stop_all, stats, plays/dropped/stolen)와
+pygame.mixer.music과 같은 모양의 music 객체를 제공하므로 그대로 바꿔 끼울 수 있다.
+"""
+
+import threading
+import time
+from collections import Counter
+
+try:
+    import numpy as np
+    NUMPY_SUPPORT = True
+except ImportError:
+    np = None
+    NUMPY_SUPPORT = False
+
+# 목소리 시작/정지 때 클릭 잡음을 막는 짧은 램프 (ms)
+VOICE_RAMP_MS = 5
+
+
+def _ramp(current, target, frames, step):
+    """current → target으로 프레임당 step씩 움직이는 게인 (스칼라 또는 (frames, 1) 배열, 마지막 게인)"""
+    if current == target or frames == 0:
+        return np.float32(target), target
+    ramp_frames = int(abs(target - current) / step)
+    if ramp_frames == 0:
+        return np.float32(target), target
+    envelope = np.full(frames, target, dtype=np.float32)
+    n = min(frames, ramp_frames)
+    direction = 1.0 if target > current else -1.0
+    envelope[:n] = current + direction * step * np.arange(1, n + 1, dtype=np.float32)
+    return envelope[:, None], float(envelope[-1])
+
+
+def pcm_array(sound, channels):
+    """Sound의 16bit PCM 버퍼를 (프레임, 채널) int16 배열로 (복사 없음)"""
+    return np.frombuffer(memoryview(sound).cast('B'), dtype=np.int16).reshape(-1, channels)
+
+
+class _Voice:
+    __slots__ = ('folder_key', 'sound', 'pcm', 'position', 'gain', 'target', 'started_at')
+
+    def __init__(self, folder_key, sound, pcm, volume):
+        self.folder_key = folder_key
+        self.sound = sound  # pcm이 참조하는 버퍼 유지
+        self.pcm = pcm
+        self.position = 0
+        self.gain = 0.0
+        self.target = volume
+        self.started_at = time.monotonic()
+
+
+class EngineMusic:
+    """엔진이 볼륨을 조절하는 배경음악 (pygame.mixer.music과 같은 메서드)
+
+    곡 전체를 메모리에 디코딩하지 않도록 재생은 백엔드 music 스트림에 맡기고 (조금씩 디코딩하며 재생),
+    엔진은 블록마다 ducking 배율만 바꿔 스트림 볼륨에 반영한다.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.stream = engine.backend.music
+        self.volume = 1.0
+        self.gain = 1.0  # ducking 배율 (엔진 lock 안에서 변경)
+
+    def load(self, path):
+        self.stream.load(path)
+
+    def queue(self, path, namehint='', loops=0):
+        """현재 곡이 끝나면 이어서 재생할 곡"""
+        self.stream.queue(path, namehint, loops)
+
+    def play(self, loops=0, start=0.0, fade_ms=0):
+        with self.engine.lock:
+            self._apply()
+        self.stream.play(loops, start, fade_ms)
+
+    def pause(self):
+        self.stream.pause()
+
+    def unpause(self):
+        self.stream.unpause()
+
+    def stop(self):
+        self.stream.stop()
+
+    def get_pos(self):
+        return self.stream.get_pos()
+
+    def get_busy(self):
+        return self.stream.get_busy()
+
+    def set_volume(self, volume):
+        with self.engine.lock:
+            self.volume = volume
+            self._apply()
+
+    def get_volume(self):
+        return self.volume
+
+    def duck(self, target, step):
+        """ducking 배율을 target 쪽으로 step만큼 옮김 (엔진 lock 안에서 호출)"""
+        if self.gain == target:
+            return
+        if self.gain < target:
+            self.gain = min(target, self.gain + step)
+        else:
+            self.gain = max(target, self.gain - step)
+        self._apply()
+
+    def _apply(self):
+        self.stream.set_volume(self.volume * self.gain)
+
+
+class MixingEngine:
+    """재생 중인 목소리를 float32로 합산해 block_ms 단위 블록으로 출력 채널 하나에 스트리밍"""
+
+    def __init__(self, backend, block_ms=10, duck_gain=0.3, duck_ramp_ms=150, duck_hold_ms=300, max_voices=32):
+        if not NUMPY_SUPPORT:
+            raise RuntimeError("numpy가 없어 믹싱 엔진을 사용할 수 없습니다 (pip install numpy)")
+        self.backend = backend
+        self.frequency, size, self.channels = backend.get_init()
+        if size != -16:
+            raise ValueError(f"믹싱 엔진은 16bit 믹서 형식만 지원합니다 (현재 {size})")
+        self.block_frames = max(64, int(self.frequency * block_ms / 1000))
+        self.duck_gain = duck_gain  # 반응 재생 중 배경음악 볼륨 배율
+        self.max_voices = max_voices
+        self.voice_step = 1.0 / max(1, self.frequency * VOICE_RAMP_MS / 1000)
+        self.duck_step = 1.0 / max(1, self.frequency * duck_ramp_ms / 1000)
+        # 구간 사이의 짧은 공백(0.1초)마다 배경음악이 올라갔다 내려가지 않도록 유지하는 시간
+        self.duck_hold_frames = int(self.frequency * duck_hold_ms / 1000)
+        self._duck_remaining = 0
+
+        backend.set_num_channels(1)
+        backend.set_reserved(1)  # 출력 채널은 Sound.play() 자동 할당이 건드리지 못하게
+        self.output = backend.Channel(0)
+
+        self.lock = threading.Lock()
+        self.music = EngineMusic(self)
+        self._voices = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.plays = Counter()
+        self.dropped = Counter()  # 믹싱 엔진은 드롭하지 않음 (인터페이스 호환용)
+        self.stolen = Counter()  # max_voices를 넘어서 밀려난 목소리 (폴더별)
+        self.blocks = 0
+        self.underruns = 0  # 출력 채널이 비어 있을 때 블록을 채운 횟수 (처음 시작 포함)
+        self.render_time_ns = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._pump, name='aha-mixer', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.output.stop()
+
+    def wake(self):
+        self._wake.set()
+
+    def play(self, folder_key, sound, **kwargs):
+        """Sound의 PCM을 목소리로 추가 (볼륨은 Sound.get_volume())"""
+        voice = _Voice(folder_key, sound, pcm_array(sound, self.channels), sound.get_volume())
+        with self.lock:
+            if len(self._voices) >= self.max_voices:
+                oldest = min(self._voices, key=lambda v: v.started_at)
+                self._voices.remove(oldest)
+                self.stolen[oldest.folder_key] += 1
+            self._voices.append(voice)
+            self.plays[folder_key] += 1
+        self._wake.set()
+        return self.output
+
+    def stop_folder(self, folder_key):
+        """해당 폴더 목소리를 짧게 페이드 아웃 (다른 폴더는 유지)"""
+        with self.lock:
+            for voice in self._voices:
+                if voice.folder_key == folder_key:
+                    voice.target = 0.0
+
+    def stop_all(self):
+        with self.lock:
+            for voice in self._voices:
+                voice.target = 0.0
+
+    def active(self):
+        """소리를 낼 목소리가 있거나 배경음악 볼륨을 옮기는 중인지"""
+        return bool(self._voices) or self._duck_remaining > 0 or self.music.gain != 1.0
+
+    def render(self, frames):
+        """다음 frames 프레임을 합성한 int16 PCM 바이트"""
+        started = time.perf_counter_ns()
+        mix = np.zeros((frames, self.channels), dtype=np.float32)
+        with self.lock:
+            reacting = False
+            finished = []
+            for voice in self._voices:
+                chunk = voice.pcm[voice.position:voice.position + frames]
+                n = len(chunk)
+                envelope, voice.gain = _ramp(voice.gain, voice.target, n, self.voice_step)
+                if n:
+                    mix[:n] += chunk * envelope
+                voice.position += n
+                if voice.position >= len(voice.pcm) or (voice.target == 0.0 and voice.gain == 0.0):
+                    finished.append(voice)
+                elif voice.target > 0.0:
+                    reacting = True
+            for voice in finished:
+                self._voices.remove(voice)
+
+            # 배경음악: 반응이 있으면 duck_gain까지 천천히 낮추고, 끝나고 duck_hold_ms 뒤 다시 올림
+            if reacting:
+                self._duck_remaining = self.duck_hold_frames
+            else:
+                self._duck_remaining = max(0, self._duck_remaining - frames)
+            self.music.duck(self.duck_gain if reacting or self._duck_remaining > 0 else 1.0, frames * self.duck_step)
+
+        np.clip(mix, -32768, 32767, out=mix)
+        self.blocks += 1
+        self.render_time_ns += time.perf_counter_ns() - started
+        return mix.astype(np.int16).tobytes()
+
+    def _pump(self):
+        """출력 채널에 재생 중 블록 1개 + 대기 블록 1개를 유지 (할 일이 없으면 잠듦)"""
+        interval = self.block_frames / self.frequency / 4
+        while not self._stop.is_set():
+            if not self.active():
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            if self.output.get_queue() is None:
+                if not self.output.get_busy():
+                    self.underruns += 1
+                block = self.backend.sound_from_buffer(self.render(self.block_frames))
+                self.output.queue(block)
+                continue  # 채널이 비어 있었으면 바로 다음 블록도 대기열에
+            self._wake.wait(interval)
+            self._wake.clear()
+
+    def stats(self):
+        """ChannelManager.stats()와 같은 키 + 블록 렌더링 통계"""
+        with self.lock:
+            busy = len(self._voices)
+        return {
+            'channels': 1,
+            'busy': busy,
+            'plays': dict(self.plays),
+            'dropped': dict(self.dropped),
+            'stolen': dict(self.stolen),
+            'blocks': self.blocks,
+            'underruns': self.underruns,
+            'render_us_per_block': round(self.render_time_ns / self.blocks / 1000, 2) if self.blocks else 0.0,
+        }
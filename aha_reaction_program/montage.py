@@ -0,0 +1,190 @@
+"""미리 섞어 둔 반응 몽타주: 패턴이 매칭되면 준비된 버퍼 하나만 재생
+
+구간 재생 방식은 반응마다 파일 선택 → 길이 확인 → 로드 → 재생 → 1~3초 대기 → 정지 → 0.1초 대기를
+반복한다. MontageRenderer는 백그라운드 스레드에서 폴더마다 기본 재생 시간 길이의 몽타주
+(임의 파일의 임의 구간을 짧은 크로스페이드로 이어 붙인 것)를 pool_size개씩 numpy로 미리 만들어 둔다.
+반응을 시작하면 하나를 꺼내 재생하고, 연장되어 몽타주가 끝나도 반응이 남아 있으면 다음 몽타주를 이어서 재생한다.
+꺼내 쓴 만큼은 재생 경로 밖에서 다시 채운다.
+"""
+
+import random
+import threading
+import time
+from collections import Counter, deque
+
+from aha_reaction_program import logs
+from aha_reaction_program.mixing import NUMPY_SUPPORT, np
+
+# 구간 길이 (초) - 구간 재생 방식과 같은 범위
+SEGMENT_MIN = 1.0
+SEGMENT_MAX = 3.0
+
+
+def render_montage(clips, frequency, channels, duration, crossfade_ms=30):
+    """(int16 (프레임, 채널) 배열, 게인) 구간들을 크로스페이드로 이어 duration초 int16 PCM 바이트로
+
+    구간마다 앞뒤를 crossfade_ms만큼 선형으로 줄이고, 다음 구간은 앞 구간의 페이드 아웃과 겹쳐서 시작.
+    clips는 필요한 만큼 꺼내 쓰는 이터레이터 (끝나면 남은 부분은 무음).
+    """
+    total = int(duration * frequency)
+    fade_frames = int(frequency * crossfade_ms / 1000)
+    mix = np.zeros((total, channels), dtype=np.float32)
+    position = 0
+    for pcm, gain in clips:
+        if position >= total:
+            break
+        n = min(len(pcm), total - position)
+        if n == 0:
+            continue
+        chunk = pcm[:n].astype(np.float32)
+        chunk *= gain
+        fade = min(fade_frames, n // 2)
+        if fade:
+            ramp = np.linspace(0.0, 1.0, fade, endpoint=False, dtype=np.float32)[:, None]
+            chunk[:fade] *= ramp
+            chunk[n - fade:] *= ramp[::-1]
+        mix[position:position + n] += chunk
+        position += max(1, n - fade)
+    np.clip(mix, -32768, 32767, out=mix)
+    return mix.astype(np.int16).tobytes()
+
+
+class MontageRenderer:
+    """폴더별 몽타주 Sound를 pool_size개씩 유지하는 백그라운드 렌더러
+
+    folders: 호출하면 {folder_key: 파일 목록}을 반환 (설정/라이브러리 변경이 바로 반영되도록)
+    pcm_view: 파일 → 믹서 형식 PCM memoryview (사운드 캐시/뱅크)
+    gain: 파일 → 음량 정규화 게인
+    """
+
+    def __init__(self, backend, folders, pcm_view, gain=None, duration=5.0, pool_size=2, crossfade_ms=30, rng=None):
+        if not NUMPY_SUPPORT:
+            raise RuntimeError("numpy가 없어 몽타주를 만들 수 없습니다 (pip install numpy)")
+        self.backend = backend
+        self.folders = folders
+        self.pcm_view = pcm_view
+        self.gain = gain or (lambda file: 1.0)
+        self.duration = duration
+        self.pool_size = pool_size
+        self.crossfade_ms = crossfade_ms
+        self.rng = rng or random.Random()
+        self._pools = {}  # {folder_key: deque[(generation, Sound)]}
+        self._generation = Counter()  # invalidate() 이후 렌더링이 끝난 이전 몽타주는 버림
+        self._failed = {}  # {folder_key: 렌더링 실패 시각} 잠시 건너뜀
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.rendered = 0
+        self.render_time_ns = 0
+        self.hits = Counter()
+        self.misses = Counter()  # 준비된 몽타주가 없어 구간 재생으로 대체한 횟수
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='aha-montage', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def take(self, folder_key):
+        """준비된 몽타주 하나 (없으면 None), 빈자리는 백그라운드에서 다시 채움"""
+        pool = self._pools.get(folder_key)
+        while pool:
+            generation, sound = pool.popleft()
+            if generation == self._generation[folder_key]:
+                self.hits[folder_key] += 1
+                self._wake.set()
+                return sound
+        self.misses[folder_key] += 1
+        self._wake.set()
+        return None
+
+    def invalidate(self, folder_key=None):
+        """폴더(없으면 전체)의 몽타주를 버리고 새로 만들기 (파일/설정 변경 후)"""
+        keys = [folder_key] if folder_key is not None else list(self._pools)
+        for key in keys:
+            self._generation[key] += 1
+            self._pools.pop(key, None)
+            self._failed.pop(key, None)
+        self._wake.set()
+
+    def ready(self):
+        return {folder_key: len(pool) for folder_key, pool in self._pools.items()}
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not self._refill_one():
+                self._wake.wait(1.0)
+                self._wake.clear()
+
+    def _refill_one(self):
+        """몽타주가 가장 적은 폴더 하나를 채움 (채울 곳이 없으면 False)"""
+        now = time.monotonic()
+        candidates = []
+        for folder_key, files in self.folders().items():
+            if not files or now - self._failed.get(folder_key, -60.0) < 30.0:
+                continue
+            count = len(self._pools.get(folder_key, ()))
+            if count < self.pool_size:
+                candidates.append((count, folder_key, files))
+        if not candidates:
+            return False
+        _, folder_key, files = min(candidates, key=lambda candidate: candidate[0])
+        generation = self._generation[folder_key]
+        started = time.perf_counter_ns()
+        try:
+            sound = self.render(files)
+        except Exception as e:
+            logs.playback.error("%s 몽타주 렌더링 오류: %s", folder_key, e)
+            self._failed[folder_key] = now
+            return True
+        self.render_time_ns += time.perf_counter_ns() - started
+        self.rendered += 1
+        if generation == self._generation[folder_key]:
+            self._pools.setdefault(folder_key, deque()).append((generation, sound))
+        return True
+
+    def _clips(self, files, frequency, channels):
+        """임의 파일의 임의 구간 (int16 배열, 게인) - 같은 파일이 연달아 나오지 않게"""
+        last = None
+        failures = 0
+        while failures < 8:
+            file = self.rng.choice(files)
+            if file == last and len(files) > 1:
+                continue
+            try:
+                pcm = np.frombuffer(self.pcm_view(file), dtype=np.int16).reshape(-1, channels)
+            except Exception as e:
+                failures += 1
+                logs.playback.warning("-- 몽타주에 쓸 수 없는 파일 (%s): %s", file, e)
+                continue
+            if len(pcm) == 0:  # 빈 구간만 나오는 파일도 실패로 세어야 렌더링이 끝남
+                failures += 1
+                continue
+            last = file
+            file_duration = len(pcm) / frequency
+            # 구간 재생과 같은 규칙: 최소 2초는 남기고 시작 지점 선택, 1~3초 재생
+            start = self.rng.uniform(0, file_duration - 2.0) if file_duration > 2.0 else 0.0
+            length = self.rng.uniform(SEGMENT_MIN, SEGMENT_MAX)
+            start_frame = int(start * frequency)
+            yield pcm[start_frame:start_frame + int(length * frequency)], self.gain(file)
+        raise RuntimeError("몽타주에 쓸 수 있는 파일이 없습니다")
+
+    def render(self, files):
+        """몽타주 하나를 만들어 Sound로"""
+        frequency, size, channels = self.backend.get_init()
+        if size != -16:
+            raise ValueError(f"몽타주는 16bit 믹서 형식만 지원합니다 (현재 {size})")
+        pcm = render_montage(self._clips(list(files), frequency, channels), frequency, channels,
+                             self.duration, self.crossfade_ms)
+        return self.backend.sound_from_buffer(pcm)
+
+    def stats(self):
+        return {
+            'rendered': self.rendered,
+            'ready': self.ready(),
+            'hits': dict(self.hits),
+            'misses': dict(self.misses),
+            'render_ms_per_montage': round(self.render_time_ns / self.rendered / 1e6, 2) if self.rendered else 0.0,
+        }
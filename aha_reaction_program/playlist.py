@@ -0,0 +1,69 @@
+"""배경음악 플레이리스트: 반복 없는 셔플 + 다음 곡 미리 읽기"""
+
+import random
+
+# 미리 읽기 청크 크기 (긴 파일도 한 번에 메모리에 올리지 않음)
+PREFETCH_CHUNK = 1024 * 1024
+
+
+class ShuffleBag:
+    """모든 곡을 한 번씩 재생한 뒤 다시 섞음 (한 바퀴 안에서 반복 없음, 바퀴 경계에서도 직전 곡 바로 반복 안 함)
+
+    next()는 O(1), 다시 섞을 때만 O(n)이라 큰 라이브러리에서도 곡 전환 비용이 일정함.
+    """
+
+    def __init__(self, items=(), rng=None):
+        self.rng = rng or random.Random()
+        self.items = []
+        self._members = set()
+        self._remaining = []  # 이번 바퀴에 남은 곡 (끝에서부터 꺼냄)
+        self.last = None
+        self.add(items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, items):
+        """새 곡은 이번 바퀴의 남은 순서 중 임의 위치에 끼워 넣음"""
+        for item in items:
+            if item in self._members:
+                continue
+            self.items.append(item)
+            self._members.add(item)
+            self._remaining.insert(self.rng.randint(0, len(self._remaining)), item)
+
+    def remove(self, items):
+        removed = set(items) & self._members
+        if not removed:
+            return
+        self._members -= removed
+        self.items = [item for item in self.items if item not in removed]
+        self._remaining = [item for item in self._remaining if item not in removed]
+
+    def _refill(self):
+        self._remaining = list(self.items)
+        self.rng.shuffle(self._remaining)
+        # 다음에 꺼낼 곡(리스트 끝)이 방금 재생한 곡이면 다른 위치와 교환
+        if len(self._remaining) > 1 and self._remaining[-1] == self.last:
+            index = self.rng.randrange(len(self._remaining) - 1)
+            self._remaining[index], self._remaining[-1] = self._remaining[-1], self._remaining[index]
+
+    def next(self):
+        """다음 곡 (곡이 없으면 None)"""
+        if not self._remaining:
+            if not self.items:
+                return None
+            self._refill()
+        self.last = self._remaining.pop()
+        return self.last
+
+
+def prefetch_file(path, chunk_size=PREFETCH_CHUNK):
+    """파일을 청크 단위로 읽어 OS 페이지 캐시에 올림 (곡 전환 때 디스크 대기 없이 열리도록), 읽은 바이트 수"""
+    total = 0
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return total
+            total += len(chunk)
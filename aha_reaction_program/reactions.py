@@ -0,0 +1,62 @@
+"""폴더별 반응 재생 상태"""
+
+import time
+
+# 반응 기본 재생 시간 (초)
+BASE_DURATION = 5.0
+# 같은 폴더 반응이 이 시간(초)보다 빨리 다시 오면 연장하지 않고 새로 시작
+MIN_EXTEND_INTERVAL = 0.5
+
+
+class Reaction:
+    """폴더 하나의 진행 중인 반응 (스케줄러 스레드에서만 변경)"""
+
+    def __init__(self, folder_key, sound_files, emoji, volume, base_duration=BASE_DURATION):
+        self.folder_key = folder_key
+        self.sound_files = sound_files
+        self.emoji = emoji
+        self.volume = volume
+        self.base_duration = base_duration
+        self.start_time = time.time()
+        self.last_reaction_time = self.start_time  # 마지막 반응(연장) 시점
+        self.last_trigger = None  # 마지막 반응(연장)을 만든 키 입력 시각 (단조 시계 초, 트리거 합치기와 같은 기준)
+        self.extend_seconds = 0.0
+        self.next_step = None  # 다음에 실행될 ScheduledCall
+        self.trigger_ns = None  # 반응을 시작한 키 입력 시각 (perf_counter_ns, 첫 구간 재생 후 None)
+        self.segment_end = 0.0  # 재생 중인 몽타주가 끝나는 시각 (time.time())
+        self.stopped = False
+
+    @property
+    def total_duration(self):
+        return self.base_duration + self.extend_seconds
+
+    def elapsed(self, now=None):
+        return (now or time.time()) - self.start_time
+
+    def remaining(self, now=None):
+        return self.total_duration - self.elapsed(now)
+
+    def try_extend(self, now=None, min_interval=MIN_EXTEND_INTERVAL, trigger=None):
+        """직전 반응 시점부터의 경과 시간만큼 연장 (너무 빠르면 None)
+
+        trigger(키 입력 시각)가 있으면 최소 간격은 직전 트리거의 키 입력 시각부터 잰다
+        (스케줄러가 처리한 시각으로 재면 큐 지연에 따라 합치기를 통과한 트리거도 간격이 줄어들 수 있음).
+        """
+        now = now or time.time()
+        elapsed_since_last = now - self.last_reaction_time
+        if trigger is not None and self.last_trigger is not None:
+            interval = trigger - self.last_trigger
+        else:
+            interval = elapsed_since_last
+        if interval < min_interval:
+            return None
+        self.extend_seconds += max(0.0, elapsed_since_last)
+        self.last_reaction_time = now
+        if trigger is not None:
+            self.last_trigger = trigger
+        return elapsed_since_last
+
+    def cancel_next_step(self):
+        if self.next_step is not None:
+            self.next_step.cancel()
+            self.next_step = None
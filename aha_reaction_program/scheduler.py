@@ -0,0 +1,130 @@
+"""힙 기반 타이머 스레드 하나로 모든 재생 이벤트를 처리하는 스케줄러"""
+
+import heapq
+import itertools
+import threading
+import time
+
+from aha_reaction_program import logs
+from aha_reaction_program.stats import LatencyHistogram
+
+
+class ScheduledCall:
+    """예약된 호출 하나 (cancel()로 취소 가능)"""
+
+    __slots__ = ('deadline', 'callback', 'args', 'cancelled')
+
+    def __init__(self, deadline, callback, args):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Scheduler:
+    """이벤트(call_soon)와 타이머(call_later)를 단일 스레드에서 순서대로 실행
+
+    콜백은 모두 같은 스레드에서 실행되므로 콜백끼리 공유하는 상태에는 락이 필요 없음.
+    다음 예약 시각까지 Condition.wait로 잠들어 있어서 폴링 없이 깨어남.
+    """
+
+    def __init__(self, name='aha-scheduler'):
+        self.name = name
+        self._heap = []
+        self._counter = itertools.count()  # 같은 시각이면 등록 순서대로
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+        self.lag = LatencyHistogram('스케줄러 지연')  # 예약 시각 → 실제 실행 시작
+
+    def start(self):
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        """스케줄러 정지 (남은 예약은 버림)"""
+        with self._condition:
+            self._running = False
+            self._heap.clear()
+            self._condition.notify()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    @property
+    def running(self):
+        return self._running
+
+    def in_scheduler_thread(self):
+        return threading.current_thread() is self._thread
+
+    def call_at(self, deadline, callback, *args):
+        """time.monotonic() 기준 deadline에 callback 실행 예약"""
+        call = ScheduledCall(deadline, callback, args)
+        with self._condition:
+            heapq.heappush(self._heap, (deadline, next(self._counter), call))
+            # 가장 이른 예약이 바뀌었을 때만 깨움
+            if self._heap[0][2] is call:
+                self._condition.notify()
+        return call
+
+    def call_later(self, delay, callback, *args):
+        return self.call_at(time.monotonic() + max(0.0, delay), callback, *args)
+
+    def call_soon(self, callback, *args):
+        """이벤트 처리: 가능한 빨리 스케줄러 스레드에서 실행"""
+        return self.call_at(time.monotonic(), callback, *args)
+
+    def call_and_wait(self, callback, *args, timeout=2.0):
+        """callback을 스케줄러 스레드에서 실행하고 결과 반환 (다른 스레드에서 스케줄러 상태를 읽을 때)
+
+        스케줄러 스레드 안이거나 정지된 뒤면 바로 실행. timeout 안에 실행되지 않으면 TimeoutError.
+        """
+        if not self._running or self.in_scheduler_thread():
+            return callback(*args)
+        done = threading.Event()
+        outcome = {}
+
+        def run():
+            try:
+                outcome['result'] = callback(*args)
+            except Exception as e:
+                outcome['error'] = e
+            finally:
+                done.set()
+
+        self.call_soon(run)
+        if not done.wait(timeout):
+            raise TimeoutError(f"스케줄러가 {timeout:g}초 안에 응답하지 않았습니다")
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome['result']
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running:
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+                    timeout = self._heap[0][0] - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    self._condition.wait(timeout)
+                if not self._running:
+                    return
+                _, _, call = heapq.heappop(self._heap)
+
+            if call.cancelled:
+                continue
+            self.lag.record(int((time.monotonic() - call.deadline) * 1e9))
+            try:
+                call.callback(*call.args)
+            except Exception as e:
+                logs.app.error("스케줄러 작업 오류 (%s): %s", getattr(call.callback, '__name__', call.callback), e)
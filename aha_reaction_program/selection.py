@@ -0,0 +1,187 @@
+"""폴더별 반응 파일 선택: 가중치 + 최근 재생 반복 방지 + alias 방법 O(1) 샘플링
+
+random.choice()는 같은 파일이 연달아 나오기 쉽고 좋은 파일을 더 자주 고를 방법이 없다.
+ClipSelector는 파일마다 가중치(설정의 파일 이름 패턴, 재생 기록)를 두고 Vose alias 테이블로 뽑으며,
+최근 recent개 안에 재생한 파일은 다시 뽑는다. 파일 수가 수만 개여도 한 번 뽑는 비용은 일정하다.
+
+라이브러리 변경은 테이블을 바로 다시 만들지 않고 추가분/삭제분만 따로 들고 있다가
+변경이 쌓이면(전체의 1/8) 한 번에 다시 만든다 (분할 상환 O(1)).
+"""
+
+import fnmatch
+import math
+import os
+import random
+from collections import deque
+
+# 최근 재생 파일을 다시 뽑는 최대 횟수 (넘으면 남은 파일 중에서 직접 고름)
+MAX_REJECTS = 16
+# 추가/삭제가 이만큼(최소값) 또는 전체의 1/REBUILD_RATIO를 넘으면 테이블을 다시 만듦
+MIN_REBUILD = 16
+REBUILD_RATIO = 8
+
+
+class AliasTable:
+    """Vose alias 방법: 만들기 O(n), 뽑기 O(1) (난수 2개)"""
+
+    __slots__ = ('prob', 'alias')
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = float(sum(weights))
+        self.prob = [0.0] * n
+        self.alias = list(range(n))
+        if n == 0 or total <= 0:
+            self.prob = [1.0] * n
+            return
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, g = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = g
+            scaled[g] -= 1.0 - scaled[s]
+            (small if scaled[g] < 1.0 else large).append(g)
+        for i in small + large:  # 부동소수 오차로 남은 것은 확률 1
+            self.prob[i] = 1.0
+
+    def __len__(self):
+        return len(self.prob)
+
+    def sample(self, rng):
+        i = rng.randrange(len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+
+def weight_function(patterns=None, plays=None, history=0.0):
+    """파일 → 가중치 함수: 설정 패턴 {파일 이름 glob: 배율} × 재생 기록 배율 (1 + 재생 횟수)^-history
+
+    history > 0이면 적게 재생된 파일을 더 자주 고름 (0이면 재생 기록 무시).
+    """
+    def weight_of(file):
+        weight = 1.0
+        if patterns:
+            name = os.path.basename(file)
+            for pattern, factor in patterns.items():
+                if fnmatch.fnmatchcase(name, pattern):
+                    weight *= factor
+        if history and plays is not None:
+            weight *= (1 + (plays(file) or 0)) ** -history
+        return weight
+    return weight_of
+
+
+class ClipSelector:
+    """폴더 하나의 파일 선택기 (스케줄러 스레드에서만 사용)"""
+
+    def __init__(self, files=(), weight_of=None, recent=3, rng=None):
+        self.rng = rng or random  # 전역 random.seed()로 재현 가능 (벤치마크)
+        self.recent = recent
+        self.weight_of = weight_of or (lambda file: 1.0)
+        self._recent = deque()
+        files = list(dict.fromkeys(files))
+        self._rebuild(files, [self.weight_of(file) for file in files])
+
+    def _rebuild(self, items, weights):
+        self.items = items
+        self.weights = weights
+        self._index = {item: i for i, item in enumerate(items)}
+        self._table = AliasTable(weights)
+        self._table_total = math.fsum(weights)
+        self._removed = set()  # 테이블에는 남아 있지만 지워진 파일 (뽑히면 다시 뽑음)
+        self._removed_total = 0.0
+        self._extra = []  # 테이블을 만든 뒤 추가된 파일 (가중치 비례로 따로 뽑음)
+        self._extra_total = 0.0
+
+    def __len__(self):
+        return len(self._index)
+
+    def _live(self):
+        """삭제 표시를 뺀 (파일, 가중치) 목록"""
+        table_items = [(self.items[i], self.weights[i]) for i in range(len(self._table)) if i not in self._removed]
+        return table_items + [(self.items[i], self.weights[i]) for i in self._extra]
+
+    def _maybe_rebuild(self):
+        changes = len(self._extra) + len(self._removed)
+        if changes > max(MIN_REBUILD, len(self._index) // REBUILD_RATIO):
+            live = self._live()
+            self._rebuild([item for item, _ in live], [weight for _, weight in live])
+
+    def add(self, files):
+        for file in files:
+            if file in self._index:
+                continue
+            weight = self.weight_of(file)
+            self._index[file] = len(self.items)
+            self._extra.append(len(self.items))
+            self.items.append(file)
+            self.weights.append(weight)
+            self._extra_total += weight
+        self._maybe_rebuild()
+
+    def remove(self, files):
+        for file in files:
+            i = self._index.pop(file, None)
+            if i is None:
+                continue
+            if i < len(self._table):
+                self._removed.add(i)
+                self._removed_total += self.weights[i]
+            else:
+                self._extra.remove(i)
+                self._extra_total -= self.weights[i]
+        self._maybe_rebuild()
+
+    def _sample(self):
+        """가중치 비례로 파일 하나 (삭제된 파일은 다시 뽑음), 뽑을 파일이 없으면 None"""
+        table_total = self._table_total - self._removed_total
+        if self._extra and self.rng.random() * (table_total + self._extra_total) >= table_total:
+            point = self.rng.random() * self._extra_total
+            for i in self._extra:
+                point -= self.weights[i]
+                if point < 0:
+                    return self.items[i]
+            return self.items[self._extra[-1]]
+        for _ in range(MAX_REJECTS):
+            i = self._table.sample(self.rng)
+            if i not in self._removed:
+                return self.items[i]
+        return None
+
+    def _weighted_choice(self, exclude):
+        """최근 파일을 뺀 나머지에서 직접 고르기 (O(n), 작은 폴더에서 거절이 계속될 때만)"""
+        candidates = [(item, weight) for item, weight in self._live() if item not in exclude and weight > 0]
+        if not candidates:
+            candidates = [(item, weight) for item, weight in self._live() if item not in exclude]
+        if not candidates:
+            return None
+        point = self.rng.random() * math.fsum(weight for _, weight in candidates)
+        for item, weight in candidates:
+            point -= weight
+            if point < 0:
+                return item
+        return candidates[-1][0]
+
+    def next(self):
+        """다음 파일 (최근 recent개와 겹치지 않게), 파일이 없으면 None"""
+        count = len(self._index)
+        if count == 0:
+            return None
+        window = min(self.recent, count - 1)
+        while len(self._recent) > window:
+            self._recent.popleft()
+        choice = None
+        if window == 0:
+            choice = self._sample()
+        else:
+            for _ in range(MAX_REJECTS):
+                candidate = self._sample()
+                if candidate is not None and candidate not in self._recent:
+                    choice = candidate
+                    break
+        if choice is None:
+            choice = self._weighted_choice(set(self._recent))
+        if window:
+            self._recent.append(choice)
+        return choice
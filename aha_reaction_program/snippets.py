@@ -0,0 +1,41 @@
+"""디코딩된 PCM 버퍼에서 원하는 구간만 잘라 재생하는 스니펫 엔진"""
+
+
+class SnippetEngine:
+    """SoundPool의 Sound 버퍼(또는 사운드 뱅크의 mmap)를 memoryview로 잘라 구간 재생용 Sound 생성"""
+
+    def __init__(self, sound_pool, backend, banks=None):
+        self.sound_pool = sound_pool
+        self.backend = backend
+        self.banks = banks  # SoundBanks - 뱅크에 있는 파일은 디코딩/캐시 없이 mmap에서 바로
+
+    def frame_format(self):
+        """믹서 출력 형식: (샘플레이트, 프레임당 바이트 수)"""
+        frequency, size, channels = self.backend.get_init()
+        return frequency, channels * (abs(size) // 8)
+
+    def pcm_view(self, file_path):
+        """디코딩된 파일 전체 PCM의 바이트 단위 memoryview (복사 없음)"""
+        if self.banks is not None:
+            view = self.banks.pcm_view(file_path)
+            if view is not None:
+                return view
+        return memoryview(self.sound_pool.get(file_path)).cast('B')
+
+    def slice(self, file_path, start, duration):
+        """start초부터 duration초 구간의 Sound와 실제 (시작, 길이) 반환
+
+        구간 선택은 공유 버퍼의 memoryview 슬라이스라 복사/디코딩이 없고,
+        SDL은 Sound를 만들 때 잘린 구간(1~3초 분량)만 자체 버퍼로 가져감.
+        """
+        frequency, frame_bytes = self.frame_format()
+        view = self.pcm_view(file_path)
+        total_frames = view.nbytes // frame_bytes
+
+        # 프레임 경계에 맞춰 파일 범위 안으로 보정
+        start_frame = min(max(0, int(start * frequency)), max(0, total_frames - 1))
+        end_frame = min(total_frames, start_frame + max(1, int(duration * frequency)))
+        segment = view[start_frame * frame_bytes:end_frame * frame_bytes]
+
+        sound = self.backend.sound_from_buffer(segment)
+        return sound, start_frame / frequency, (end_frame - start_frame) / frequency
@@ -0,0 +1,126 @@
+"""디코딩된 pygame Sound 객체 LRU 캐시 (메모리 예산 기반)"""
+
+import os
+import threading
+from collections import OrderedDict
+
+from aha_reaction_program import logs
+from aha_reaction_program.audio_meta import load_pydub
+
+
+def load_sound(file_path):
+    """파일을 pygame Sound로 디코딩 (SDL이 못 읽는 형식은 pydub로 디코딩 후 변환)"""
+    import pygame
+    try:
+        return pygame.mixer.Sound(file_path)
+    except pygame.error:
+        AudioSegment = load_pydub()
+        if AudioSegment is None:
+            raise
+        # 믹서 출력 형식에 맞춰 변환 (예: m4a → 44.1kHz 16bit 스테레오 PCM)
+        frequency, size, channels = pygame.mixer.get_init()
+        segment = (AudioSegment.from_file(file_path)
+                   .set_frame_rate(frequency)
+                   .set_channels(channels)
+                   .set_sample_width(abs(size) // 8))
+        return pygame.mixer.Sound(buffer=segment.raw_data)
+
+
+def sound_nbytes(sound):
+    """Sound가 차지하는 PCM 바이트 수 (버퍼 복사 없이 계산)"""
+    return memoryview(sound).nbytes
+
+
+class SoundPool:
+    """파일당 한 번만 디코딩하고, 예산을 넘으면 가장 오래 안 쓴 Sound부터 제거"""
+
+    def __init__(self, budget_bytes=256 * 1024 * 1024, loader=load_sound):
+        self.budget_bytes = budget_bytes
+        self.loader = loader
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._sounds = OrderedDict()  # {file_path: (sound, nbytes)} 오래된 것부터
+        self._lock = threading.Lock()
+        self._warm_thread = None
+
+    def get(self, file_path):
+        """캐시된 Sound 반환 (없으면 디코딩 후 캐시)"""
+        with self._lock:
+            cached = self._sounds.get(file_path)
+            if cached is not None:
+                self._sounds.move_to_end(file_path)
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+
+        # 디코딩은 락 밖에서 (다른 폴더의 재생을 막지 않도록)
+        sound = self.loader(file_path)
+        self._insert(file_path, sound)
+        return sound
+
+    def _insert(self, file_path, sound):
+        """예산 안에 들어가도록 LRU 제거 후 추가 (예산보다 큰 파일은 캐시하지 않음)"""
+        nbytes = sound_nbytes(sound)
+        if nbytes > self.budget_bytes:
+            return
+        with self._lock:
+            if file_path in self._sounds:
+                return
+            while self._sounds and self.used_bytes + nbytes > self.budget_bytes:
+                _, (_, evicted_bytes) = self._sounds.popitem(last=False)
+                self.used_bytes -= evicted_bytes
+                self.evictions += 1
+            self._sounds[file_path] = (sound, nbytes)
+            self.used_bytes += nbytes
+
+    def contains(self, file_path):
+        with self._lock:
+            return file_path in self._sounds
+
+    def invalidate(self, file_path):
+        """파일 하나를 캐시에서 제거 (파일이 바뀌거나 삭제된 경우)"""
+        with self._lock:
+            cached = self._sounds.pop(file_path, None)
+            if cached is not None:
+                self.used_bytes -= cached[1]
+
+    def clear(self):
+        with self._lock:
+            self._sounds.clear()
+            self.used_bytes = 0
+
+    def warm(self, file_paths):
+        """백그라운드 스레드에서 미리 디코딩 (예산이 차면 중단)"""
+        def _warm():
+            loaded = 0
+            for file_path in file_paths:
+                if self.contains(file_path):
+                    continue
+                try:
+                    sound = self.loader(file_path)
+                except Exception as e:
+                    logs.library.error("사운드 미리 로드 오류 (%s): %s", os.path.basename(file_path), e)
+                    continue
+                if self.used_bytes + sound_nbytes(sound) > self.budget_bytes:
+                    break  # 이미 캐시된(최근 사용) 항목을 밀어내지 않음
+                self._insert(file_path, sound)
+                loaded += 1
+            logs.library.info(">> 사운드 미리 로드 완료: %d개 (%.1fMB)", loaded, self.used_bytes / (1024 * 1024))
+
+        self._warm_thread = threading.Thread(target=_warm, daemon=True)
+        self._warm_thread.start()
+        return self._warm_thread
+
+    def stats(self):
+        """적중/미스/제거 카운터와 메모리 사용량"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._sounds),
+                'used_bytes': self.used_bytes,
+                'budget_bytes': self.budget_bytes,
+            }
@@ -0,0 +1,263 @@
+"""폴더별 사운드 뱅크: 폴더의 모든 PCM을 파일 하나에 모아 두고 mmap으로 열기 (.aha_cache/banks)
+
+파일이 수천 개인 폴더도 뱅크 하나만 열면 되고, 디코딩된 Sound를 파일마다 메모리에 들고 있지 않는다.
+구간 재생은 mmap의 memoryview 슬라이스라 복사가 없고, 읽은 부분만 OS 페이지 캐시에 올라간다.
+
+뱅크 파일 형식 (한 번에 순서대로 쓰도록 인덱스는 끝에):
+    b'AHABANK1' + 0 8바이트 | PCM 데이터 | JSON 인덱스 | 인덱스 위치(u64 LE) + 인덱스 길이(u32 LE) + b'AHABANK1'
+    인덱스: {'version', 'frequency', 'channels', 'files': {절대 경로: [오프셋, 길이, mtime_ns, 크기]}}
+    PCM은 16bit 믹서 형식, 오프셋은 PCM 데이터 시작 기준 (파일마다 프레임 경계에서 시작)
+
+뱅크 만들기/갱신 (바뀐 파일만 새로 디코딩하고 나머지는 이전 뱅크에서 복사):
+    python -m aha_reaction_program.soundbank [--frequency 44100] [--channels 2] [--workers 4]
+"""
+
+import json
+import mmap
+import os
+import struct
+
+from aha_reaction_program import logs
+from aha_reaction_program.audio_meta import DEFAULT_CACHE_DIR, decode_pcm
+from aha_reaction_program.transcode import PCM_DIR, TranscodeCache
+
+BANK_DIR = os.path.join(DEFAULT_CACHE_DIR, 'banks')
+BANK_EXT = '.bank'
+BANK_MAGIC = b'AHABANK1'
+BANK_VERSION = 1
+HEADER_SIZE = 16  # 매직 + 예약 (PCM 데이터 시작 위치)
+_FOOTER = struct.Struct('<QI8s')
+COPY_CHUNK = 1024 * 1024
+
+
+def bank_path(bank_dir, folder_key):
+    return os.path.join(bank_dir, folder_key + BANK_EXT)
+
+
+def _file_state(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_index(path):
+    """뱅크 파일의 인덱스 (없거나 형식/버전이 다르면 None)"""
+    try:
+        with open(path, 'rb') as f:
+            if f.read(len(BANK_MAGIC)) != BANK_MAGIC:
+                return None
+            f.seek(-_FOOTER.size, os.SEEK_END)
+            index_offset, index_size, magic = _FOOTER.unpack(f.read(_FOOTER.size))
+            if magic != BANK_MAGIC:
+                return None
+            f.seek(index_offset)
+            index = json.loads(f.read(index_size).decode('utf-8'))
+    except (OSError, ValueError, struct.error):
+        return None
+    if not isinstance(index, dict) or index.get('version') != BANK_VERSION:
+        return None
+    return index
+
+
+class SoundBank:
+    """뱅크 파일 하나 (읽기 전용 mmap)"""
+
+    def __init__(self, path):
+        self.path = path
+        index = read_index(path)
+        if index is None:
+            raise ValueError(f"사운드 뱅크 형식이 아닙니다: {path}")
+        self.frequency = index['frequency']
+        self.channels = index['channels']
+        self.files = index['files']
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+    @property
+    def nbytes(self):
+        return len(self._mmap)
+
+    def pcm_view(self, file_path):
+        """파일 PCM의 memoryview (복사 없음), 뱅크에 없으면 None"""
+        entry = self.files.get(os.path.abspath(file_path))
+        if entry is None:
+            return None
+        start = HEADER_SIZE + entry[0]
+        return self._view[start:start + entry[1]]
+
+    def is_current(self, file_path):
+        """뱅크에 들어 있는 내용이 지금 파일과 같은지 (mtime/크기)"""
+        entry = self.files.get(os.path.abspath(file_path))
+        try:
+            return entry is not None and tuple(entry[2:4]) == _file_state(file_path)
+        except OSError:
+            return False
+
+
+class SoundBanks:
+    """폴더별 뱅크 모음: 재생할 파일 경로 → PCM memoryview (스니펫 엔진이 사운드 캐시보다 먼저 조회)"""
+
+    def __init__(self, bank_dir=BANK_DIR, frequency=44100, channels=2):
+        self.bank_dir = bank_dir
+        self.frequency = frequency
+        self.channels = channels
+        self.banks = {}  # {folder_key: SoundBank}
+        self._views = {}  # {파일 경로 (sound_folders와 같은 문자열): memoryview}
+
+    def open(self, folder_key, files):
+        """폴더 뱅크를 열고 지금 파일과 일치하는 항목만 등록, (등록, 뱅크에 없거나 바뀐 파일) 개수 반환"""
+        try:
+            bank = SoundBank(bank_path(self.bank_dir, folder_key))
+        except (OSError, ValueError):
+            return 0, len(files)
+        if (bank.frequency, bank.channels) != (self.frequency, self.channels):
+            logs.library.warning("-- %s 뱅크의 형식(%dHz, %d채널)이 믹서와 달라 사용하지 않습니다",
+                                 folder_key, bank.frequency, bank.channels)
+            return 0, len(files)
+        self.banks[folder_key] = bank
+        banked = 0
+        for file_path in files:
+            if bank.is_current(file_path):
+                self._views[file_path] = bank.pcm_view(file_path)
+                banked += 1
+        return banked, len(files) - banked
+
+    def pcm_view(self, file_path):
+        return self._views.get(file_path)
+
+    def contains(self, file_path):
+        return file_path in self._views
+
+    def invalidate(self, file_path):
+        """파일이 바뀌거나 지워지면 뱅크 항목은 더 이상 쓰지 않음 (사운드 캐시로 대체)"""
+        self._views.pop(file_path, None)
+
+    def stats(self):
+        return {'banks': len(self.banks), 'files': len(self._views),
+                'mapped_bytes': sum(bank.nbytes for bank in self.banks.values())}
+
+
+def _copy(src, dst, length):
+    while length > 0:
+        chunk = src.read(min(COPY_CHUNK, length))
+        if not chunk:
+            raise ValueError("이전 뱅크 파일이 잘렸습니다")
+        dst.write(chunk)
+        length -= len(chunk)
+
+
+def _write_pcm(out, file_path, transcode, frequency, channels):
+    """변환 캐시(없으면 직접 디코딩)의 PCM을 뱅크에 쓰고 길이 반환 (실패시 None)"""
+    cache_path = transcode.path_for(file_path)
+    try:
+        with open(cache_path, 'rb') as f:
+            length = os.fstat(f.fileno()).st_size
+            _copy(f, out, length)
+            return length
+    except (OSError, TypeError, ValueError):
+        pass
+    try:
+        pcm, _, _ = decode_pcm(file_path, frequency, channels)  # 믹서 형식 WAV 또는 변환 실패 파일
+    except Exception:
+        return None
+    out.write(pcm)
+    return len(pcm)
+
+
+def build_bank(path, files, frequency, channels, pcm_dir=PCM_DIR, workers=0):
+    """폴더 뱅크를 새로 쓰거나 갱신 (바뀌지 않은 파일은 이전 뱅크에서 복사, 새 파일만 프로세스 풀로 디코딩)
+
+    반환: {'copied', 'decoded', 'failed', 'bytes'}, 뱅크가 이미 최신이면 None
+    """
+    old_index = read_index(path)
+    if old_index is not None and (old_index['frequency'], old_index['channels']) != (frequency, channels):
+        old_index = None
+    old_files = old_index['files'] if old_index else {}
+
+    states = {}
+    for file_path in files:
+        try:
+            states[file_path] = _file_state(file_path)
+        except OSError:
+            pass
+    reused = {file_path for file_path, state in states.items()
+              if tuple(old_files.get(os.path.abspath(file_path), (None,) * 4)[2:4]) == state}
+    if len(reused) == len(states) == len(old_files) and old_index is not None:
+        return None  # 파일 구성도 내용도 그대로
+
+    # 새로 디코딩할 파일은 프로세스 풀로 변환 캐시에 먼저 만들어 둠 (믹서 형식 WAV는 건너뜀)
+    transcode = TranscodeCache(pcm_dir, frequency, channels, workers=workers)
+    transcode.run([file_path for file_path in states if file_path not in reused])
+
+    entries = {}
+    stats = {'copied': 0, 'decoded': 0, 'failed': 0, 'bytes': 0}
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as out:
+        out.write(BANK_MAGIC.ljust(HEADER_SIZE, b'\0'))
+        old = open(path, 'rb') if reused else None
+        try:
+            offset = 0
+            for file_path, state in states.items():
+                if file_path in reused:
+                    start, length = old_files[os.path.abspath(file_path)][:2]
+                    old.seek(HEADER_SIZE + start)
+                    _copy(old, out, length)
+                    stats['copied'] += 1
+                else:
+                    length = _write_pcm(out, file_path, transcode, frequency, channels)
+                    if length is None:
+                        stats['failed'] += 1
+                        logs.library.warning("-- 뱅크에 넣지 못한 파일: %s", os.path.basename(file_path))
+                        continue
+                    stats['decoded'] += 1
+                entries[os.path.abspath(file_path)] = [offset, length, state[0], state[1]]
+                offset += length
+        finally:
+            if old is not None:
+                old.close()
+        stats['bytes'] = offset
+        index = json.dumps({'version': BANK_VERSION, 'frequency': frequency, 'channels': channels,
+                            'files': entries}, ensure_ascii=False).encode('utf-8')
+        out.write(index)
+        out.write(_FOOTER.pack(HEADER_SIZE + offset, len(index), BANK_MAGIC))
+    os.replace(tmp_path, path)  # 열려 있는 이전 뱅크 mmap은 그대로 유효
+    return stats
+
+
+def main():
+    """aha.toml의 반응 폴더마다 뱅크를 만들거나 바뀐 파일만 갱신"""
+    import argparse
+    import time
+
+    from aha_reaction_program.backends import DEFAULT_CHANNELS, DEFAULT_FREQUENCY
+    from aha_reaction_program.config import DEFAULT_CONFIG_PATH, load_config
+    from aha_reaction_program.library import scan_folder
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--config', default=os.environ.get('AHA_CONFIG', DEFAULT_CONFIG_PATH))
+    parser.add_argument('--frequency', type=int, default=DEFAULT_FREQUENCY, help='믹서 샘플레이트')
+    parser.add_argument('--channels', type=int, default=DEFAULT_CHANNELS, help='믹서 채널 수')
+    parser.add_argument('--workers', type=int, default=0, help='디코딩 프로세스 수 (0이면 CPU 코어 수)')
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    logs.configure(**config['log'])
+    bank_dir = config['soundbank']['dir']
+    for folder_key, folder in config['folders'].items():
+        files = sorted(scan_folder(folder['folder'].rstrip('/')))
+        if not files:
+            continue
+        started = time.perf_counter()
+        stats = build_bank(bank_path(bank_dir, folder_key), files, args.frequency, args.channels,
+                           pcm_dir=config['transcode']['dir'], workers=args.workers)
+        if stats is None:
+            print(f"-- {folder_key}: 최신 ({len(files)}개 파일)")
+        else:
+            print(f">> {folder_key}: 복사 {stats['copied']} / 새로 디코딩 {stats['decoded']} / 실패 {stats['failed']}, "
+                  f"{stats['bytes'] / (1024 * 1024):.1f}MB ({time.perf_counter() - started:.1f}초)")
+    logs.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""지연 시간 히스토그램 등 계측용 도구"""
+
+import json
+from collections import Counter
+
+# 2의 거듭제곱(나노초) 버킷 개수: 2^40ns ≈ 18분까지
+BUCKET_COUNT = 41
+
+
+class LatencyHistogram:
+    """나노초 단위 지연 시간을 log2 버킷에 기록 (기록 1회 = 정수 연산 몇 번)"""
+
+    def __init__(self, name='', budget_ns=None):
+        self.name = name
+        self.budget_ns = budget_ns  # 이 값을 넘는 기록 개수를 따로 셈
+        self.reset()
+
+    def reset(self):
+        self.buckets = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.over_budget = 0
+
+    def record(self, elapsed_ns):
+        if elapsed_ns < 0:
+            elapsed_ns = 0
+        self.buckets[min(elapsed_ns.bit_length(), BUCKET_COUNT - 1)] += 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        if self.budget_ns is not None and elapsed_ns > self.budget_ns:
+            self.over_budget += 1
+
+    def percentile(self, p):
+        """p(0~100) 백분위수의 상한값 (버킷 경계 기준, 나노초)"""
+        if not self.count:
+            return 0
+        target = self.count * p / 100.0
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= target and bucket:
+                return min(1 << index, self.max_ns) if index else 0
+        return self.max_ns
+
+    @property
+    def mean_ns(self):
+        return self.total_ns / self.count if self.count else 0
+
+    def summary(self):
+        """통계 요약 (마이크로초)"""
+        return {
+            'count': self.count,
+            'mean_us': round(self.mean_ns / 1000, 2),
+            'p50_us': round(self.percentile(50) / 1000, 2),
+            'p95_us': round(self.percentile(95) / 1000, 2),
+            'p99_us': round(self.percentile(99) / 1000, 2),
+            'max_us': round(self.max_ns / 1000, 2),
+            'over_budget': self.over_budget,
+        }
+
+    def format(self):
+        """사람이 읽기 좋은 한 줄 요약"""
+        s = self.summary()
+        text = (f"{self.name}: {s['count']}회, 평균 {s['mean_us']}µs, p50 ≤{s['p50_us']}µs, "
+                f"p95 ≤{s['p95_us']}µs, p99 ≤{s['p99_us']}µs, 최대 {s['max_us']}µs")
+        if self.budget_ns is not None:
+            text += f", 예산({self.budget_ns / 1000:.0f}µs) 초과 {s['over_budget']}회"
+        return text
+
+
+class Metrics:
+    """이름 붙은 지연 히스토그램과 폴더별 카운터 모음 (JSON / Prometheus 텍스트로 내보내기)"""
+
+    def __init__(self, prefix='aha'):
+        self.prefix = prefix
+        self.histograms = {}  # {metric 이름: LatencyHistogram}
+        self.counters = {}  # {metric 이름: Counter({폴더: 횟수})}
+
+    def histogram(self, metric, name='', budget_ns=None):
+        """metric 이름의 히스토그램 (없으면 생성)"""
+        histogram = self.histograms.get(metric)
+        if histogram is None:
+            histogram = self.histograms[metric] = LatencyHistogram(name or metric, budget_ns)
+        return histogram
+
+    def add_histogram(self, metric, histogram):
+        """다른 곳에서 만든 히스토그램 등록 (예: KeyPipeline.hook_latency)"""
+        self.histograms[metric] = histogram
+        return histogram
+
+    def counter(self, metric):
+        """metric 이름의 폴더별 카운터 (없으면 생성)"""
+        counter = self.counters.get(metric)
+        if counter is None:
+            counter = self.counters[metric] = Counter()
+        return counter
+
+    def add_counter(self, metric, counter):
+        """다른 곳에서 만든 Counter 등록 (예: ChannelManager.plays)"""
+        self.counters[metric] = counter
+        return counter
+
+    def count(self, metric, label, amount=1):
+        self.counter(metric)[label] += amount
+
+    def snapshot(self):
+        """JSON으로 바로 내보낼 수 있는 dict (히스토그램은 µs 요약)"""
+        return {
+            'histograms': {metric: histogram.summary() for metric, histogram in list(self.histograms.items())},
+            'counters': {metric: dict(counter) for metric, counter in list(self.counters.items())},
+        }
+
+    def to_json(self, **extra):
+        return json.dumps(dict(self.snapshot(), **extra), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self):
+        """Prometheus 텍스트 형식 (히스토그램 버킷 경계는 2의 거듭제곱 나노초를 초로 변환)"""
+        lines = []
+        for metric, histogram in list(self.histograms.items()):
+            name = f'{self.prefix}_{metric}_seconds'
+            lines.append(f'# HELP {name} {histogram.name}')
+            lines.append(f'# TYPE {name} histogram')
+            cumulative = 0
+            for index, bucket in enumerate(list(histogram.buckets)):  # 버킷 목록은 항상 같게 (시계열 유지)
+                cumulative += bucket
+                lines.append(f'{name}_bucket{{le="{(1 << index) / 1e9:.9g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{le="+Inf"}} {histogram.count}')
+            lines.append(f'{name}_sum {histogram.total_ns / 1e9:.9g}')
+            lines.append(f'{name}_count {histogram.count}')
+        for metric, counter in list(self.counters.items()):
+            name = f'{self.prefix}_{metric}_total'
+            lines.append(f'# TYPE {name} counter')
+            for label, value in sorted(dict(counter).items()):
+                lines.append(f'{name}{{folder="{label}"}} {value}')
+        return '\n'.join(lines) + '\n'
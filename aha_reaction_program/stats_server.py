@@ -0,0 +1,58 @@
+"""localhost 전용 HTTP 통계 엔드포인트 (/stats: JSON, /metrics: Prometheus 텍스트)"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from aha_reaction_program import logs
+
+
+class _StatsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path in ('/', '/stats'):
+            body, content_type = self.server.render_json(), 'application/json; charset=utf-8'
+        elif path == '/metrics':
+            body, content_type = self.server.metrics.to_prometheus(), 'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            self.send_error(404)
+            return
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logs.app.debug("통계 요청: " + format, *args)
+
+
+class StatsServer:
+    """Metrics를 HTTP로 노출하는 백그라운드 서버 (127.0.0.1에만 바인드)
+
+    render_json이 있으면 /stats 응답에 사용 (Metrics 외의 상태를 덧붙일 때).
+    """
+
+    def __init__(self, metrics, port=9464, host='127.0.0.1', render_json=None):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.render_json = render_json or metrics.to_json
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), _StatsHandler)
+        self._server.daemon_threads = True
+        self._server.metrics = self.metrics
+        self._server.render_json = self.render_json
+        self.port = self._server.server_address[1]  # port=0이면 실제로 할당된 포트
+        self._thread = threading.Thread(target=self._server.serve_forever, name='aha-stats', daemon=True)
+        self._thread.start()
+        logs.app.info(">> 통계: http://%s:%d/stats (JSON), /metrics (Prometheus)", self.host, self.port)
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,173 @@
+"""반응 사운드를 믹서 출력 형식의 raw PCM으로 미리 변환해 두는 캐시 (.aha_cache/pcm)
+
+mp3/m4a/ogg는 불러올 때마다 ffmpeg(pydub)나 SDL 디코딩과 리샘플링을 거쳐야 하지만,
+변환해 둔 파일은 mmap으로 열어 그대로 Sound를 만든다 (디코딩/리샘플링 없음).
+캐시 파일 이름에 원본 경로, mtime, 크기와 출력 형식이 들어가므로 원본이 바뀌거나 믹서 형식이 다르면 새로 변환한다.
+
+실행 전에 한 번에 변환하기 (aha.toml의 반응 폴더 전체):
+    python -m aha_reaction_program.transcode [--frequency 44100] [--channels 2] [--workers 4] [--prune]
+"""
+
+import hashlib
+import mmap
+import os
+import time
+import wave
+
+from aha_reaction_program.audio_meta import DEFAULT_CACHE_DIR, decode_pcm
+from aha_reaction_program.workers import BatchJob
+
+PCM_DIR = os.path.join(DEFAULT_CACHE_DIR, 'pcm')
+PCM_EXT = '.pcm'
+TMP_EXT = '.tmp'
+STALE_TMP_SECONDS = 3600  # 이보다 오래된 임시 파일은 중단된 변환의 흔적 (다른 프로세스가 쓰는 중인 파일은 남김)
+
+
+def cache_name(path, frequency, channels):
+    """원본 파일 상태 + 출력 형식으로 정해지는 캐시 파일 이름 (원본이 없으면 OSError)"""
+    stat = os.stat(path)
+    key = f'{os.path.abspath(path)}\0{stat.st_mtime_ns}\0{stat.st_size}'
+    digest = hashlib.sha1(key.encode('utf-8', 'surrogateescape')).hexdigest()[:20]
+    return f'{digest}-{frequency}-{channels}{PCM_EXT}'
+
+
+def is_native_wav(path, frequency, channels):
+    """이미 믹서 형식(16bit, 같은 샘플레이트/채널)인 WAV는 변환해도 이득이 없음"""
+    if os.path.splitext(path)[1].lower() != '.wav':
+        return False
+    try:
+        with wave.open(path, 'rb') as f:
+            return (f.getsampwidth(), f.getframerate(), f.getnchannels()) == (2, frequency, channels)
+    except (OSError, wave.Error, EOFError):
+        return False
+
+
+def transcode_file(path, cache_dir, frequency, channels):
+    """워커 프로세스: 파일 하나를 16bit raw PCM으로 변환해서 저장 (PCM 바이트 수 또는 실패시 None)"""
+    tmp_path = None
+    try:
+        out_path = os.path.join(cache_dir, cache_name(path, frequency, channels))
+        pcm, _, _ = decode_pcm(path, frequency, channels)
+        tmp_path = f'{out_path}.{os.getpid()}{TMP_EXT}'
+        with open(tmp_path, 'wb') as f:
+            f.write(pcm)
+        os.replace(tmp_path, out_path)
+    except Exception:
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)  # 쓰다 만 임시 파일 (디스크 부족 등)
+            except OSError:
+                pass
+        return None
+    return len(pcm)
+
+
+class TranscodeCache(BatchJob):
+    """변환된 PCM 조회(mmap) + 아직 변환하지 않은 파일을 프로세스 풀로 변환"""
+
+    label = 'PCM 변환'
+    thread_name = 'aha-transcode'
+    task = transcode_file
+
+    def __init__(self, cache_dir=PCM_DIR, frequency=44100, channels=2, workers=0):
+        super().__init__(workers)
+        self.cache_dir = cache_dir
+        self.frequency = frequency
+        self.channels = channels
+        self.hits = 0
+        self.misses = 0
+        self.written_bytes = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path_for(self, file_path):
+        """원본 파일의 캐시 경로 (원본이 없으면 None)"""
+        try:
+            return os.path.join(self.cache_dir, cache_name(file_path, self.frequency, self.channels))
+        except OSError:
+            return None
+
+    def load(self, file_path, sound_from_buffer):
+        """변환된 PCM이 있으면 mmap으로 열어 Sound 생성, 없으면 None (원본 디코딩으로 대체)
+
+        Sound를 만들 때 믹서가 PCM을 자체 버퍼로 복사하므로 mmap은 바로 닫음.
+        """
+        cache_path = self.path_for(file_path)
+        if cache_path is None:
+            return None
+        try:
+            with open(cache_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as pcm:
+                sound = sound_from_buffer(pcm)
+        except (OSError, ValueError):  # 변환 전이거나 빈 파일
+            self.misses += 1
+            return None
+        self.hits += 1
+        return sound
+
+    def task_args(self):
+        return self.cache_dir, self.frequency, self.channels
+
+    def pending(self, paths):
+        """캐시 파일이 없고 믹서 형식 WAV가 아닌 파일"""
+        pending = []
+        for path in dict.fromkeys(paths):
+            cache_path = self.path_for(path)
+            if cache_path is not None and not os.path.exists(cache_path) and \
+                    not is_native_wav(path, self.frequency, self.channels):
+                pending.append(path)
+        return pending
+
+    def store(self, path, result):
+        self.written_bytes += result
+
+    def prune(self, paths):
+        """paths 어디에도 해당하지 않는 캐시 파일과 중단된 변환의 임시 파일 삭제, 삭제한 개수"""
+        keep = {os.path.basename(cache_path) for cache_path in map(self.path_for, paths) if cache_path}
+        stale_before = time.time() - STALE_TMP_SECONDS
+        removed = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(PCM_EXT):
+                stale = entry.name not in keep
+            elif entry.name.endswith(TMP_EXT):
+                stale = entry.stat().st_mtime < stale_before
+            else:
+                continue
+            if stale:
+                os.remove(entry.path)
+                removed += 1
+        return removed
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'converted': self.done, 'failed': self.failed}
+
+
+def main():
+    """aha.toml의 반응 폴더 전체를 믹서 형식 PCM으로 변환"""
+    import argparse
+
+    from aha_reaction_program import logs
+    from aha_reaction_program.backends import DEFAULT_CHANNELS, DEFAULT_FREQUENCY
+    from aha_reaction_program.config import DEFAULT_CONFIG_PATH, load_config
+    from aha_reaction_program.library import scan_folder
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--config', default=os.environ.get('AHA_CONFIG', DEFAULT_CONFIG_PATH))
+    parser.add_argument('--frequency', type=int, default=DEFAULT_FREQUENCY, help='믹서 샘플레이트')
+    parser.add_argument('--channels', type=int, default=DEFAULT_CHANNELS, help='믹서 채널 수')
+    parser.add_argument('--workers', type=int, default=0, help='변환 프로세스 수 (0이면 CPU 코어 수)')
+    parser.add_argument('--prune', action='store_true', help='원본이 바뀌거나 지워진 캐시 파일 삭제')
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    logs.configure(**config['log'])
+    settings = config['transcode']
+    files = [file for folder in config['folders'].values() for file in sorted(scan_folder(folder['folder'].rstrip('/')))]
+    cache = TranscodeCache(settings['dir'], args.frequency, args.channels, workers=args.workers or settings['workers'])
+    cache.run(files)
+    print(f">> PCM 변환: {cache.done}개 파일 ({cache.written_bytes / (1024 * 1024):.1f}MB), 실패 {cache.failed}개")
+    if args.prune:
+        print(f">> 오래된 캐시 파일 {cache.prune(files)}개 삭제")
+    logs.shutdown()
+
+
+if __name__ == '__main__':
+    main()
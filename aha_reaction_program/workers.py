@@ -0,0 +1,130 @@
+"""파일 단위 배치 작업: 요청은 백그라운드 스레드 하나가 모아서 프로세스 풀로 처리
+
+음량 분석, PCM 변환처럼 파일마다 한 번만 하면 되는 무거운 작업에 사용 (재생 경로에서는 호출하지 않음).
+프로세스는 spawn으로 만들어서 실행 중인 스레드(스케줄러, 믹서 등) 상태를 복제하지 않는다.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from aha_reaction_program import logs
+
+# 워커가 한 번에 받는 파일 수 (작은 파일이 많을 때 프로세스 간 왕복 줄이기)
+CHUNK_SIZE = 8
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def _run_chunk(task, paths, args):
+    return [task(path, *args) for path in paths]
+
+
+def process_files(task, paths, args=(), workers=0, stop=None):
+    """task(path, *args)를 프로세스 풀에서 실행하며 끝나는 순서대로 (경로, 결과)를 내보냄
+
+    stop 이벤트가 설정되면 남은 작업을 취소하고 끝냄.
+    """
+    workers = min(workers or default_workers(), len(paths)) or 1
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    stopped = False
+    try:
+        futures = {}
+        for index in range(0, len(paths), CHUNK_SIZE):
+            chunk = paths[index:index + CHUNK_SIZE]
+            futures[executor.submit(_run_chunk, task, chunk, args)] = chunk
+        for future in as_completed(futures):
+            if stop is not None and stop.is_set():
+                stopped = True
+                return
+            yield from zip(futures[future], future.result(), strict=True)
+    finally:
+        executor.shutdown(wait=not stopped, cancel_futures=True)
+
+
+class BatchJob:
+    """하위 클래스가 task(워커 프로세스에서 실행할 모듈 수준 함수), pending(), store()를 정의
+
+    task(path, *task_args())는 성공하면 결과, 실패하면 None을 반환.
+    """
+
+    label = '배치 작업'  # 로그/스레드 이름용
+    thread_name = 'aha-batch'
+    task = None
+
+    def __init__(self, workers=0):
+        self.workers = workers
+        self.done = 0
+        self.failed = 0
+        self._pending = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def available(self):
+        return True
+
+    def pending(self, paths):
+        """아직 처리하지 않은 파일만 (중복 제거, 순서 유지)"""
+        return list(dict.fromkeys(paths))
+
+    def task_args(self):
+        return ()
+
+    def store(self, path, result):
+        """작업 스레드에서 결과 하나 반영"""
+
+    def finish(self):
+        """배치 하나가 끝난 뒤 (캐시 저장 등)"""
+
+    def submit(self, paths):
+        """처리할 파일 추가 (이미 처리된 파일은 백그라운드 스레드에서 걸러냄)"""
+        if not self.available():
+            return
+        with self._lock:
+            self._pending.extend(paths)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """남은 작업 취소 (진행 중인 파일은 워커에서 끝까지 처리)"""
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._lock:
+                paths, self._pending = self._pending, []
+                if not paths:
+                    self._thread = None
+                    return
+            try:
+                self.run(paths)
+            except Exception as e:
+                logs.library.error("%s 오류: %s", self.label, e)
+
+    def run(self, paths):
+        """파일 목록을 프로세스 풀로 처리하고 새로 처리한 파일 수 반환 (호출한 스레드를 막음)"""
+        paths = self.pending(paths) if self.available() else []
+        if not paths:
+            return 0
+        started = time.perf_counter()
+        workers = min(self.workers or default_workers(), len(paths))
+        done = failed = 0
+        for path, result in process_files(type(self).task, paths, self.task_args(), workers, self._stop):
+            if result is None:
+                failed += 1
+                logs.library.warning("-- %s 실패: %s", self.label, os.path.basename(path))
+            else:
+                done += 1
+                self.store(path, result)
+        self.finish()
+        self.done += done
+        self.failed += failed
+        logs.library.info(">> %s: %d개 파일 (실패 %d개, %.1f초, 프로세스 %d개)",
+                          self.label, done, failed, time.perf_counter() - started, workers)
+        return done
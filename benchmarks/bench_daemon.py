@@ -0,0 +1,133 @@
+"""데몬 소켓 처리량 벤치마크: 여러 클라이언트가 키/반응 이벤트를 묶음으로 보낼 때 초당 이벤트 수와 왕복 지연
+
+가상 라이브러리(WAV)로 데몬을 새 프로세스에서 실행하고 (null 오디오, 키보드 없음),
+클라이언트 스레드마다 연결 하나로 batch개씩 묶은 이벤트(키 입력 + 폴더 트리거)를 보낸다.
+
+사용법:
+    python benchmarks/bench_daemon.py [--clients 4] [--batches 500] [--batch 16] [--files 100]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from aha_reaction_program.daemon import DaemonClient, is_listening  # noqa: E402
+from aha_reaction_program.stats import LatencyHistogram  # noqa: E402
+from bench_replay import FILLER  # noqa: E402
+from bench_startup import FOLDERS, make_library  # noqa: E402
+
+
+def write_config(path, socket_path):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"[log]\nquiet = true\n\n[audio]\nbackend = \"null\"\n\n[input]\nsource = \"none\"\n\n"
+                f"[daemon]\nenabled = true\nsocket = \"{socket_path}\"\n\n"
+                "[library]\nwatch = false\n\n[config]\nwatch = false\n")
+
+
+def start_daemon(library, config_path, socket_path, timeout=30.0):
+    env = dict(os.environ, AHA_CONFIG=config_path, PYGAME_HIDE_SUPPORT_PROMPT='1')
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'main.py')], cwd=library, env=env,
+                               stdout=subprocess.DEVNULL)
+    deadline = time.perf_counter() + timeout
+    while not (os.path.exists(socket_path) and is_listening(socket_path)):
+        if process.poll() is not None or time.perf_counter() > deadline:
+            process.kill()
+            raise RuntimeError("데몬이 시작되지 않았습니다")
+        time.sleep(0.05)
+    return process
+
+
+def make_batch(rng, size, trigger_ratio):
+    """타이핑(키 입력) 사이에 가끔 폴더 트리거가 섞인 이벤트 묶음"""
+    events = []
+    for _ in range(size):
+        if rng.random() < trigger_ratio:
+            events.append({'op': 'trigger', 'folder': rng.choice(FOLDERS[:-1])})
+        else:
+            char = rng.choice(FILLER)
+            events.append({'op': 'key', 'key': 'space' if char == ' ' else char})
+    return events
+
+
+def run_client(socket_path, batches, batch_size, trigger_ratio, seed, histogram, totals, lock):
+    rng = random.Random(seed)
+    payloads = [make_batch(rng, batch_size, trigger_ratio) for _ in range(batches)]
+    ok = errors = 0
+    with DaemonClient(socket_path) as client:
+        for events in payloads:
+            started = time.perf_counter_ns()
+            response = client.send(events)
+            elapsed = time.perf_counter_ns() - started
+            ok += response['ok']
+            errors += len(events) - response['ok']
+            with lock:
+                histogram.record(elapsed)
+    with lock:
+        totals['ok'] += ok
+        totals['errors'] += errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=4, help='동시에 연결하는 클라이언트 수')
+    parser.add_argument('--batches', type=int, default=500, help='클라이언트마다 보내는 묶음 수')
+    parser.add_argument('--batch', type=int, default=16, help='묶음 하나의 이벤트 수')
+    parser.add_argument('--triggers', type=float, default=0.05, help='이벤트 중 폴더 트리거 비율')
+    parser.add_argument('--files', type=int, default=100, help='가상 라이브러리 파일 수')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='aha-daemon-')
+    process = None
+    try:
+        library = os.path.join(workdir, 'library')
+        make_library(library, args.files)
+        socket_path = os.path.join(workdir, 'aha.sock')
+        config_path = os.path.join(workdir, 'bench.toml')
+        write_config(config_path, socket_path)
+        process = start_daemon(library, config_path, socket_path)
+
+        histogram = LatencyHistogram('묶음 왕복')
+        totals = {'ok': 0, 'errors': 0}
+        lock = threading.Lock()
+        threads = [threading.Thread(target=run_client, args=(socket_path, args.batches, args.batch, args.triggers,
+                                                             args.seed + i, histogram, totals, lock))
+                   for i in range(args.clients)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        with DaemonClient(socket_path) as client:
+            stats = client.stats()
+            client.send({'op': 'quit'})
+        process.wait(timeout=10)
+        process = None
+
+        events = totals['ok'] + totals['errors']
+        s = histogram.summary()
+        print(f"클라이언트 {args.clients}개 × 묶음 {args.batches}개 × 이벤트 {args.batch}개, 라이브러리 {args.files}개 파일")
+        print(f"  처리량: {events / elapsed:,.0f} 이벤트/초 ({s['count'] / elapsed:,.0f} 묶음/초, {elapsed:.2f}초)")
+        print(f"  {histogram.name}: 평균 {s['mean_us']:.1f}µs  p50 ≤{s['p50_us']:.1f}µs  p95 ≤{s['p95_us']:.1f}µs  "
+              f"p99 ≤{s['p99_us']:.1f}µs  최대 {s['max_us']:.1f}µs")
+        print(f"  처리 {totals['ok']} / 거부 {totals['errors']} (키 입력 큐가 가득 차서 버린 키 {stats['dropped_keys']}), "
+              f"반응 시작 {sum(stats['counters'].get('reaction_started', {}).values())}")
+    finally:
+        if process is not None:
+            process.kill()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
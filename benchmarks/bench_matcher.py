@@ -0,0 +1,95 @@
+"""패턴 매칭 마이크로 벤치마크: 기존 endswith 스캔 vs PatternMatcher
+
+사용법:
+    python benchmarks/bench_matcher.py [--folders 10] [--patterns 1000] [--keys 20000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aha_reaction_program.matcher import PatternMatcher  # noqa: E402
+
+ALPHABET = 'abcdefghijklmnopqrstuvwxyzㅋ.~'
+
+
+def make_folders(folder_count, patterns_per_folder, rng):
+    """랜덤 패턴을 가진 가상 폴더 목록 생성"""
+    folders = {}
+    for i in range(folder_count):
+        patterns = [
+            ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(2, 8)))
+            for _ in range(patterns_per_folder)
+        ]
+        folders[f'folder{i}'] = {'folder': f'folder{i}/', 'patterns': patterns, 'files': ['x.wav']}
+    return folders
+
+
+def endswith_scan(sound_folders, keys):
+    """기존 on_key_press 방식 (deque join + 폴더 × 패턴 endswith)"""
+    recent_keys = deque(maxlen=15)
+    hits = 0
+    for ch in keys:
+        recent_keys.append(ch)
+        recent_text = ''.join(recent_keys)
+        for folder_info in sound_folders.values():
+            matched = False
+            for pattern in folder_info['patterns']:
+                if recent_text.endswith(pattern):
+                    matched = True
+                    break
+            if matched:
+                hits += 1
+                break
+    return hits
+
+
+def matcher_scan(matcher, keys):
+    """PatternMatcher 방식 (키당 상태 전이 1번)"""
+    hits = 0
+    for ch in keys:
+        if matcher.feed(ch):
+            hits += 1
+    return hits
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--folders', type=int, default=10)
+    parser.add_argument('--patterns', type=int, default=100, help='폴더당 패턴 수')
+    parser.add_argument('--keys', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sound_folders = make_folders(args.folders, args.patterns, rng)
+    keys = [rng.choice(ALPHABET) for _ in range(args.keys)]
+
+    build_time, matcher = timed(PatternMatcher.from_sound_folders, sound_folders)
+    scan_time, scan_hits = timed(endswith_scan, sound_folders, keys)
+    match_time, match_hits = timed(matcher_scan, matcher, keys)
+
+    total_patterns = args.folders * args.patterns
+    print(f"폴더 {args.folders}개 × 패턴 {args.patterns}개 = {total_patterns}개, 키 입력 {args.keys}회")
+    print(f"  매처 컴파일     : {build_time * 1000:.1f} ms ({matcher.state_count} 상태)")
+    print(f"  endswith 스캔   : {scan_time / args.keys * 1e6:8.2f} µs/키 (매칭 {scan_hits}회)")
+    print(f"  PatternMatcher  : {match_time / args.keys * 1e6:8.2f} µs/키 (매칭 {match_hits}회)")
+    if match_time > 0:
+        print(f"  속도 향상       : {scan_time / match_time:.1f}배")
+    if scan_hits != match_hits:
+        print("!! 매칭 횟수가 다릅니다 (15글자 창보다 긴 패턴이 있는지 확인)")
+
+
+if __name__ == '__main__':
+    main()
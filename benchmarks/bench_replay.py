@@ -0,0 +1,114 @@
+"""종단간 지연 벤치마크: 키 입력 trace 재생 → 패턴 매칭 → 반응 재생 (null 오디오 백엔드)
+
+오디오 장치나 키보드 없이 실행된다. trace 파일을 주지 않으면 기본 패턴이 섞인
+가상 타이핑 trace를 만들고, 가상 라이브러리(WAV)와 함께 프로그램 전체를 한 번 실행한다.
+
+사용법:
+    python benchmarks/bench_replay.py [--trace keys.trace] [--keys 2000] [--rate 8] [--speed 10]
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from aha_reaction_program.config import DEFAULT_CONFIG  # noqa: E402
+from bench_startup import make_library  # noqa: E402
+
+FILLER = 'abcdefghijklmnopqrstuvwxyz    '
+
+
+def make_trace(path, key_count, rate, pattern_ratio, rng):
+    """평균 rate키/초로 타이핑하며 가끔 기본 패턴을 입력하는 가상 trace"""
+    patterns = [p for folder in DEFAULT_CONFIG['folders'].values() for p in folder['patterns']]
+    offset = 0.0
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < key_count:
+            text = rng.choice(patterns) if rng.random() < pattern_ratio else rng.choice(FILLER)
+            for char in text:
+                name = 'space' if char == ' ' else char
+                f.write(f"{offset:.6f}\t{name}\n")
+                offset += rng.expovariate(rate)
+                written += 1
+    return offset
+
+
+def write_config(path, trace_path, speed):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"[log]\nquiet = true\n\n[audio]\nbackend = \"null\"\n\n"
+                f"[input]\nsource = \"trace\"\ntrace = \"{trace_path}\"\nspeed = {speed}\n\n"
+                "[library]\nwatch = false\n\n[config]\nwatch = false\n")
+
+
+def run_program(library, config_path):
+    """가상 라이브러리 폴더에서 프로그램을 trace가 끝날 때까지 실행"""
+    os.environ['AHA_CONFIG'] = config_path
+    cwd = os.getcwd()
+    os.chdir(library)
+    try:
+        import main
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            program = main.AhaReactionProgram()
+            started = time.perf_counter()
+            program.run()
+        return program, time.perf_counter() - started
+    finally:
+        os.chdir(cwd)
+
+
+def print_histogram(histogram):
+    s = histogram.summary()
+    print(f"  {histogram.name:<10}: {s['count']:6d}회  평균 {s['mean_us']:9.1f}µs  p50 ≤{s['p50_us']:9.1f}µs  "
+          f"p99 ≤{s['p99_us']:9.1f}µs  최대 {s['max_us']:9.1f}µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--trace', help='재생할 trace 파일 (없으면 가상 trace 생성)')
+    parser.add_argument('--keys', type=int, default=2000, help='가상 trace 키 입력 수')
+    parser.add_argument('--rate', type=float, default=8.0, help='가상 trace 타이핑 속도 (키/초)')
+    parser.add_argument('--patterns', type=float, default=0.05, help='가상 trace에서 패턴을 입력할 확률')
+    parser.add_argument('--speed', type=float, default=10.0, help='재생 속도 배율 (0이면 최대 속도)')
+    parser.add_argument('--files', type=int, default=100, help='가상 라이브러리 파일 수')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    random.seed(args.seed)  # 반응 구간 선택도 매번 같게
+    workdir = tempfile.mkdtemp(prefix='aha-replay-')
+    try:
+        library = os.path.join(workdir, 'library')
+        make_library(library, args.files)
+        trace_path = os.path.abspath(args.trace) if args.trace else os.path.join(workdir, 'keys.trace')
+        if not args.trace:
+            make_trace(trace_path, args.keys, args.rate, args.patterns, rng)
+        config_path = os.path.join(workdir, 'bench.toml')
+        write_config(config_path, trace_path, args.speed)
+
+        program, elapsed = run_program(library, config_path)
+        events = Counter(event for _, event, _, _ in program.audio.events)
+        key_count = len(program.input_source.events)
+        print(f"trace: {key_count}개 키, 재생 {elapsed:.2f}초 (속도 ×{args.speed:g}), 라이브러리 {args.files}개 파일")
+        print_histogram(program.key_pipeline.hook_latency)
+        print_histogram(program.key_pipeline.queue_latency)
+        print_histogram(program.play_latency)
+        print(f"  재생 이벤트: 시작 {events['play']} / 정지 {events['stop']}, "
+              f"드롭 {sum(program.channel_manager.dropped.values())}, 버린 키 {program.key_pipeline.dropped}")
+        coalescer = program.trigger_coalescer
+        print(f"  트리거: 통과 {sum(coalescer.accepted.values())} / 합침 {sum(coalescer.coalesced.values())} / "
+              f"속도 제한 {sum(coalescer.limited.values())}, 스케줄러 작업 {program.scheduler.lag.count}개")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+"""규모별 벤치마크: 라이브러리 파일/패턴 수를 늘려 가며 스캔, 길이 측정, 패턴 매칭, 반응 디스패치의 처리량/지연과 최대 메모리
+
+규모마다 synth_library로 가상 라이브러리를 만들고, 새 프로세스에서 (최대 RSS를 규모별로 따로 재기 위해)
+null 오디오, 키보드 없이 프로그램을 만든 뒤 단계별로 잰다.
+    scan      폴더 목록 읽기 (library.scan_folder)
+    load      라이브러리 준비 (check_audio_files + 길이 인덱싱 cold, load_library)
+    probe     파일별 길이 측정 cold (헤더) / warm (메타데이터 캐시)
+    match     패턴 매처 feed, 키 입력 훅 → 큐 → 매칭 → 반응 트리거 전체 경로
+    dispatch  play_reaction_sound → 스케줄러 → 첫 구간 재생 시작
+
+사용법:
+    python benchmarks/bench_scale.py [--scales 100,1000,10000] [--folders 10] [--patterns 20] [--keys 20000]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from aha_reaction_program.stats import LatencyHistogram  # noqa: E402
+from bench_replay import FILLER  # noqa: E402
+from synth_library import generate_library  # noqa: E402
+
+# 규모별 자식 프로세스 설정 (장치/키보드/감시/미리 로드 없음, 라이브러리 로드는 직접 호출해서 잼)
+CONFIG = """[log]
+quiet = true
+
+[audio]
+backend = "null"
+
+[input]
+source = "none"
+
+[startup]
+fast = true
+
+[sound_cache]
+warm = false
+
+[library]
+watch = false
+
+[config]
+watch = false
+"""
+# 키 입력 경로는 이만큼씩 넣고 처리될 때까지 기다림 (키 입력 큐 크기 1024보다 작게, 버리는 키 없이 처리량만 잼)
+KEY_CHUNK = 256
+# 반응 트리거도 이만큼씩 보내고 스케줄러가 처리할 때까지 기다림 (지연 분포가 밀린 작업 수에 묻히지 않게)
+DISPATCH_CHUNK = 16
+
+
+def peak_rss():
+    """지금까지의 최대 RSS (바이트, 리눅스 ru_maxrss는 KB)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def make_keys(folders, count, pattern_ratio, rng):
+    """평소 타이핑 사이에 가끔 패턴이 섞인 키 입력 (문자 목록)"""
+    patterns = [pattern for patterns in folders.values() for pattern in patterns]
+    keys = []
+    while len(keys) < count:
+        keys.extend(rng.choice(patterns) if patterns and rng.random() < pattern_ratio else rng.choice(FILLER))
+    return keys[:count]
+
+
+def timed(histogram, func, *args):
+    started = time.perf_counter_ns()
+    result = func(*args)
+    histogram.record(time.perf_counter_ns() - started)
+    return result
+
+
+def wait_until(condition, timeout=60.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise RuntimeError("벤치마크 단계가 끝나지 않았습니다")
+        time.sleep(0.001)
+
+
+def run_child(library, keys, dispatches, pattern_ratio, seed):
+    """자식 프로세스: library 폴더에서 프로그램을 만들고 단계별 결과를 JSON 한 줄로 출력"""
+    os.chdir(library)
+    import main
+    from aha_reaction_program.audio_meta import MetadataCache
+    from aha_reaction_program.inputs import CharKey, TraceKeys
+    from aha_reaction_program.library import scan_folder
+
+    rng = random.Random(seed)
+    random.seed(seed)  # 반응 구간 선택도 매번 같게
+    result = {}
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        program = main.AhaReactionProgram()
+        result['init_s'] = time.perf_counter() - started
+
+        # 폴더 목록 읽기
+        scan = LatencyHistogram('폴더 스캔')
+        started = time.perf_counter()
+        scanned = sum(len(timed(scan, scan_folder, folder)) for folder in program.library_folders().values())
+        result['scan'] = dict(scan.summary(), files=scanned, seconds=time.perf_counter() - started)
+
+        # 라이브러리 준비 (파일 목록 + 길이 인덱싱 cold)
+        started = time.perf_counter()
+        program.load_library()
+        result['load'] = {'seconds': time.perf_counter() - started, 'rss': peak_rss()}
+
+        # 파일별 길이 측정: 새 캐시(cold, 헤더 읽기) → 같은 캐시(warm)
+        files = program.reaction_files()
+        cache = MetadataCache(cache_dir=os.path.join('.aha_cache', 'bench'), fallback=None)
+        for phase in ('cold', 'warm'):
+            probe = LatencyHistogram(f'길이 측정 ({phase})')
+            started = time.perf_counter()
+            for file_path in files:
+                timed(probe, cache.get_duration, file_path)
+            result[f'probe_{phase}'] = dict(probe.summary(), seconds=time.perf_counter() - started)
+
+        # 패턴 매칭: 매처만 / 키 입력 훅부터 반응 트리거까지
+        patterns = {folder_key: info['patterns'] for folder_key, info in program.sound_folders.items()}
+        typed = make_keys(patterns, keys, pattern_ratio, rng)
+        match = LatencyHistogram('매처 feed')
+        matcher = program.pattern_matcher
+        started = time.perf_counter()
+        matched = sum(len(timed(match, matcher.feed, char)) for char in typed)
+        result['match'] = dict(match.summary(), matches=matched, seconds=time.perf_counter() - started)
+        matcher.reset()
+
+        program.key_codes = TraceKeys()
+        pipeline = program.key_pipeline
+        started = time.perf_counter()
+        for index in range(0, len(typed), KEY_CHUNK):
+            chunk = typed[index:index + KEY_CHUNK]
+            for char in chunk:
+                program.on_key_press(CharKey(char))
+            pushed = index + len(chunk)
+            wait_until(lambda pushed=pushed: pipeline.queue_latency.count + pipeline.dropped >= pushed)
+        result['keys'] = {'seconds': time.perf_counter() - started, 'hook': pipeline.hook_latency.summary(),
+                          'queue': pipeline.queue_latency.summary(), 'handle': program.match_latency.summary(),
+                          'dropped': pipeline.dropped, 'triggers': sum(program.trigger_coalescer.accepted.values())}
+
+        # 반응 디스패치: 파일이 있는 폴더를 돌아가며 트리거 (같은 폴더는 연장/재시작)
+        done = threading.Event()
+        program.scheduler.call_soon(done.set)
+        done.wait()
+        program.play_latency.reset()
+        program.scheduler.lag.reset()
+        folders = [(key, info['files']) for key, info in program.sound_folders.items()
+                   if info['files'] and key != 'work']
+        started = time.perf_counter()
+        for index in range(0, dispatches if folders else 0, DISPATCH_CHUNK):
+            for folder_key, sound_files in (folders[i % len(folders)]
+                                            for i in range(index, min(index + DISPATCH_CHUNK, dispatches))):
+                program.play_reaction_sound(folder_key, sound_files, time.perf_counter_ns())
+            done.clear()
+            program.scheduler.call_soon(done.set)
+            done.wait()
+        result['dispatch'] = {'seconds': time.perf_counter() - started, 'count': dispatches,
+                              'lag': program.scheduler.lag.summary(), 'play': program.play_latency.summary()}
+
+        program.is_running = False
+        program.scheduler.stop()
+        pipeline.stop()
+        main.logs.shutdown()
+    result['rss'] = peak_rss()
+    print(json.dumps(result))
+
+
+def measure(workdir, files, args):
+    """규모 하나: 라이브러리 생성 → 자식 프로세스에서 측정"""
+    library = os.path.join(workdir, f'library-{files}')
+    started = time.perf_counter()
+    info = generate_library(library, files, args.folders, args.patterns, args.min_seconds, args.max_seconds,
+                            args.encoded, args.seed, config_extra=CONFIG)
+    generated = time.perf_counter() - started
+    env = dict(os.environ, SDL_AUDIODRIVER='dummy', AHA_CONFIG=os.path.join(library, 'aha.toml'),
+               PYGAME_HIDE_SUPPORT_PROMPT='1')
+    command = [sys.executable, os.path.abspath(__file__), '--child', library, '--keys', str(args.keys),
+               '--dispatches', str(args.dispatches), '--pattern-ratio', str(args.pattern_ratio),
+               '--seed', str(args.seed)]
+    output = subprocess.run(command, env=env, capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result['generate'] = {'seconds': generated, 'bytes': info['bytes'], 'encoded': info['encoded']}
+    return result
+
+
+def rate(count, seconds):
+    return f"{count / seconds:,.0f}/초" if seconds else '-'
+
+
+def latency(s):
+    return f"p50 ≤{s['p50_us']:.1f}µs  p95 ≤{s['p95_us']:.1f}µs  p99 ≤{s['p99_us']:.1f}µs  최대 {s['max_us']:.1f}µs"
+
+
+def print_result(files, result):
+    generate, load, dispatch, keys = result['generate'], result['load'], result['dispatch'], result['keys']
+    print(f"파일 {files}개 (생성 {generate['seconds']:.2f}초, {generate['bytes'] / (1024 * 1024):.1f}MB, "
+          f"mp3/ogg {generate['encoded']}개) - 최대 RSS {result['rss'] / (1024 * 1024):.1f}MB "
+          f"(라이브러리 준비 직후 {load['rss'] / (1024 * 1024):.1f}MB)")
+    print(f"  {'시작':<10}{result['init_s'] * 1000:>10.1f}ms")
+    print(f"  {'스캔':<10}{result['scan']['seconds'] * 1000:>10.1f}ms  {rate(result['scan']['files'], result['scan']['seconds']):>14}"
+          f"  폴더별 {latency(result['scan'])}")
+    print(f"  {'준비':<10}{load['seconds'] * 1000:>10.1f}ms  {rate(files, load['seconds']):>14}")
+    for phase in ('cold', 'warm'):
+        probe = result[f'probe_{phase}']
+        print(f"  {'측정 ' + phase:<10}{probe['seconds'] * 1000:>10.1f}ms  {rate(probe['count'], probe['seconds']):>14}"
+              f"  {latency(probe)}")
+    match = result['match']
+    print(f"  {'매칭':<10}{match['seconds'] * 1000:>10.1f}ms  {rate(match['count'], match['seconds']):>14}"
+          f"  {latency(match)}  (매칭 {match['matches']}회)")
+    print(f"  {'키 입력':<10}{keys['seconds'] * 1000:>10.1f}ms  {rate(keys['queue']['count'], keys['seconds']):>14}"
+          f"  큐 {latency(keys['queue'])}  (트리거 {keys['triggers']}회, 버린 키 {keys['dropped']})")
+    print(f"  {'디스패치':<10}{dispatch['seconds'] * 1000:>10.1f}ms  {rate(dispatch['count'], dispatch['seconds']):>14}"
+          f"  스케줄러 {latency(dispatch['lag'])}")
+    print(f"  {'':<10}{'':>10}    {'':>14}  키→재생 {latency(dispatch['play'])}  (재생 {dispatch['play']['count']}회)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', default='100,1000,10000', help='라이브러리 파일 수 목록 (쉼표로 구분)')
+    parser.add_argument('--folders', type=int, default=10, help='반응 폴더 수')
+    parser.add_argument('--patterns', type=int, default=20, help='폴더당 패턴 수')
+    parser.add_argument('--min-seconds', type=float, default=0.2)
+    parser.add_argument('--max-seconds', type=float, default=1.5)
+    parser.add_argument('--encoded', type=float, default=0.0, help='mp3/ogg로 만들 파일 비율 (pydub + ffmpeg 필요)')
+    parser.add_argument('--keys', type=int, default=20000, help='매칭 단계의 키 입력 수')
+    parser.add_argument('--pattern-ratio', type=float, default=0.05, help='키 입력 중 패턴을 입력할 확률')
+    parser.add_argument('--dispatches', type=int, default=2000, help='디스패치 단계의 반응 트리거 수')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.keys, args.dispatches, args.pattern_ratio, args.seed)
+        return
+
+    scales = [int(scale) for scale in args.scales.split(',') if scale.strip()]
+    print(f"폴더 {args.folders}개 × 패턴 {args.patterns}개, 키 입력 {args.keys}개, 트리거 {args.dispatches}개 "
+          f"(null 오디오, 키보드 없음)")
+    workdir = tempfile.mkdtemp(prefix='aha-scale-')
+    try:
+        for files in scales:
+            print_result(files, measure(workdir, files, args))
+            shutil.rmtree(os.path.join(workdir, f'library-{files}'), ignore_errors=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
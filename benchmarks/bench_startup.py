@@ -0,0 +1,113 @@
+"""시작 시간 벤치마크: 일반 시작 vs 빠른 시작 (메타데이터 캐시 cold / warm)
+
+가상 라이브러리(WAV)를 임시 폴더에 만들고, 새 프로세스에서 main을 import해
+키보드 리스너를 켤 수 있을 때까지와 라이브러리 준비 완료까지 걸린 시간을 잰다.
+
+사용법:
+    python benchmarks/bench_startup.py [--files 200] [--repeat 3]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import wave
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FOLDERS = ['aha', 'crazy', 'wow', 'yeah', 'no', 'hmm', 'lol', 'confused', 'but', 'work']
+
+# 자식 프로세스: main import → 생성 (→ 빠른 시작이면 run()처럼 백그라운드 스캔) → 시간 출력
+CHILD = """
+import json, os, sys, threading, time
+started = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import main
+imported = time.perf_counter()
+program = main.AhaReactionProgram()
+listener_ready = time.perf_counter()
+if not program.library_ready.is_set():
+    threading.Thread(target=program.load_library, daemon=True).start()
+program.library_ready.wait()
+library_ready = time.perf_counter()
+program.scheduler.stop()
+program.key_pipeline.stop()
+program.metadata_cache.save()
+main.logs.shutdown()
+print(json.dumps({'import': imported - started, 'listener': listener_ready - started,
+                  'library': library_ready - started}))
+"""
+
+
+def write_wav(path, seconds, rate=22050):
+    """무음 16bit 모노 WAV 파일 생성"""
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(b'\0\0' * int(rate * seconds))
+
+
+def make_library(root, file_count):
+    """폴더마다 고르게 나눈 가상 반응 사운드 라이브러리"""
+    for i in range(file_count):
+        folder = os.path.join(root, FOLDERS[i % len(FOLDERS)])
+        os.makedirs(folder, exist_ok=True)
+        write_wav(os.path.join(folder, f'sound{i:05d}.wav'), 0.2 + (i % 7) * 0.1)
+
+
+def write_config(path, fast):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"[log]\nquiet = true\n\n[startup]\nfast = {'true' if fast else 'false'}\n\n"
+                "[sound_cache]\nwarm = false\n\n[library]\nwatch = false\n\n[config]\nwatch = false\n")
+
+
+def run_child(library, config_path):
+    env = dict(os.environ, SDL_AUDIODRIVER='dummy', AHA_CONFIG=config_path,
+               PYGAME_HIDE_SUPPORT_PROMPT='1')
+    result = subprocess.run([sys.executable, '-c', CHILD, ROOT], cwd=library, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(library, fast, cold, repeat):
+    """같은 조건으로 repeat번 실행한 중앙값 (cold면 매번 캐시 삭제)"""
+    config_path = os.path.join(library, 'bench.toml')
+    write_config(config_path, fast)
+    cache_dir = os.path.join(library, '.aha_cache')
+    if not cold:
+        run_child(library, config_path)  # 캐시 채우기
+    samples = []
+    for _ in range(repeat):
+        if cold:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        samples.append(run_child(library, config_path))
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=200, help='가상 라이브러리 파일 수')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    library = tempfile.mkdtemp(prefix='aha-bench-')
+    try:
+        make_library(library, args.files)
+        print(f"가상 라이브러리: {args.files}개 파일, {len(FOLDERS)}개 폴더 (중앙값, {args.repeat}회)")
+        print(f"  {'모드':<14}{'캐시':<8}{'import':>10}{'리스너 준비':>14}{'라이브러리 준비':>16}")
+        for fast in (False, True):
+            for cold in (True, False):
+                timing = measure(library, fast, cold, args.repeat)
+                print(f"  {'빠른 시작' if fast else '일반 시작':<14}{'cold' if cold else 'warm':<8}"
+                      f"{timing['import'] * 1000:>8.1f}ms{timing['listener'] * 1000:>12.1f}ms"
+                      f"{timing['library'] * 1000:>14.1f}ms")
+    finally:
+        shutil.rmtree(library, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
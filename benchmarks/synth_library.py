@@ -0,0 +1,156 @@
+"""가상 사운드 라이브러리 생성기: 폴더/패턴 수와 파일 형식을 바꿔 가며 규모별 벤치마크용 라이브러리와 aha.toml 만들기
+
+파일은 사인파/노이즈 WAV (샘플레이트 8000/22050/44100, 모노/스테레오, 8/16bit, 길이 min~max초)이고,
+--encoded 비율만큼은 pydub(ffmpeg)로 mp3/ogg로 저장한다 (pydub/ffmpeg가 없으면 WAV로 대신).
+work 폴더(패턴 없음)는 항상 만든다 (일 재촉 타이머가 있다고 가정하는 폴더).
+
+사용법:
+    python benchmarks/synth_library.py OUT [--files 1000] [--folders 10] [--patterns 20] [--encoded 0.1]
+"""
+
+import argparse
+import array
+import math
+import os
+import random
+import sys
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_matcher import ALPHABET  # noqa: E402
+
+SAMPLE_RATES = (8000, 22050, 44100)
+CHANNELS = (1, 2)
+SAMPLE_WIDTHS = (1, 2)
+ENCODED_FORMATS = ('mp3', 'ogg')
+
+
+class WaveformBank:
+    """(샘플레이트, 채널, 샘플 폭)마다 max_seconds 길이 사인파/노이즈 PCM을 한 번만 만들고 잘라 쓰기"""
+
+    def __init__(self, max_seconds, rng):
+        self.max_seconds = max_seconds
+        self.rng = rng
+        self._cache = {}
+
+    def pcm(self, kind, rate, channels, width, seconds):
+        key = (kind, rate, channels, width)
+        data = self._cache.get(key)
+        if data is None:
+            data = self._cache[key] = self._render(kind, rate, channels, width)
+        frame_bytes = channels * width
+        return data[:int(rate * seconds) * frame_bytes]
+
+    def _render(self, kind, rate, channels, width):
+        frames = int(rate * self.max_seconds)
+        if kind == 'noise':
+            return self.rng.randbytes(frames * channels * width)
+        frequency = self.rng.choice((220.0, 440.0, 660.0, 880.0))
+        step = 2 * math.pi * frequency / rate
+        if width == 1:  # 8bit WAV는 부호 없는 값
+            samples = array.array('B', (128 + int(100 * math.sin(i * step)) for i in range(frames) for _ in range(channels)))
+        else:
+            samples = array.array('h', (int(12000 * math.sin(i * step)) for i in range(frames) for _ in range(channels)))
+            if sys.byteorder == 'big':
+                samples.byteswap()
+        return samples.tobytes()
+
+
+def write_wav(path, pcm, rate, channels, width):
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(channels)
+        f.setsampwidth(width)
+        f.setframerate(rate)
+        f.writeframes(pcm)
+
+
+def _encoder():
+    """pydub AudioSegment (ffmpeg까지 있어야 인코딩 가능), 없으면 None"""
+    try:
+        from pydub import AudioSegment
+        from pydub.utils import which
+    except ImportError:
+        return None
+    return AudioSegment if which('ffmpeg') or which('avconv') else None
+
+
+def make_patterns(folder_count, patterns_per_folder, rng):
+    """폴더마다 2~8글자 랜덤 패턴 (폴더끼리 겹치지 않게)"""
+    used = set()
+    folders = []
+    for _ in range(folder_count):
+        patterns = []
+        while len(patterns) < patterns_per_folder:
+            pattern = ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(2, 8)))
+            if pattern not in used:
+                used.add(pattern)
+                patterns.append(pattern)
+        folders.append(patterns)
+    return folders
+
+
+def write_config(path, folders, extra=''):
+    """가상 라이브러리용 aha.toml (폴더 순서 = 매칭 우선순위, work는 마지막)"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(extra)
+        for folder_key, patterns in folders.items():
+            quoted = ', '.join('"' + pattern.replace('\\', '\\\\').replace('"', '\\"') + '"' for pattern in patterns)
+            f.write(f'\n[folders.{folder_key}]\npatterns = [{quoted}]\n')
+
+
+def generate_library(root, files=1000, folders=10, patterns=20, min_seconds=0.2, max_seconds=1.5,
+                     encoded=0.0, seed=0, config_extra=''):
+    """root 아래에 가상 라이브러리와 aha.toml 생성, {'files', 'bytes', 'encoded', 'folders': {폴더: 패턴 목록}} 반환"""
+    rng = random.Random(seed)
+    waveforms = WaveformBank(max_seconds, rng)
+    encoder = _encoder() if encoded > 0 else None
+    folder_patterns = {f'f{i:03d}': folder for i, folder in enumerate(make_patterns(folders, patterns, rng))}
+    folder_patterns['work'] = []
+    folder_keys = list(folder_patterns)
+    for folder_key in folder_keys:
+        os.makedirs(os.path.join(root, folder_key), exist_ok=True)
+
+    total_bytes = encoded_count = 0
+    for index in range(files):
+        folder_key = folder_keys[index % len(folder_keys)]
+        rate, channels, width = rng.choice(SAMPLE_RATES), rng.choice(CHANNELS), rng.choice(SAMPLE_WIDTHS)
+        seconds = rng.uniform(min_seconds, max_seconds)
+        pcm = waveforms.pcm(rng.choice(('sine', 'noise')), rate, channels, width, seconds)
+        base = os.path.join(root, folder_key, f'sound{index:06d}')
+        if encoder is not None and rng.random() < encoded:
+            path = f'{base}.{rng.choice(ENCODED_FORMATS)}'
+            segment = encoder(data=pcm, sample_width=width, frame_rate=rate, channels=channels)
+            segment.export(path, format=os.path.splitext(path)[1][1:])
+            encoded_count += 1
+        else:
+            path = base + '.wav'
+            write_wav(path, pcm, rate, channels, width)
+        total_bytes += os.path.getsize(path)
+
+    write_config(os.path.join(root, 'aha.toml'), folder_patterns, config_extra)
+    return {'files': files, 'bytes': total_bytes, 'encoded': encoded_count, 'folders': folder_patterns}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('out', help='라이브러리를 만들 폴더')
+    parser.add_argument('--files', type=int, default=1000)
+    parser.add_argument('--folders', type=int, default=10, help='반응 폴더 수 (work 폴더 제외)')
+    parser.add_argument('--patterns', type=int, default=20, help='폴더당 패턴 수')
+    parser.add_argument('--min-seconds', type=float, default=0.2)
+    parser.add_argument('--max-seconds', type=float, default=1.5)
+    parser.add_argument('--encoded', type=float, default=0.0, help='mp3/ogg로 저장할 파일 비율 (pydub + ffmpeg 필요)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.encoded > 0 and _encoder() is None:
+        print("-- pydub/ffmpeg가 없어 모두 WAV로 만듭니다")
+    info = generate_library(args.out, args.files, args.folders, args.patterns, args.min_seconds, args.max_seconds,
+                            args.encoded, args.seed)
+    print(f">> {args.out}: 파일 {info['files']}개 ({info['bytes'] / (1024 * 1024):.1f}MB, mp3/ogg {info['encoded']}개), "
+          f"폴더 {len(info['folders'])}개, 패턴 {sum(len(p) for p in info['folders'].values())}개")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,135 +1,347 @@
-import pygame
+import json
 import threading
 import time
 import os
 import random
-from collections import deque
-from pynput import keyboard
-
-# 추가: 오디오 파일 길이 측정용
-try:
-    import wave
-    import contextlib
-    WAVE_SUPPORT = True
-except ImportError:
-    WAVE_SUPPORT = False
-
-# 오디오 파일 길이 측정을 위한 라이브러리
-try:
-    from pydub import AudioSegment
-    import math
-    PYDUB_SUPPORT = True
-    print(">> pydub 지원: 다양한 오디오 형식 길이 측정 가능")
-except ImportError:
-    PYDUB_SUPPORT = False
-    print("-- pydub 없음: WAV 파일만 정확한 길이 측정 (기타 형식은 5초 추정)")
+from collections import Counter, deque
+from aha_reaction_program import logs
+from aha_reaction_program.audio_meta import MetadataCache, decode_duration
+from aha_reaction_program.backends import make_audio_backend
+from aha_reaction_program.channels import ChannelManager
+from aha_reaction_program.coalescer import ACCEPTED as TRIGGER_ACCEPTED, TriggerCoalescer
+from aha_reaction_program.config import (DEFAULT_CONFIG_PATH, ConfigError, build_sound_folders,
+                                         build_volume_settings, config_mtime, load_config)
+from aha_reaction_program.daemon import MAX_ERRORS, DaemonServer
+from aha_reaction_program.dynamics import TypingDynamics
+from aha_reaction_program.inputs import CharKey, TraceRecorder, make_input_source
+from aha_reaction_program.journal import EventJournal
+from aha_reaction_program.key_pipeline import KeyPipeline
+from aha_reaction_program.library import SUPPORTED_FORMATS, LibraryWatcher, scan_folder
+from aha_reaction_program.loudness import LOUDNESS_FIELD, LoudnessAnalyzer, gain_for
+from aha_reaction_program.matcher import PatternMatcher
+from aha_reaction_program.playlist import ShuffleBag, prefetch_file
+from aha_reaction_program.reactions import Reaction
+from aha_reaction_program.scheduler import Scheduler
+from aha_reaction_program.selection import ClipSelector, weight_function
+from aha_reaction_program.snippets import SnippetEngine
+from aha_reaction_program.soundbank import SoundBanks
+from aha_reaction_program.sound_pool import SoundPool
+from aha_reaction_program.stats import Metrics
+from aha_reaction_program.stats_server import StatsServer
+from aha_reaction_program.transcode import TranscodeCache
+# pynput/pydub/numpy(믹싱 엔진, 몽타주)는 무거워서 처음 필요할 때 import (빠른 시작)
 
 class AhaReactionProgram:
     def __init__(self):
-        # pygame 초기화
-        pygame.mixer.init()
+        # 설정 파일 로드 (aha.toml, 없으면 기본값 / AHA_CONFIG 환경변수로 경로 변경 가능)
+        self.config_path = os.environ.get('AHA_CONFIG', DEFAULT_CONFIG_PATH)
+        self.config = load_config(self.config_path)
+        self.config_signature = config_mtime(self.config_path)
+        self.config_call = None  # 설정 파일 변경 확인 예약
+        self.config_reloading = False
+       
+        # 로그 설정 - 카테고리: app, keys, matcher, playback, ambient, timer, library
+        self.log_settings = dict(self.config['log'])
+        logs.configure(**self.log_settings)
+       
+        # 오디오 백엔드 초기화 (pygame 믹서, 또는 장치 없이 재생 이벤트만 기록하는 null)
+        self.audio = make_audio_backend(self.config['audio']['backend'])
+        self.audio.init()
        
         # 최근 타이핑 기록 (최근 15글자에서 매칭)
         self.recent_keys = deque(maxlen=15)
        
-        # 반응 사운드 파일 목록들
-        self.sound_folders = {
-            'aha': {'folder': 'aha/', 'patterns': [ 'dkgk', 'akwsp', 'akwdk', 'aha'], 'files': []},  # 아하, 맞네, 맞아
-            'crazy': {'folder': 'crazy/', 'patterns': [ 'alcls', 'crazy'], 'files': []}, # 미친
-            'wow': {'folder': 'wow/', 'patterns': [ 'dhk', 'dndhk', 'dh', 'eoqkr', 'gjf', 'wow'], 'files': []}, # 와, 우와, 오, 대박, 헐
-            'yeah': {'folder': 'yeah/', 'patterns': [ 'dP~', 'dhdP', 'dPtm', 'dptm', 'yes', 'whgdk', 'yeah', 'yes'], 'files': []}, # 예~, 오예, 예스, 에스, 좋아
-            'no': {'folder': 'no/', 'patterns': [ 'dksl', 'dkseho', 'dpdl', 'no', 'never'], 'files': []}, # 아니, 안돼, 에이
-            'hmm': {'folder': 'hmm/', 'patterns': [ 'dma', 'gma', 'dj...', 'dj..', 'umm', 'hmm'], 'files': []}, # 음, 흠, 어...
-            'lol': {'folder': 'lol/', 'patterns': ['ㅋㅋㅋ', 'ㅋㅋ', 'zzz' ,'zz' ,'kkk', 'kk', 'lol', 'gkgk', 'glgl', 'gpgp', 'dntru', 'dntrlek'], 'files': []},  # 하하, 히히, 헤헤, 웃겨, 웃기다
-            'confused': {'folder': 'confused/', 'patterns': [ 'antmsakfdldi', 'dlgodksrk', 'ahfmrpTek' , 'ahfmrpTdj' , 'anjfRk' , 'anjdi', 'anjrk', 'gjr', 'what'], 'files': []}, # 무슨말이야, 이해안가, 모르겠다, 모르겠어, 뭘까, 뭐야, 뭐가, 헉
-            'but': {'folder': 'but/', 'patterns': [ 'rmsep', 'rmfjgwlaks' , 'rmfjsk' ,'but', 'well', 'anyway', 'btw'], 'files': []}, # 근데, 그렇지만, 그러나
-            'work': {'folder': 'work/', 'patterns': [], 'files': []}  # 타이머 전용, 패턴 없음
-        }
+        # 키보드 훅 → 큐 → 소비자 스레드 (훅 콜백 예산: 50µs)
+        self.key_pipeline = KeyPipeline(self._handle_key, hook_budget_us=50)
+        self.input_source = None  # run()에서 생성 (키보드 또는 trace 재생)
+        self.trace_recorder = TraceRecorder(self.config['input']['record']) if self.config['input']['record'] else None
+       
+        # 반응 사운드 파일 목록들 (폴더 순서 = 패턴 매칭 우선순위)
+        self.sound_folders = build_sound_folders(self.config)
        
         # 볼륨 설정 (0.0 ~ 1.0) - 폴더별로 설정
-        self.volume_settings = {
-            'aha': 0.5,
-            'crazy': 0.5,
-            'wow': 0.5,
-            'yeah': 0.5,
-            'no': 0.5,
-            'hmm': 0.5,
-            'lol': 0.5,
-            'confused': 0.5,
-            'but': 0.5,
-            'work': 0.9,  # 일 재촉은 좀 크게
-            'ambient': 0.1
-        }
+        self.volume_settings = build_volume_settings(self.config)
+        self.folder_emojis = {folder_key: folder['emoji'] for folder_key, folder in self.config['folders'].items()}
+       
+        # 반응 재생 시간 설정
+        self.base_duration = self.config['reaction']['base_duration']
+        self.min_extend_interval = self.config['reaction']['min_extend_interval']
+       
+        # 연달아 매칭되는 트리거 합치기 + 폴더별/전체 속도 제한 (키 입력 처리 스레드에서 사용)
+        self.trigger_coalescer = TriggerCoalescer(**self.config['triggers'])
+       
+        # 사운드 캐시 설정 - 디코딩된 사운드를 메모리에 보관
+        self.sound_cache_budget_mb = self.config['sound_cache']['budget_mb']  # 최대 메모리 사용량 (MB)
+        self.sound_cache_warm = self.config['sound_cache']['warm']  # 시작할 때 자주 쓰는 폴더 미리 로드
+        self.sound_pool = SoundPool(budget_bytes=self.sound_cache_budget_mb * 1024 * 1024, loader=self.load_sound)
+        # 사운드 뱅크 - 폴더별 PCM 묶음 파일을 mmap으로 열어 두고, 뱅크에 있는 파일은 사운드 캐시 대신 사용
+        self.sound_banks = self.create_sound_banks() if self.config['soundbank']['enabled'] else None
+        self.snippet_engine = SnippetEngine(self.sound_pool, self.audio, self.sound_banks)  # 캐시된 버퍼에서 구간만 잘라 재생
+       
+        # 반응 몽타주 - 여러 구간을 이어 붙인 소리를 백그라운드에서 미리 만들어 두고 반응 시작 시 한 번에 재생
+        self.montage_renderer = self.create_montage_renderer() if self.config['montage']['enabled'] else None
+       
+        # PCM 변환 캐시 - 믹서 형식으로 변환해 둔 파일은 디코딩/리샘플링 없이 mmap으로 불러옴
+        self.transcode_settings = dict(self.config['transcode'])
+        self.transcode_cache = self.create_transcode_cache() if self.transcode_settings['enabled'] else None
+       
+        # 채널 설정 - 폴더별 예약 채널과 채널이 부족할 때 빼앗는 정책
+        self.channel_settings = dict(self.config['channels'])
+       
+        # 믹싱 엔진 (engine = 'numpy') - 반응을 블록 단위로 섞어 출력 채널 하나로 재생, 배경음악은 ducking
+        # ChannelManager와 같은 인터페이스라 channel_manager 자리에 그대로 사용
+        self.mixer_settings = dict(self.config['mixer'])
+        self.mixing_engine = self.create_mixing_engine() if self.mixer_settings['engine'] == 'numpy' else None
+        self.channel_manager = self.mixing_engine or ChannelManager(self.audio, **self.channel_settings)
+        self.music = self.mixing_engine.music if self.mixing_engine else self.audio.music  # 배경음악 재생기
+       
+        # 라이브러리 감시 - 실행 중 폴더에 파일을 추가/삭제/수정하면 바로 반영
+        self.library_watch = self.config['library']['watch']
+        self.library_poll_interval = self.config['library']['poll_interval']  # inotify를 못 쓸 때 폴링 간격 (초)
+        self.library_watcher = None
        
         # 타이머 관련 설정
         self.last_typing_time = time.time()
-        self.work_reminder_interval = 180  # 3분 (180초)
-        self.work_timer_thread = None
+        self.work_reminder_interval = self.config['work']['reminder_interval']  # 기본 3분 (180초)
+        self.work_repeat_interval = self.config['work']['repeat_interval']  # 첫 알림 후 반복 간격
+        self.work_adaptive = self.config['work']['adaptive']  # 평소 쉬는 시간 기준으로 알림 간격 조절
+        self.work_min_interval = self.config['work']['min_interval']
+        self.work_timer_call = None
         self.work_timer_active = True
        
-        # 폴더별 스레드 관리 (같은 폴더는 단일, 다른 폴더는 멀티)
-        self.folder_threads = {}  # {folder_key: thread_object}
-        self.folder_start_times = {}  # {folder_key: start_time} 재생 시작 시간 추적
-        self.folder_last_reaction_times = {}  # {folder_key: last_reaction_time} 마지막 반응 시점 추적
-        self.folder_extend_flags = {}  # {folder_key: extend_seconds} 연장 시간
+        # 타이핑 다이내믹스 - 타자 속도/버스트/쉬는 시간 통계 (키 입력 처리 스레드에서 키마다 O(1) 갱신)
+        self.typing_dynamics = TypingDynamics(**self.config['dynamics'])
+       
+        # 반응/배경음악/타이머를 모두 처리하는 단일 스케줄러 스레드
+        self.scheduler = Scheduler()
+       
+        # 단계별 지연 시간 (키 훅 → 큐 → 매칭 → 스케줄러 → 구간 준비 → 채널 시작) + 폴더별 카운터
+        self.metrics = Metrics()
+        self.metrics.add_histogram('hook', self.key_pipeline.hook_latency)
+        self.metrics.add_histogram('queue', self.key_pipeline.queue_latency)
+        self.match_latency = self.metrics.histogram('match', '패턴 매칭')
+        self.metrics.add_histogram('dispatch', self.scheduler.lag)
+        self.load_latency = self.metrics.histogram('snippet_load', '구간 준비 (로드/디코딩)')
+        self.channel_latency = self.metrics.histogram('channel_start', '채널 재생 시작')
+        self.play_latency = self.metrics.histogram('key_to_play', '키→재생')  # 패턴을 완성한 키 입력 → 첫 구간 재생 시작
+        self.metrics.add_counter('channel_plays', self.channel_manager.plays)
+        self.metrics.add_counter('channel_dropped', self.channel_manager.dropped)
+        self.metrics.add_counter('channel_stolen', self.channel_manager.stolen)
+        self.metrics.add_counter('trigger_coalesced', self.trigger_coalescer.coalesced)
+        self.metrics.add_counter('trigger_limited', self.trigger_coalescer.limited)
+        self.stats_settings = dict(self.config['stats'])
+        self.stats_server = None
+       
+        # 이벤트 저널 - 매칭/반응/재생 기록 (큐에 넣기만 하고 파일 쓰기는 백그라운드 스레드에서 모아서)
+        self.journal = self.create_journal() if self.config['journal']['enabled'] else None
+       
+        # 데몬 모드 - 소켓 클라이언트의 키/반응 이벤트 (연결마다 스레드, 처리는 키 입력 큐/스케줄러로 넘김)
+        self.daemon_server = None
+        self.daemon_events = Counter()  # 종류별 처리한 이벤트 수
+        self.daemon_lock = threading.Lock()
+        self.metrics.add_counter('daemon_events', self.daemon_events)
+       
+        # 폴더별 파일 선택기 (가중치 + 최근 재생 반복 방지, 파일 스캔 뒤 생성)
+        self.clip_selectors = {}  # {folder_key: ClipSelector} 스케줄러 스레드에서 사용
+       
+        # 폴더별 반응 관리 (같은 폴더는 단일, 다른 폴더는 동시 재생)
+        self.reactions = {}  # {folder_key: Reaction} 스케줄러 스레드에서만 변경
        
         # 모드 설정 (0: 무음, 1: ambient music)
         self.background_mode = 0
         self.is_running = True
-        self.ambient_thread = None
+        self.ambient_call = None  # 다음 곡 확인 예약
+        self.ambient_track_duration = 0.0
         self.ambient_playing = False
         self.ambient_paused = False  # ambient 일시정지 상태
        
-        # ambient 음악 파일 목록
+        # ambient 음악 파일 목록 (반복 없는 셔플 순서로 재생, 다음 곡은 미리 읽어서 대기열에)
         self.ambient_files = []
+        self.ambient_playlist = ShuffleBag()
+        self.ambient_queued = None  # (경로, 길이) music.queue()로 이어 붙인 다음 곡
+        self.ambient_prefetch_token = 0  # 정지/곡 변경 후 끝난 이전 미리 읽기는 무시
+       
+        # 오디오 길이 캐시 (.aha_cache/metadata.json, 경로+mtime+크기로 무효화)
+        self.metadata_cache = MetadataCache(fallback=decode_duration)
+       
+        # 음량 정규화 - 파일별 RMS/피크는 프로세스 풀에서 한 번만 분석해 같은 캐시에 저장, 재생할 때는 게인만 계산
+        self.loudness_settings = dict(self.config['loudness'])
+        self.loudness_analyzer = LoudnessAnalyzer(self.metadata_cache, workers=self.loudness_settings['workers'])
        
-        # 오디오 파일 확인
+        # 패턴 매처 컴파일 (work 폴더는 패턴이 없으므로 자동 제외, 파일 스캔 전에도 가능)
+        self.pattern_matcher = PatternMatcher.from_sound_folders(self.sound_folders, policy=self.config['matcher']['policy'])
+       
+        # 스케줄러, 키 입력 처리 스레드 시작
+        self.scheduler.start()
+        if self.mixing_engine is not None:
+            self.mixing_engine.start()
+        self.key_pipeline.start()
+        if self.config['config']['watch']:
+            self._schedule_config_check()
+        if self.stats_settings['http']:
+            self.start_stats_server()
+       
+        # 빠른 시작 모드면 폴더 스캔은 run()에서 리스너를 켠 뒤 백그라운드로
+        self.fast_startup = self.config['startup']['fast']
+        self.library_ready = threading.Event()
+        self.key_codes = None  # pynput.keyboard.Key 또는 trace 재생용 특수 키 (run()에서 설정)
+        if not self.fast_startup:
+            self.load_library()
+       
+    def create_mixing_engine(self):
+        """numpy 믹싱 엔진 생성 (numpy가 없으면 채널 방식으로 대체)"""
+        from aha_reaction_program.mixing import NUMPY_SUPPORT, MixingEngine
+        if not NUMPY_SUPPORT:
+            logs.app.warning("-- numpy 없음: 믹싱 엔진 대신 채널 방식으로 재생합니다 (pip install numpy)")
+            return None
+        settings = {key: value for key, value in self.mixer_settings.items() if key != 'engine'}
+        try:
+            return MixingEngine(self.audio, **settings)
+        except ValueError as e:
+            logs.app.warning("-- 믹싱 엔진을 사용할 수 없어 채널 방식으로 재생합니다: %s", e)
+            return None
+       
+    def create_transcode_cache(self):
+        """믹서 출력 형식에 맞춘 PCM 변환 캐시 (16bit 믹서가 아니면 사용 안 함)"""
+        frequency, size, channels = self.audio.get_init()
+        if size != -16:
+            logs.app.warning("-- PCM 변환 캐시는 16bit 믹서 형식만 지원합니다 (현재 %d)", size)
+            return None
+        return TranscodeCache(self.transcode_settings['dir'], frequency, channels,
+                              workers=self.transcode_settings['workers'])
+       
+    def create_sound_banks(self):
+        """믹서 출력 형식의 사운드 뱅크 모음 (16bit 믹서가 아니면 사용 안 함)"""
+        frequency, size, channels = self.audio.get_init()
+        if size != -16:
+            logs.app.warning("-- 사운드 뱅크는 16bit 믹서 형식만 지원합니다 (현재 %d)", size)
+            return None
+        return SoundBanks(self.config['soundbank']['dir'], frequency, channels)
+       
+    def create_montage_renderer(self):
+        """폴더별 몽타주 렌더러 (numpy가 없으면 사용 안 함, 스레드는 라이브러리 준비 후 시작)"""
+        from aha_reaction_program.montage import MontageRenderer
+        settings = self.config['montage']
+        try:
+            return MontageRenderer(self.audio, lambda: {folder_key: folder_info['files']
+                                                        for folder_key, folder_info in self.sound_folders.items()},
+                                   self.snippet_engine.pcm_view, gain=self.file_gain, duration=self.base_duration,
+                                   pool_size=settings['pool_size'], crossfade_ms=settings['crossfade_ms'])
+        except RuntimeError as e:
+            logs.app.warning("-- 반응 몽타주를 사용할 수 없어 구간 재생 방식으로 재생합니다: %s", e)
+            return None
+       
+    def open_sound_banks(self):
+        """폴더별 뱅크 열기 (뱅크에 없거나 바뀐 파일은 기존처럼 디코딩해서 재생)"""
+        banked = missing = 0
+        for folder_key, folder_info in self.sound_folders.items():
+            if folder_info['files']:
+                opened, stale = self.sound_banks.open(folder_key, folder_info['files'])
+                banked += opened
+                missing += stale
+        print(f">> 사운드 뱅크: {banked}개 파일 ({self.sound_banks.stats()['mapped_bytes'] / (1024 * 1024):.1f}MB mmap)")
+        if missing:
+            logs.library.warning("-- 뱅크에 없거나 바뀐 파일 %d개 (python -m aha_reaction_program.soundbank로 갱신)", missing)
+       
+    def load_sound(self, file_path):
+        """사운드 디코딩 (변환 캐시에 있으면 mmap으로 바로, 없으면 원본 디코딩)"""
+        if self.transcode_cache is not None:
+            sound = self.transcode_cache.load(file_path, self.audio.sound_from_buffer)
+            if sound is not None:
+                return sound
+        return self.audio.load_sound(file_path)
+       
+    def load_library(self):
+        """오디오 파일 스캔, 길이 인덱싱, 사운드 미리 로드, 폴더 감시, 일 재촉 타이머 시작"""
+        started = time.perf_counter()
+        if self.library_watch:
+            self.library_watcher = self.create_library_watcher()  # 스캔 전에 스냅샷 (스캔 도중 바뀐 파일 놓치지 않게)
         self.check_audio_files()
+        self.clip_selectors = self.build_clip_selectors(self.config, self.sound_folders)
+        if self.sound_banks is not None:
+            self.open_sound_banks()
+        if self.transcode_cache is not None:
+            self.transcode_cache.submit(self.reaction_files())
+        if self.loudness_settings['normalize']:
+            self.analyze_loudness()
        
-        # 일 재촉 타이머 시작
-        self.start_work_timer()
+        # 자주 쓰는 폴더의 사운드를 백그라운드에서 미리 디코딩
+        if self.sound_cache_warm:
+            self.warm_sound_pool()
+        if self.library_watcher is not None:
+            self.library_watcher.start()
+        if self.montage_renderer is not None:
+            self.montage_renderer.start()
+        self.scheduler.call_soon(self.start_work_timer)
+        self.library_ready.set()
+        logs.app.info(">> 라이브러리 준비 완료 (%.0fms)", (time.perf_counter() - started) * 1000)
        
     def get_audio_duration(self, file_path):
-        """오디오 파일의 길이를 초 단위로 반환"""
-        try:
-            if WAVE_SUPPORT and file_path.lower().endswith('.wav'):
-                with contextlib.closing(wave.open(file_path, 'r')) as f:
-                    frames = f.getnframes()
-                    rate = f.getframerate()
-                    duration = frames / float(rate)
-                    return duration
-            elif PYDUB_SUPPORT:
-                audio = AudioSegment.from_file(file_path)
-                return len(audio) / 1000.0  # milliseconds to seconds
-            else:
-                # 기본값으로 5초 반환 (정확하지 않지만 안전)
-                return 5.0
-        except Exception as e:
-            print(f"오디오 길이 측정 오류 ({os.path.basename(file_path)}): {e}")
-            return 5.0  # 기본값
+        """오디오 파일의 길이를 초 단위로 반환 (캐시 → 헤더 측정 → 디코딩)"""
+        return self.metadata_cache.get_duration(file_path)
+       
+    def build_clip_selectors(self, config, sound_folders):
+        """폴더별 파일 선택기 생성 (가중치: 설정의 파일 이름 패턴 × 재생 기록)"""
+        selection = config['selection']
+        plays = lambda file: self.metadata_cache.get(file, 'plays')
+        selectors = {}
+        for folder_key, folder_info in sound_folders.items():
+            weight_of = weight_function(config['folders'][folder_key]['weights'], plays, selection['history'])
+            selectors[folder_key] = ClipSelector(folder_info['files'], weight_of, recent=selection['recent'])
+        return selectors
+       
+    def reaction_files(self):
+        """모든 반응 폴더의 파일 목록 (폴더 순서대로)"""
+        return [file for folder_info in self.sound_folders.values() for file in folder_info['files']]
+       
+    def analyze_loudness(self):
+        """음량 분석이 안 된 반응 파일을 백그라운드 프로세스 풀로 분석"""
+        self.loudness_analyzer.submit(self.reaction_files())
+       
+    def file_gain(self, file_path):
+        """파일별 음량 정규화 게인 (분석 전이거나 꺼져 있으면 1.0)"""
+        if not self.loudness_settings['normalize']:
+            return 1.0
+        return gain_for(self.metadata_cache.get(file_path, LOUDNESS_FIELD),
+                        self.loudness_settings['target_db'], self.loudness_settings['max_gain_db'])
+       
+    def warm_sound_pool(self):
+        """재생 횟수가 많은 폴더부터 사운드 캐시 미리 채우기"""
+        def folder_plays(folder_key):
+            files = self.sound_folders[folder_key]['files']
+            return sum(self.metadata_cache.get(file, 'plays') or 0 for file in files)
+       
+        warm_files = []
+        for folder_key in sorted(self.sound_folders, key=folder_plays, reverse=True):
+            files = self.sound_folders[folder_key]['files']
+            if self.sound_banks is not None:
+                files = [file for file in files if not self.sound_banks.contains(file)]  # 뱅크 파일은 디코딩 불필요
+            warm_files.extend(sorted(files, key=lambda file: self.metadata_cache.get(file, 'plays') or 0, reverse=True))
+        if warm_files:
+            self.sound_pool.warm(warm_files)
        
     def check_audio_files(self):
         """필요한 오디오 파일들이 있는지 확인"""
         print("=" * 60)
         print("*** 오디오 파일 확인 ***")
        
-        # 🔍 디버깅: 현재 위치와 폴더 내용 출력
-        current_dir = os.getcwd()
-        print(f"🔍 현재 작업 디렉토리: {current_dir}")
-        print(f"🔍 현재 폴더 내용: {os.listdir('.')}")
-       
-        # 특정 폴더들 존재 여부 직접 확인
-        for folder in ['aha', 'crazy', 'ambient']:
-            exists = os.path.exists(folder)
-            is_dir = os.path.isdir(folder) if exists else False
-            print(f"🔍 {folder} 폴더: 존재={exists}, 디렉토리={is_dir}")
+        # 🔍 디버깅: 현재 위치와 폴더 내용 출력 (library 카테고리 DEBUG일 때만)
+        if logs.library.debug_enabled:
+            logs.library.debug("🔍 현재 작업 디렉토리: %s", os.getcwd())
+            logs.library.debug("🔍 현재 폴더 내용: %s", os.listdir('.'))
+           
+            # 특정 폴더들 존재 여부 직접 확인
+            for folder in ['aha', 'crazy', 'ambient']:
+                exists = os.path.exists(folder)
+                is_dir = os.path.isdir(folder) if exists else False
+                logs.library.debug("🔍 %s 폴더: 존재=%s, 디렉토리=%s", folder, exists, is_dir)
         print("=" * 60)
        
-        # 지원하는 음악 파일 확장자
-        supported_formats = ['.wav', '.mp3', '.ogg', '.m4a']
+        # 지원하는 음악 파일 확장자 (라이브러리 감시와 같은 목록)
+        supported_formats = SUPPORTED_FORMATS
        
         # 모든 반응 사운드 폴더들 확인
-        for folder_key, folder_info in self.sound_folders.items():
+        for folder_info in self.sound_folders.values():
             folder_path = folder_info['folder']
             folder_name = folder_path.rstrip('/')
            
@@ -173,6 +385,7 @@ class AhaReactionProgram:
                     if ext in supported_formats:
                         self.ambient_files.append(file_path)
            
+            self.ambient_playlist.add(self.ambient_files)
             if self.ambient_files:
                 print(f">> ambient 폴더에서 {len(self.ambient_files)}개의 음악 파일 발견:")
                 for file in self.ambient_files[:3]:  # 최대 3개만 표시
@@ -184,150 +397,318 @@ class AhaReactionProgram:
         else:
             print("-- ambient 폴더가 없습니다. ambient music 기능을 사용할 수 없습니다.")
        
+        # 반응 사운드 길이 인덱싱 (헤더만 읽고, 바뀌지 않은 파일은 캐시 사용)
+        reaction_files = self.reaction_files()
+        cached, probed = self.metadata_cache.index(reaction_files)
+        self.metadata_cache.save()
+        print(f">> 길이 인덱스: {len(reaction_files)}개 파일 (캐시 {cached}개, 새로 측정 {probed}개)")
         print()
        
+    def library_folders(self):
+        """감시할 폴더 목록 {folder_key: 폴더 경로}"""
+        folders = {folder_key: folder_info['folder'].rstrip('/') for folder_key, folder_info in self.sound_folders.items()}
+        folders['ambient'] = 'ambient'
+        return folders
+       
+    def create_library_watcher(self):
+        """반응 폴더와 ambient 폴더 감시기 (변경된 파일만 반영, 초기 스냅샷까지 뜬 상태로 반환)"""
+        watcher = LibraryWatcher(self.library_folders(), self._on_library_change,
+                                 poll_interval=self.library_poll_interval)
+        watcher.snapshot()
+        return watcher
+       
+    def _on_library_change(self, folder_key, added, removed, modified):
+        """라이브러리 변경 처리 (감시 스레드 - 캐시 무효화 및 새 파일 길이 측정)"""
+        for file_path in removed + modified:
+            self.metadata_cache.invalidate(file_path)
+            self.sound_pool.invalidate(file_path)
+            if self.sound_banks is not None:
+                self.sound_banks.invalidate(file_path)
+        for file_path in added + modified:
+            self.get_audio_duration(file_path)  # 헤더만 읽어서 캐시에 저장
+        self.metadata_cache.save()
+        if folder_key != 'ambient':
+            if self.transcode_cache is not None:
+                self.transcode_cache.submit(added + modified)
+            if self.loudness_settings['normalize']:
+                self.loudness_analyzer.submit(added + modified)
+        self.scheduler.call_soon(self._apply_library_delta, folder_key, added, removed, len(modified))
+       
+    def _apply_library_delta(self, folder_key, added, removed, modified_count):
+        """파일 목록에 변경분만 반영 (스케줄러 스레드 - 재생 중인 반응과 같은 리스트를 제자리 수정)"""
+        if folder_key == 'ambient':
+            files = self.ambient_files
+        elif folder_key in self.sound_folders:
+            files = self.sound_folders[folder_key]['files']
+        else:
+            return  # 설정에서 빠진 폴더
+        if removed:
+            removed_set = set(removed)
+            files[:] = [file for file in files if file not in removed_set]
+        existing = set(files)
+        files.extend(file for file in added if file not in existing)
+        if folder_key == 'ambient':
+            self.ambient_playlist.remove(removed)
+            self.ambient_playlist.add(added)
+        elif folder_key in self.clip_selectors:
+            self.clip_selectors[folder_key].remove(removed)
+            self.clip_selectors[folder_key].add(added)
+        if self.montage_renderer is not None and folder_key != 'ambient':
+            self.montage_renderer.invalidate(folder_key)  # 지워진 파일이 들어간 몽타주는 버리고 다시 만들기
+        logs.library.info(">> %s 폴더 변경 반영: 추가 %d / 삭제 %d / 수정 %d (총 %d개)",
+                          folder_key, len(added), len(removed), modified_count, len(files))
+       
+        # work 폴더에 처음 파일이 생기면 타이머 시작
+        if folder_key == 'work' and files and self.work_timer_call is None and self.work_timer_active:
+            self.start_work_timer()
+       
+    def _schedule_config_check(self):
+        """설정 파일 변경 확인 예약 (stat 한 번)"""
+        self.config_call = self.scheduler.call_later(self.config['config']['check_interval'], self._check_config_file)
+       
+    def _check_config_file(self):
+        """설정 파일이 바뀌었으면 다시 불러오기"""
+        if not self.is_running:
+            return
+        if config_mtime(self.config_path) != self.config_signature:
+            self.reload_config()
+        if self.config['config']['watch']:
+            self._schedule_config_check()
+           
+    def reload_config(self):
+        """설정 파일을 백그라운드에서 다시 읽고, 준비가 끝나면 스케줄러 스레드에서 한 번에 교체"""
+        if self.config_reloading:
+            return
+        self.config_reloading = True
+        self.config_signature = config_mtime(self.config_path)  # 같은 변경으로 중복 실행 방지
+        threading.Thread(target=self._build_reloaded_config, name='aha-config', daemon=True).start()
+       
+    def _build_reloaded_config(self):
+        """새 설정으로 폴더 목록과 패턴 매처 생성 (키 입력 처리는 기존 매처로 계속 진행)"""
+        try:
+            config = load_config(self.config_path)
+            sound_folders = build_sound_folders(config, previous=self.sound_folders)
+           
+            # 새로 생겼거나 경로가 바뀐 폴더만 스캔 (기존 폴더는 파일 목록 그대로 사용)
+            for folder_key, folder_info in sound_folders.items():
+                old = self.sound_folders.get(folder_key)
+                if old is None or old['files'] is not folder_info['files']:
+                    folder_info['files'].extend(sorted(scan_folder(folder_info['folder'].rstrip('/'))))
+                    self.metadata_cache.index(folder_info['files'])
+           
+            matcher = PatternMatcher.from_sound_folders(sound_folders, policy=config['matcher']['policy'])
+            for char in list(self.recent_keys):  # 입력 중이던 패턴도 이어서 매칭되도록
+                matcher.feed(char)
+            selectors = self.build_clip_selectors(config, sound_folders) if self.library_ready.is_set() else None
+            self.scheduler.call_soon(self._swap_config, config, sound_folders, matcher, selectors)
+        except ConfigError as e:
+            logs.app.error("-- 설정 파일 오류, 이전 설정 유지: %s", e)
+            self.config_reloading = False
+        except Exception as e:
+            logs.app.error("-- 설정 다시 불러오기 오류: %s", e)
+            self.config_reloading = False
+           
+    def _swap_config(self, config, sound_folders, matcher, selectors=None):
+        """준비된 설정으로 교체 (스케줄러 스레드 - 재생 중인 반응과 충돌 없음)"""
+        try:
+            old_config = self.config
+            self.config = config
+            self.sound_folders = sound_folders
+            self.pattern_matcher = matcher
+            if selectors is not None:
+                self.clip_selectors = selectors
+            self.volume_settings = build_volume_settings(config)
+            self.folder_emojis = {folder_key: folder['emoji'] for folder_key, folder in config['folders'].items()}
+            self.base_duration = config['reaction']['base_duration']
+            self.min_extend_interval = config['reaction']['min_extend_interval']
+            if config['triggers'] != old_config['triggers']:
+                self.trigger_coalescer.configure(**config['triggers'])
+            self.sound_cache_budget_mb = config['sound_cache']['budget_mb']
+            self.sound_pool.budget_bytes = self.sound_cache_budget_mb * 1024 * 1024
+            self.loudness_settings = dict(config['loudness'])
+            self.loudness_analyzer.workers = self.loudness_settings['workers']
+            if self.loudness_settings['normalize'] and self.library_ready.is_set():
+                self.analyze_loudness()  # 새로 켰거나 새 폴더가 생겼을 때 (분석된 파일은 건너뜀)
+            if self.transcode_cache is not None and self.library_ready.is_set():
+                self.transcode_cache.submit(self.reaction_files())  # 새 폴더 파일 변환 (변환된 파일은 건너뜀)
+            if self.montage_renderer is not None:
+                self.montage_renderer.duration = self.base_duration
+                self.montage_renderer.invalidate()  # 폴더/반응 시간/음량 설정이 바뀌었을 수 있으니 모두 새로 만들기
+           
+            # 재생 중인 반응과 배경음악에도 새 볼륨 적용
+            for folder_key, reaction in self.reactions.items():
+                reaction.volume = self.volume_settings.get(folder_key, reaction.volume)
+            if self.ambient_playing:
+                self.music.set_volume(self.volume_settings['ambient'])
+           
+            # 일 재촉 타이머는 새 간격으로 다시 예약
+            self.work_reminder_interval = config['work']['reminder_interval']
+            self.work_repeat_interval = config['work']['repeat_interval']
+            self.work_adaptive = config['work']['adaptive']
+            self.work_min_interval = config['work']['min_interval']
+            if config['dynamics'] != old_config['dynamics']:
+                self.typing_dynamics.configure(**config['dynamics'])
+            if self.work_timer_call is not None:
+                self.work_timer_call.cancel()
+                self._schedule_work_check()
+           
+            if config['log'] != self.log_settings:
+                self.log_settings = dict(config['log'])
+                logs.configure(**self.log_settings)
+            if self.library_watcher is not None:
+                self.library_watcher.set_folders(self.library_folders())
+            for section in ('audio', 'input', 'mixer', 'channels', 'transcode', 'soundbank', 'montage', 'journal', 'daemon',
+                            'library', 'startup'):
+                if config[section] != old_config[section]:
+                    logs.app.warning("-- [%s] 설정 변경은 다시 시작해야 적용됩니다", section)
+           
+            logs.app.info(">> 설정 다시 불러옴: 폴더 %d개, 패턴 %d개", len(sound_folders), matcher.pattern_count)
+        finally:
+            self.config_reloading = False  # 중간에 실패해도 F2/자동 다시 불러오기는 계속 가능하게
+       
     def start_work_timer(self):
         """일 재촉 타이머 시작"""
-        if self.sound_folders['work']['files']:  # work 폴더에 파일이 있을 때만
+        work_folder = self.sound_folders.get('work')  # [folders]에 work가 없으면 타이머 없음
+        if work_folder and work_folder['files']:  # work 폴더에 파일이 있을 때만
             self.work_timer_active = True
-            self.work_timer_thread = threading.Thread(target=self._work_timer_loop, daemon=True)
-            self.work_timer_thread.start()
-            print("⏰ 일 재촉 타이머 활성화! (3분 후 첫 알림)")
+            self._schedule_work_check()
+            logs.timer.info("⏰ 일 재촉 타이머 활성화! (%g분 후 첫 알림)", self.work_reminder_interval / 60)
        
-    def stop_all_folder_threads(self):
-        """모든 폴더 스레드 중지"""
-        for folder_key in list(self.folder_threads.keys()):
-            self.stop_folder_thread(folder_key)
-        print("-- 모든 반응 사운드 중지")
+    def stop_all_folder_reactions(self):
+        """모든 폴더 반응 중지"""
+        self.scheduler.call_soon(self._stop_all_folder_reactions)
+       
+    def _stop_all_folder_reactions(self):
+        for folder_key in list(self.reactions.keys()):
+            self.stop_folder_reaction(folder_key)
+        logs.playback.info("-- 모든 반응 사운드 중지")
        
     def stop_work_timer(self):
         """일 재촉 타이머 정지"""
         self.work_timer_active = False
+        if self.work_timer_call is not None:
+            self.work_timer_call.cancel()
+            self.work_timer_call = None
        
-    def _work_timer_loop(self):
-        """일 재촉 타이머 루프"""
-        try:
-            while self.work_timer_active and self.is_running:
-                time.sleep(1)  # 1초마다 체크
+    def work_idle_interval(self):
+        """일 재촉까지 기다릴 시간 (적응형이면 평소 쉬는 시간 기준, 최대 reminder_interval)"""
+        if not self.work_adaptive:
+            return self.work_reminder_interval
+        return self.typing_dynamics.idle_threshold(self.work_reminder_interval, self.work_min_interval)
+       
+    def _schedule_work_check(self):
+        """마지막 타이핑 + 알림 간격 시점에 한 번만 깨어나도록 예약 (1초 폴링 없음)"""
+        delay = self.last_typing_time + self.work_idle_interval() - time.time()
+        self.work_timer_call = self.scheduler.call_later(delay, self._check_work_timer)
+       
+    def _reschedule_work_check(self):
+        """알림 간격이 바뀌었을 때 예약 시각 갱신 (스케줄러 스레드)"""
+        if self.work_timer_call is not None and self.work_timer_active:
+            self.work_timer_call.cancel()
+            self._schedule_work_check()
+       
+    def _check_work_timer(self):
+        """일 재촉 타이머 확인 (그 사이 타이핑이 있었으면 새 마감 시각으로 재예약)"""
+        if not (self.work_timer_active and self.is_running):
+            return
+       
+        # 마지막 타이핑으로부터 알림 간격(기본 3분) 이상 지났는지 확인
+        idle_interval = self.work_idle_interval()
+        if time.time() - self.last_typing_time >= idle_interval:
+            # 일 재촉 사운드 재생
+            work_folder = self.sound_folders.get('work')  # 설정을 다시 불러와 work 폴더가 빠졌을 수 있음
+            work_files = work_folder['files'] if work_folder else None
+            if work_files:
+                idle_text = f"{round(idle_interval / 60, 1):g}분" if idle_interval >= 60 else f"{idle_interval:.0f}초"
+                logs.timer.info("⏰ %s간 타이핑이 없었습니다! 일하세요!", idle_text)
+                self.metrics.count('work_reminder', 'work')
+                if self.journal is not None:
+                    self.journal.record('timer', folder='work', idle=round(idle_interval, 1))
+                self._start_reaction('work', work_files)
                
-                # 마지막 타이핑으로부터 3분 이상 지났는지 확인
-                if (time.time() - self.last_typing_time >= self.work_reminder_interval and
-                    self.work_timer_active):
-                   
-                    # 일 재촉 사운드 재생
-                    work_files = self.sound_folders['work']['files']
-                    if work_files:
-                        print("⏰ 3분간 타이핑이 없었습니다! 일하세요!")
-                        self.play_reaction_sound('work', work_files)
-                       
-                        # 다음 알림을 위해 시간 업데이트 (1분 후 다시 알림)
-                        self.last_typing_time = time.time() - (self.work_reminder_interval - 60)
-                       
-        except Exception as e:
-            print(f"일 재촉 타이머 오류: {e}")
+                # 다음 알림을 위해 시간 업데이트 (반복 간격 후 다시 알림)
+                self.last_typing_time = time.time() - (idle_interval - self.work_repeat_interval)
+       
+        self._schedule_work_check()
    
     def get_folder_emoji(self, folder_key):
         """폴더별 이모지 반환"""
-        emoji_map = {
-            'aha': '>>',
-            'crazy': '!!',
-            'wow': '😮',
-            'yeah': '🎉',
-            'no': '❌',
-            'hmm': '🤔',
-            'lol': '😂',
-            'confused': '❓',
-            'but': '↔️',
-            'work': '⏰'
-        }
-        return emoji_map.get(folder_key, '🎵')
-       
-    def stop_folder_thread(self, folder_key):
-        """특정 폴더의 스레드 중지"""
-        if folder_key in self.folder_threads:
-            thread = self.folder_threads[folder_key]
-            if thread and thread.is_alive():
-                # 스레드에 중지 신호 전송 (스레드가 체크할 수 있도록)
-                if hasattr(thread, 'stop_flag'):
-                    thread.stop_flag = True
-                print(f"-- {folder_key} 폴더의 이전 반응 중지")
-            del self.folder_threads[folder_key]
-           
-        # 시간 추적 정보도 정리
-        if folder_key in self.folder_start_times:
-            del self.folder_start_times[folder_key]
-        if folder_key in self.folder_last_reaction_times:
-            del self.folder_last_reaction_times[folder_key]
-        if folder_key in self.folder_extend_flags:
-            del self.folder_extend_flags[folder_key]
+        return self.folder_emojis.get(folder_key, '🎵')
+       
+    def stop_folder_reaction(self, folder_key):
+        """특정 폴더의 반응 중지 (스케줄러 스레드에서 호출)"""
+        reaction = self.reactions.pop(folder_key, None)
+        if reaction is None:
+            return
+        reaction.stopped = True
+        reaction.cancel_next_step()
+        self.channel_manager.stop_folder(folder_key)
+        if self.journal is not None:
+            self.journal.record('stop', folder=folder_key, reason='stopped', played=round(reaction.elapsed(), 3))
+        logs.playback.info("-- %s 폴더의 이전 반응 중지", folder_key)
    
-    def extend_folder_reaction(self, folder_key):
-        """새로운 반응에 대해 직전 반응 시점부터의 경과 시간만큼 연장"""
-        if folder_key in self.folder_start_times and folder_key in self.folder_threads:
-            current_time = time.time()
+    def extend_folder_reaction(self, folder_key, timestamp_ns=None):
+        """새로운 반응에 대해 직전 반응 시점부터의 경과 시간만큼 연장 (timestamp_ns = 키 입력 시각)"""
+        reaction = self.reactions.get(folder_key)
+        if reaction is None:
+            return False
+       
+        # 최소 간격(기본 0.5초) 이후에만 연장 (너무 빠른 연장 방지, 키 입력 시각 기준)
+        trigger = timestamp_ns / 1e9 if timestamp_ns else None
+        extend_seconds = reaction.try_extend(min_interval=self.min_extend_interval, trigger=trigger)
+        if extend_seconds is None:
+            return False
+       
+        logs.playback.info("%s %s 반응 연장! (+%.1f초, 총 %.1f초)", reaction.emoji, folder_key, extend_seconds, reaction.total_duration)
+        if self.journal is not None:
+            self.journal.record('extend', folder=folder_key, seconds=round(extend_seconds, 3),
+                                total=round(reaction.total_duration, 3))
+        return True
+       
+    def play_reaction_sound(self, folder_key, sound_files, timestamp_ns=None):
+        """통합 반응 사운드 재생 함수 (스케줄러에 시작/연장 이벤트 전달, timestamp_ns = 키 입력 시각)"""
+        if sound_files:
+            self.scheduler.call_soon(self._start_reaction, folder_key, sound_files, timestamp_ns)
+        else:
+            logs.playback.warning("%s 폴더에 사운드 파일이 없어서 재생할 수 없습니다.", folder_key)
            
-            # 마지막 반응 시점 가져오기 (없으면 시작 시점)
-            last_reaction_time = self.folder_last_reaction_times.get(folder_key, self.folder_start_times[folder_key])
+    def _start_reaction(self, folder_key, sound_files, timestamp_ns=None):
+        """반응 시작 이벤트 처리 (폴더별 단일 반응 + 연장 시스템)"""
+        try:
+            # 같은 폴더에서 이미 재생 중인지 확인
+            if folder_key in self.reactions:
+                # 기존 반응 연장 시도
+                if self.extend_folder_reaction(folder_key, timestamp_ns):
+                    self.metrics.count('reaction_extended', folder_key)
+                    return  # 연장 성공하면 새로 시작하지 않음
+                # 연장할 시간이 없으면 기존 방식대로 중단하고 새로 시작
+                self.stop_folder_reaction(folder_key)
+                self.metrics.count('reaction_restarted', folder_key)
+            self.metrics.count('reaction_started', folder_key)
            
-            # 마지막 반응 시점부터의 경과 시간 계산
-            elapsed_since_last = current_time - last_reaction_time
+            # Ambient 모드에서 배경음악이 재생 중이면 일시정지 (믹싱 엔진은 일시정지 대신 볼륨만 낮춤)
+            if (self.mixing_engine is None and self.background_mode == 1 and
+                self.ambient_playing and not self.ambient_paused):
+                self.music.pause()
+                self.ambient_paused = True
            
-            if elapsed_since_last > 0.5:  # 최소 0.5초 이후에만 연장 (너무 빠른 연장 방지)
-                extend_seconds = elapsed_since_last
-                self.folder_extend_flags[folder_key] = self.folder_extend_flags.get(folder_key, 0) + extend_seconds
-               
-                # 마지막 반응 시점 업데이트
-                self.folder_last_reaction_times[folder_key] = current_time
-               
-                emoji = self.get_folder_emoji(folder_key)
-                total_time = 5.0 + self.folder_extend_flags[folder_key]
-                print(f"{emoji} {folder_key} 반응 연장! (+{extend_seconds:.1f}초, 총 {total_time:.1f}초)")
-                return True
+            emoji = self.get_folder_emoji(folder_key)
+            logs.playback.info("%s %s 반응 시작! (%g초 연속 재생)", emoji, folder_key.upper(), self.base_duration)
            
-        return False
-       
-    def play_reaction_sound(self, folder_key, sound_files):
-        """통합 반응 사운드 재생 함수 (폴더별 단일 스레드 + 연장 시스템)"""
-        try:
-            if sound_files:
-                # 같은 폴더에서 이미 재생 중인지 확인
-                if folder_key in self.folder_threads and self.folder_threads[folder_key].is_alive():
-                    # 기존 반응 연장 시도
-                    if self.extend_folder_reaction(folder_key):
-                        return  # 연장 성공하면 새 스레드 생성하지 않음
-                    else:
-                        # 연장할 시간이 없으면 기존 방식대로 중단하고 새로 시작
-                        self.stop_folder_thread(folder_key)
-               
-                # Ambient 모드에서 배경음악이 재생 중이면 일시정지
-                if self.background_mode == 1 and self.ambient_playing and not self.ambient_paused:
-                    pygame.mixer.music.pause()
-                    self.ambient_paused = True
-               
-                emoji = self.get_folder_emoji(folder_key)
-                print(f"{emoji} {folder_key.upper()} 반응 시작! (5초 연속 재생)")
-               
-                # 시작 시간 기록
-                self.folder_start_times[folder_key] = time.time()
-                self.folder_last_reaction_times[folder_key] = time.time()  # 마지막 반응 시점도 초기화
-                self.folder_extend_flags[folder_key] = 0  # 연장 시간 초기화
-               
-                # 새로운 스레드 생성 (중지 플래그 포함)
-                sound_thread = threading.Thread(
-                    target=self._play_continuous_sounds,
-                    args=(sound_files, emoji, folder_key),
-                    daemon=True
-                )
-                sound_thread.stop_flag = False  # 중지 플래그 추가
-                sound_thread.start()
-               
-                # 폴더별 스레드 딕셔너리에 저장
-                self.folder_threads[folder_key] = sound_thread
-                   
+            # 현재 재생 중인 폴더의 볼륨 설정
+            volume = self.volume_settings.get(folder_key, 0.7)
+            reaction = Reaction(folder_key, sound_files, emoji, volume, base_duration=self.base_duration)
+            reaction.trigger_ns = timestamp_ns
+            reaction.last_trigger = timestamp_ns / 1e9 if timestamp_ns else None
+            self.reactions[folder_key] = reaction
+            if self.journal is not None:
+                self.journal.record('start', folder=folder_key, duration=self.base_duration)
+            if self.montage_renderer is not None:
+                self._play_next_montage(reaction)
             else:
-                print(f"{folder_key} 폴더에 사운드 파일이 없어서 재생할 수 없습니다.")
+                self._play_next_snippet(reaction)
         except Exception as e:
-            print(f"{folder_key} 반응 사운드 재생 오류: {e}")
+            logs.playback.error("%s 반응 사운드 재생 오류: %s", folder_key, e)
            
     def play_clap_sound(self):
         """aha 폴더에서 5초 동안 연속으로 랜덤 사운드 재생 (하위 호환성)"""
@@ -339,162 +720,238 @@ class AhaReactionProgram:
         crazy_files = self.sound_folders['crazy']['files']
         self.play_reaction_sound('crazy', crazy_files)
            
-    def _play_continuous_sounds(self, sound_files, emoji, folder_key):
-        """5초 동안 랜덤 파일의 랜덤 구간을 연속 재생 (폴더별 볼륨 적용 + 연장 시스템)"""
-        import time
-        start_time = time.time()
-        current_thread = threading.current_thread()
-       
-        # 현재 재생 중인 폴더의 볼륨 설정
-        current_volume = self.volume_settings.get(folder_key, 0.7)
-       
+    def _play_next_snippet(self, reaction):
+        """랜덤 파일의 랜덤 구간 하나를 재생하고 끝나는 시점을 예약 (폴더별 볼륨 + 연장 시스템)"""
+        if reaction.stopped:
+            return
         try:
-            while True:
-                # 기본 5초 + 연장된 시간 계산
-                base_duration = 5.0
-                extended_time = self.folder_extend_flags.get(folder_key, 0)
-                total_duration = base_duration + extended_time
-               
-                elapsed = time.time() - start_time
-               
-                # 총 재생 시간 초과하면 종료
-                if elapsed >= total_duration:
-                    break
-               
-                # 중지 플래그 체크 (같은 폴더에서 새 반응이 오면 중지)
-                if hasattr(current_thread, 'stop_flag') and current_thread.stop_flag:
-                    print(f"{emoji} {folder_key} 반응 중지됨 (새로운 반응으로 인해)")
-                    break
-               
-                # 랜덤 파일 선택
-                selected_file = random.choice(sound_files)
-               
-                # 파일 길이 확인
-                file_duration = self.get_audio_duration(selected_file)
-               
-                # 랜덤 시작 지점 선택 (전체 길이의 80% 내에서)
-                max_start = max(0, file_duration - 2.0)  # 최소 2초는 재생하도록
-                random_start = random.uniform(0, max_start) if max_start > 0 else 0
-               
-                # 연장 정보 표시  
-                total_duration = base_duration + extended_time
-                remaining = total_duration - elapsed
-                extend_info = f" (총 {total_duration:.1f}초)" if extended_time > 0 else ""
-                print(f"{emoji} 재생: {os.path.basename(selected_file)} ({random_start:.1f}초부터, 남은시간: {remaining:.1f}초{extend_info})")
-               
-                # 사운드 로드 및 볼륨 설정
-                current_sound = pygame.mixer.Sound(selected_file)
-                current_sound.set_volume(current_volume)  # 폴더별 볼륨 적용
-                current_sound.play()
-               
-                # 랜덤 시간 재생 (1-3초) - 중지 플래그 체크하면서
-                play_duration = random.uniform(1.0, 3.0)
-                sleep_time = 0
-                while sleep_time < play_duration:
-                    # 연장 플래그 업데이트 확인 (실시간으로 연장 시간 반영)
-                    current_extended = self.folder_extend_flags.get(folder_key, 0)
-                    if current_extended != extended_time:
-                        extended_time = current_extended
-                        total_duration = base_duration + extended_time
-                        print(f"{emoji} 실시간 연장 반영! 총 재생시간: {total_duration:.1f}초")
-                   
-                    if hasattr(current_thread, 'stop_flag') and current_thread.stop_flag:
-                        current_sound.stop()  # 현재 사운드도 중지
-                        print(f"{emoji} {folder_key} 반응 즉시 중지")
-                        return
-                    time.sleep(0.1)
-                    sleep_time += 0.1
-               
-                # 현재 사운드 중지
-                current_sound.stop()
-               
-                # 짧은 간격 - 중지 플래그 체크
-                if hasattr(current_thread, 'stop_flag') and current_thread.stop_flag:
-                    break
-                time.sleep(0.1)
+            # 총 재생 시간(기본 5초 + 연장) 초과하면 종료
+            if reaction.remaining() <= 0:
+                self._finish_reaction(reaction)
+                return
+           
+            # 파일 선택 (가중치 + 최근 재생 반복 방지, 선택기가 아직 없으면 랜덤)
+            selector = self.clip_selectors.get(reaction.folder_key)
+            selected_file = selector.next() if selector is not None and len(selector) else None
+            if selected_file is None:
+                selected_file = random.choice(reaction.sound_files)
+           
+            # 파일 길이 확인
+            file_duration = self.get_audio_duration(selected_file)
+           
+            # 랜덤 시작 지점 선택 (전체 길이의 80% 내에서)
+            max_start = max(0, file_duration - 2.0)  # 최소 2초는 재생하도록
+            random_start = random.uniform(0, max_start) if max_start > 0 else 0
+           
+            # 랜덤 시간 재생 (1-3초)
+            play_duration = random.uniform(1.0, 3.0)
            
-            # 모든 사운드 중지
-            pygame.mixer.stop()
+            # 캐시된 버퍼에서 선택한 구간만 잘라서 재생 (파일 끝을 넘으면 길이 보정)
+            load_started = time.perf_counter_ns()
+            current_sound, random_start, play_duration = self.snippet_engine.slice(
+                selected_file, random_start, play_duration)
+            self.load_latency.record(time.perf_counter_ns() - load_started)
+            self.metadata_cache.increment(selected_file, 'plays')  # 미리 로드 우선순위용
+            if self.journal is not None:
+                self.journal.record('play', folder=reaction.folder_key, file=selected_file,
+                                    start=round(random_start, 3), length=round(play_duration, 3))
+            current_sound.set_volume(min(1.0, reaction.volume * self.file_gain(selected_file)))  # 폴더별 볼륨 × 파일별 정규화 게인
+            channel_started = time.perf_counter_ns()
+            channel = self.channel_manager.play(reaction.folder_key, current_sound)
+            played_ns = time.perf_counter_ns()
+            self.channel_latency.record(played_ns - channel_started)
+            if channel is None:
+                logs.playback.warning("%s 빈 채널이 없어 이번 구간은 건너뜀", reaction.emoji)
+            elif reaction.trigger_ns is not None:
+                self.play_latency.record(played_ns - reaction.trigger_ns)
+                reaction.trigger_ns = None
            
+            # 연장 정보 표시 (구간마다 찍히므로 DEBUG)
+            if logs.playback.debug_enabled:
+                extend_info = f" (총 {reaction.total_duration:.1f}초)" if reaction.extend_seconds > 0 else ""
+                logs.playback.debug("%s 재생: %s (%.1f초부터, 남은시간: %.1f초%s)", reaction.emoji,
+                                    os.path.basename(selected_file), random_start, reaction.remaining(), extend_info)
+           
+            # 구간이 끝나는 시점에 정지 예약 (슬립 폴링 없음)
+            reaction.next_step = self.scheduler.call_later(play_duration, self._end_snippet, reaction)
         except Exception as e:
-            print(f"연속 사운드 재생 오류: {e}")
-        finally:
-            # 완료된 스레드를 딕셔너리에서 제거
-            if folder_key in self.folder_threads:
-                del self.folder_threads[folder_key]
-            if folder_key in self.folder_start_times:
-                del self.folder_start_times[folder_key]
-            if folder_key in self.folder_last_reaction_times:
-                del self.folder_last_reaction_times[folder_key]
-            if folder_key in self.folder_extend_flags:
-                del self.folder_extend_flags[folder_key]
-               
-            # Ambient 모드에서 일시정지된 상태라면 배경음악 재개 (무음모드가 아닐 때만)
-            if (self.ambient_paused and self.ambient_playing and
-                self.background_mode == 1 and self.is_running):
-                pygame.mixer.music.unpause()
-                self.ambient_paused = False
-                print(">> 배경음악 재개")
-            else:
-                print(f"-- {folder_key} 반응 소리 완료")
+            logs.playback.error("연속 사운드 재생 오류: %s", e)
+            self._finish_reaction(reaction)
+           
+    def _play_next_montage(self, reaction):
+        """미리 만든 몽타주 하나를 재생하고, 몽타주나 반응 시간이 끝나는 시점을 예약 (연장되면 다음 몽타주를 이어서)"""
+        if reaction.stopped:
+            return
+        try:
+            now = time.time()
+            remaining = reaction.remaining(now)
+            if remaining <= 0:
+                self._finish_reaction(reaction)
+                return
+            if now < reaction.segment_end:  # 연장되어 아직 재생 중인 몽타주가 남음
+                reaction.next_step = self.scheduler.call_later(min(reaction.segment_end - now, remaining),
+                                                               self._play_next_montage, reaction)
+                return
+           
+            sound = self.montage_renderer.take(reaction.folder_key)
+            if sound is None:  # 아직 준비된 몽타주가 없으면 구간 재생으로
+                self._play_next_snippet(reaction)
+                return
+            sound.set_volume(reaction.volume)  # 파일별 정규화 게인은 몽타주를 만들 때 적용됨
+            channel_started = time.perf_counter_ns()
+            channel = self.channel_manager.play(reaction.folder_key, sound)
+            played_ns = time.perf_counter_ns()
+            self.channel_latency.record(played_ns - channel_started)
+            if channel is None:
+                logs.playback.warning("%s 빈 채널이 없어 몽타주를 재생하지 못함", reaction.emoji)
+            elif reaction.trigger_ns is not None:
+                self.play_latency.record(played_ns - reaction.trigger_ns)
+                reaction.trigger_ns = None
+            length = sound.get_length()
+            reaction.segment_end = now + length
+            if self.journal is not None:
+                self.journal.record('play', folder=reaction.folder_key, file=None, montage=True, length=round(length, 3))
+            if logs.playback.debug_enabled:
+                logs.playback.debug("%s 몽타주 재생: %.1f초 (남은시간: %.1f초)", reaction.emoji, length, remaining)
+            reaction.next_step = self.scheduler.call_later(min(length, remaining), self._play_next_montage, reaction)
+        except Exception as e:
+            logs.playback.error("몽타주 재생 오류: %s", e)
+            self._finish_reaction(reaction)
+           
+    def _end_snippet(self, reaction):
+        """현재 구간 정지 후 짧은 간격 뒤 다음 구간 예약"""
+        if reaction.stopped:
+            return
+        self.channel_manager.stop_folder(reaction.folder_key)
+        reaction.next_step = self.scheduler.call_later(0.1, self._play_next_snippet, reaction)
+       
+    def _finish_reaction(self, reaction):
+        """반응 재생 완료 처리"""
+        reaction.stopped = True
+        reaction.cancel_next_step()
+       
+        # 이 폴더가 재생 중인 채널만 중지 (다른 폴더 소리는 계속)
+        self.channel_manager.stop_folder(reaction.folder_key)
+        if self.journal is not None:
+            self.journal.record('stop', folder=reaction.folder_key, reason='done', played=round(reaction.elapsed(), 3))
+       
+        # 완료된 반응을 목록에서 제거 (그 사이 새 반응으로 바뀌었으면 유지)
+        if self.reactions.get(reaction.folder_key) is reaction:
+            del self.reactions[reaction.folder_key]
+           
+        # Ambient 모드에서 일시정지된 상태라면 배경음악 재개 (무음모드가 아닐 때만, 다른 폴더 반응이 모두 끝난 뒤)
+        if (self.ambient_paused and self.ambient_playing and not self.reactions and
+            self.background_mode == 1 and self.is_running):
+            self.music.unpause()
+            self.ambient_paused = False
+            self._schedule_ambient_check()
+            logs.ambient.info(">> 배경음악 재개")
+        else:
+            logs.playback.info("-- %s 반응 소리 완료", reaction.folder_key)
    
     def on_key_press(self, key):
-        """키가 눌렸을 때 호출되는 함수"""
+        """키가 눌렸을 때 호출되는 함수 (pynput 스레드 - 큐에 넣기만 하고 바로 반환)"""
+        started = time.perf_counter_ns()
+        self.key_pipeline.push(started, key)
+        is_esc = key == self.key_codes.esc
+        self.key_pipeline.hook_latency.record(time.perf_counter_ns() - started)
+        if is_esc:
+            return False  # 리스너 종료
+           
+    def _feed_typing_dynamics(self, timestamp_ns):
+        """타자 속도 통계 갱신, 속도 규칙에 걸린 폴더 반응 시작 (키 입력 처리 스레드)"""
+        pause_count = self.typing_dynamics.pause_count
+        for folder_key in self.typing_dynamics.feed(timestamp_ns / 1e9):
+            folder_info = self.sound_folders.get(folder_key)
+            if not (folder_info and folder_info['files']):
+                continue
+            accepted = self.trigger_coalescer.offer(folder_key, timestamp_ns / 1e9)
+            if self.journal is not None:
+                self.journal.record('match', timestamp_ns, folder=folder_key, pattern=None, rule=True, ok=accepted)
+            if accepted:
+                typing = self.typing_dynamics.stats(timestamp_ns / 1e9)
+                logs.matcher.info("%s %s! 타자 속도 반응 (%.0f타/분, 순간 %.1f타/초)", self.get_folder_emoji(folder_key),
+                                  folder_key.upper(), typing['keys_per_minute'], typing['burst_keys_per_second'])
+                self.play_reaction_sound(folder_key, folder_info['files'], timestamp_ns)
+        if self.work_adaptive and self.typing_dynamics.pause_count != pause_count:
+            # 쉬는 시간 통계가 바뀌면 알림 시각이 앞당겨질 수 있으므로 다시 예약
+            self.scheduler.call_soon(self._reschedule_work_check)
+           
+    def _handle_key(self, timestamp_ns, key):
+        """키 입력 처리 (소비자 스레드 - 패턴 매칭 및 반응 재생)"""
         try:
+            if self.trace_recorder is not None:
+                self.trace_recorder.record(timestamp_ns, key)
+           
             # 타이핑 시간 업데이트 (일 재촉 타이머용)
             self.last_typing_time = time.time()
+            self._feed_typing_dynamics(timestamp_ns)
            
             # 일반 문자 키인 경우
             if hasattr(key, 'char') and key.char:
-                print(f"🔍 키 입력: '{key.char}'")  # 디버깅
                 self.recent_keys.append(key.char)
+                if logs.keys.debug_enabled:  # 디버깅 (꺼져 있으면 join도 하지 않음)
+                    logs.keys.debug("🔍 키 입력: '%s'", key.char)
+                    logs.keys.debug("🔍 최근 입력: '%s'", ''.join(self.recent_keys))
                
-                # 각 폴더의 패턴들을 확인 (work 폴더는 제외)
-                recent_text = ''.join(self.recent_keys)
-                print(f"🔍 최근 입력: '{recent_text}'")  # 디버깅
-               
-                for folder_key, folder_info in self.sound_folders.items():
+                # 컴파일된 매처로 현재 위치에서 끝나는 패턴 확인 (우선순위 순서)
+                match_started = time.perf_counter_ns()
+                matches = self.pattern_matcher.feed(key.char)
+                self.match_latency.record(time.perf_counter_ns() - match_started)
+                for folder_key, pattern in matches:
                     if folder_key == 'work':  # work 폴더는 타이머로만 작동
                         continue
-                       
-                    for pattern in folder_info['patterns']:
-                        if recent_text.endswith(pattern):
-                            if folder_info['files']:  # 파일이 있는 경우만
-                                print(f"🔍 '{pattern}' 패턴 감지! ({folder_key} 폴더)")
-                                self.play_reaction_sound(folder_key, folder_info['files'])
-                                emoji = self.get_folder_emoji(folder_key)
-                                print(f"{emoji} {folder_key.upper()}! 반응 사운드 재생!")
-                                return  # 하나 발견하면 더 이상 확인하지 않음
+                    folder_info = self.sound_folders.get(folder_key)  # 설정 교체 직후엔 없을 수 있음
+                    if folder_info and folder_info['files']:  # 파일이 있는 경우만
+                        logs.matcher.debug("🔍 '%s' 패턴 감지! (%s 폴더)", pattern, folder_key)
+                        accepted = self.trigger_coalescer.offer(folder_key, timestamp_ns / 1e9)
+                        if self.journal is not None:
+                            self.journal.record('match', timestamp_ns, folder=folder_key, pattern=pattern, ok=accepted)
+                        if not accepted:
+                            return  # 진행 중인 반응에 합쳐졌거나 속도 제한 (스케줄러 작업 없음)
+                        self.play_reaction_sound(folder_key, folder_info['files'], timestamp_ns)
+                        logs.matcher.info("%s %s! 반응 사운드 재생!", self.get_folder_emoji(folder_key), folder_key.upper())
+                        return  # 하나 발견하면 더 이상 확인하지 않음
+                    if folder_info and not self.library_ready.is_set():
+                        logs.matcher.debug("-- '%s' 패턴 감지, %s 폴더는 아직 스캔 중", pattern, folder_key)
                    
             # 특수 키 처리
-            elif key == keyboard.Key.f1:
-                print("🔍 F1 키 감지!")
+            elif key == self.key_codes.f1:
+                logs.keys.debug("🔍 F1 키 감지!")
                 self.toggle_background_mode()
-            elif key == keyboard.Key.esc:
-                print("프로그램을 종료합니다...")
+            elif key == self.key_codes.f2:
+                logs.keys.debug("🔍 F2 키 감지!")
+                self.reload_config()
+            elif key == self.key_codes.f3:
+                logs.keys.debug("🔍 F3 키 감지!")
+                self.scheduler.call_soon(self.dump_stats)  # 통계는 스케줄러 스레드에서 (반응/카운터 변경과 겹치지 않게)
+            elif key == self.key_codes.esc:
+                logs.app.info("프로그램을 종료합니다...")
                 self.is_running = False
                 self.stop_work_timer()  # 타이머도 정지
-                self.stop_all_folder_threads()  # 모든 폴더 스레드 정지
-                return False
+                self.stop_all_folder_reactions()  # 모든 폴더 반응 정지
                
         except AttributeError:
             # 특수 키의 경우 무시
-            print(f"🔍 특수 키: {key}")
+            logs.keys.debug("🔍 특수 키: %s", key)
             pass
            
     def toggle_background_mode(self):
         """배경 모드 전환 (무음 ↔ ambient music)"""
+        self.scheduler.call_soon(self._toggle_background_mode)
+       
+    def _toggle_background_mode(self):
         self.background_mode = 1 - self.background_mode
        
         if self.background_mode == 0:
-            print("-- 무음 모드로 전환")
+            logs.ambient.info("-- 무음 모드로 전환")
             self.stop_ambient_music()
             # 혹시 일시정지 상태였다면 그것도 해제
             if self.ambient_paused:
                 self.ambient_paused = False
-                print("-- 일시정지 상태도 해제")
+                logs.ambient.info("-- 일시정지 상태도 해제")
         else:
-            print(">> Ambient Music 모드로 전환")
+            logs.ambient.info(">> Ambient Music 모드로 전환")
             self.start_ambient_music()
            
     def start_ambient_music(self):
@@ -502,46 +959,97 @@ class AhaReactionProgram:
         if self.ambient_files and not self.ambient_playing:
             self.ambient_playing = True
             # ambient 볼륨 적용
-            pygame.mixer.music.set_volume(self.volume_settings['ambient'])
-            self.ambient_thread = threading.Thread(target=self._play_ambient_loop, daemon=True)
-            self.ambient_thread.start()
+            self.music.set_volume(self.volume_settings['ambient'])
+            self._play_next_ambient()
            
     def stop_ambient_music(self):
         """ambient music 정지"""
         self.ambient_playing = False
         self.ambient_paused = False  # 일시정지 상태도 초기화
-        pygame.mixer.stop()  # Sound 객체들 정지
-        pygame.mixer.music.stop()  # Music 스트림 정지
-        print("-- 배경음악 완전 정지")
+        if self.ambient_call is not None:
+            self.ambient_call.cancel()
+            self.ambient_call = None
+        self.ambient_queued = None
+        self.ambient_prefetch_token += 1
+        self.music.stop()  # Music 스트림 정지 (대기열도 비워짐, 반응 사운드 채널은 유지)
+        logs.ambient.info("-- 배경음악 완전 정지")
        
-    def _play_ambient_loop(self):
-        """ambient music을 랜덤으로 반복 재생하는 내부 함수"""
+    def _play_next_ambient(self):
+        """셔플 순서의 다음 곡을 재생하고, 그 다음 곡을 미리 읽어 대기열에 넣고, 곡이 끝날 시점에 확인 예약"""
+        if not (self.ambient_playing and self.is_running):
+            return
+        selected_file = self.ambient_playlist.next()
+        if selected_file is None:
+            return
         try:
-            while self.ambient_playing and self.is_running:
-                if self.ambient_files and not self.ambient_paused:
-                    # 랜덤으로 음악 파일 선택
-                    selected_file = random.choice(self.ambient_files)
-                    ambient_volume = int(self.volume_settings['ambient']*100)
-                    print(f">> 배경음악: {os.path.basename(selected_file)} (볼륨: {ambient_volume}%)")
-                   
-                    pygame.mixer.music.load(selected_file)
-                    pygame.mixer.music.play()
-                   
-                    # 음악이 끝날 때까지 대기 (일시정지 상태도 고려)
-                    while pygame.mixer.music.get_busy() and self.ambient_playing:
-                        time.sleep(0.1)
-                        # 일시정지 중이면 계속 대기
-                        while self.ambient_paused and self.ambient_playing:
-                            time.sleep(0.1)
-                   
-                    # 잠깐 대기 후 다음 곡 재생 (일시정지 중이 아닐 때만)
-                    if self.ambient_playing and not self.ambient_paused:
-                        time.sleep(0.5)
-                else:
-                    time.sleep(0.1)
-                       
+            ambient_volume = int(self.volume_settings['ambient']*100)
+            logs.ambient.info(">> 배경음악: %s (볼륨: %d%%)", os.path.basename(selected_file), ambient_volume)
+           
+            self.ambient_queued = None
+            self.ambient_prefetch_token += 1
+            self.music.load(selected_file)
+            self.music.play()
+            self.ambient_track_duration = self.get_audio_duration(selected_file)
+            self._prefetch_next_ambient()
+            self._schedule_ambient_check()
         except Exception as e:
-            print(f"Ambient music 재생 오류: {e}")
+            logs.ambient.error("Ambient music 재생 오류: %s", e)
+           
+    def _prefetch_next_ambient(self):
+        """다음 곡을 백그라운드에서 미리 읽기 (디스크 → 페이지 캐시, 청크 단위)"""
+        next_file = self.ambient_playlist.next()
+        if next_file is None:
+            return
+        token = self.ambient_prefetch_token
+        threading.Thread(target=self._prefetch_ambient, args=(next_file, token),
+                         name='aha-prefetch', daemon=True).start()
+       
+    def _prefetch_ambient(self, file_path, token):
+        """미리 읽기 스레드 - 끝나면 스케줄러 스레드에서 대기열에 추가"""
+        try:
+            prefetch_file(file_path)
+        except OSError as e:
+            logs.ambient.error("배경음악 미리 읽기 오류 (%s): %s", os.path.basename(file_path), e)
+            return
+        duration = self.get_audio_duration(file_path)
+        self.scheduler.call_soon(self._queue_ambient, file_path, duration, token)
+       
+    def _queue_ambient(self, file_path, duration, token):
+        """현재 곡이 끝나면 바로 이어지도록 music.queue() (그 사이 정지/곡 변경됐으면 무시)"""
+        if token != self.ambient_prefetch_token or not self.ambient_playing:
+            return
+        try:
+            self.music.queue(file_path)
+            self.ambient_queued = (file_path, duration)
+            logs.ambient.debug("-- 다음 배경음악 대기: %s", os.path.basename(file_path))
+        except Exception as e:
+            logs.ambient.error("배경음악 대기열 추가 오류: %s", e)
+           
+    def _schedule_ambient_check(self):
+        """현재 곡의 남은 재생 시간 뒤에 확인 예약 (일시정지 시간은 get_pos에 포함되지 않음)"""
+        if self.ambient_call is not None:
+            self.ambient_call.cancel()
+        played = max(0, self.music.get_pos()) / 1000.0
+        remaining = max(0.1, self.ambient_track_duration - played)
+        self.ambient_call = self.scheduler.call_later(remaining, self._check_ambient)
+       
+    def _check_ambient(self):
+        """곡이 끝날 시점 확인: 대기열 곡으로 넘어갔으면 그 다음 곡을 미리 읽고, 재생이 멈췄으면 바로 다음 곡"""
+        self.ambient_call = None
+        if not self.ambient_playing or self.ambient_paused:
+            return  # 일시정지 해제할 때 다시 예약됨
+        if self.music.get_busy():
+            # get_pos는 대기열 곡으로 넘어가면 0부터 다시 셈 (끝 근처면 아직 이전 곡)
+            played = max(0, self.music.get_pos()) / 1000.0
+            if self.ambient_queued is not None and played < self.ambient_track_duration - 0.5:
+                file_path, self.ambient_track_duration = self.ambient_queued
+                self.ambient_queued = None
+                logs.ambient.info(">> 배경음악: %s (이어서 재생)", os.path.basename(file_path))
+                self._prefetch_next_ambient()
+            self._schedule_ambient_check()
+            return
+        # 대기열이 비어 있었으면 (미리 읽기 실패 등) 기다리지 않고 다음 곡 재생
+        self._play_next_ambient()
            
     def show_instructions(self):
         """사용법 안내"""
@@ -560,10 +1068,12 @@ class AhaReactionProgram:
             print(f"   {emoji} {folder_key}/ 폴더: {patterns_str}")
         print()
         print("⏰ 특별 기능:")
-        print("   ⏰ work/ 폴더: 3분간 타이핑이 없으면 자동으로 일 재촉 사운드 재생!")
-        print("   (1분마다 반복 알림)")
+        print(f"   ⏰ work/ 폴더: {self.work_reminder_interval / 60:g}분간 타이핑이 없으면 자동으로 일 재촉 사운드 재생!")
+        print(f"   ({self.work_repeat_interval / 60:g}분마다 반복 알림)")
         print()
         print("  >> F1: 무음모드 <-> Ambient Music 모드 전환")
+        print(f"  >> F2: 설정 파일({self.config_path}) 다시 불러오기")
+        print(f"  >> F3: 통계 저장 ({self.stats_settings['dump_path']})")
         print("  >> ESC: 프로그램 종료")
         print()
         print("💡 한글 입력 시 영어 키보드 패턴으로 자동 인식합니다!")
@@ -575,12 +1085,12 @@ class AhaReactionProgram:
                 print(f"  >> {folder_key} 폴더: {int(volume*100)}%")
             elif folder_key == 'ambient':
                 print(f"  >> {folder_key} 폴더: {int(volume*100)}%")
-        print("  (코드에서 volume_settings 딕셔너리로 조절 가능)")
+        print(f"  ({self.config_path}의 volume 값으로 조절 가능, 저장하면 자동 반영)")
         print()
         print("연속 재생 방식:")
         print("  >> 5초 동안 여러 개의 사운드가 연속으로 랜덤 재생됩니다")
         print("  >> 같은 폴더: 새로운 패턴 감지시 기존 반응 시간을 연장 (최대 5초)")
-        print("  >> 다른 폴더: 여러 감정을 동시에 표현 가능 (멀티 스레드)")
+        print("  >> 다른 폴더: 여러 감정을 동시에 표현 가능 (동시 재생)")
         print("  >> Ambient 모드에서는 반응 소리 동안 배경음악이 일시정지됩니다")
         print()
         print("🎭 감정 표현 예시:")
@@ -608,27 +1118,230 @@ class AhaReactionProgram:
         print("프로그램이 실행 중입니다... 타이핑을 시작하세요!")
         print("=" * 60)
        
+    def start_stats_server(self):
+        """localhost HTTP 통계 엔드포인트 시작 (포트를 못 열면 경고만)"""
+        self.stats_server = StatsServer(self.metrics, port=self.stats_settings['port'], render_json=self.stats_json)
+        try:
+            self.stats_server.start()
+        except OSError as e:
+            logs.app.warning("-- 통계 서버를 시작할 수 없습니다 (포트 %d): %s", self.stats_settings['port'], e)
+            self.stats_server = None
+           
+    def create_journal(self):
+        """이벤트 저널 열기 (파일을 열 수 없으면 경고만)"""
+        settings = self.config['journal']
+        journal = EventJournal(settings['path'], max_bytes=int(settings['max_mb'] * 1024 * 1024),
+                               backups=settings['backups'], flush_interval=settings['flush_interval'])
+        try:
+            journal.start()
+        except OSError as e:
+            logs.app.warning("-- 이벤트 저널을 열 수 없습니다 (%s): %s", settings['path'], e)
+            return None
+        return journal
+       
+    def start_daemon_server(self):
+        """데몬 소켓 열기 (이미 실행 중인 데몬이 있거나 열 수 없으면 경고만)"""
+        self.daemon_server = DaemonServer(self.config['daemon']['socket'], self.handle_daemon_events)
+        try:
+            self.daemon_server.start()
+        except OSError as e:
+            logs.app.warning("-- 데몬 소켓을 열 수 없습니다: %s", e)
+            self.daemon_server = None
+           
+    def handle_daemon_events(self, events):
+        """클라이언트 이벤트 묶음 처리 (소켓 연결 스레드 - 키 입력 큐/스케줄러에 넣기만 하고 바로 응답)"""
+        response = {'ok': 0, 'errors': []}
+        handled = Counter()
+        for event in events:
+            try:
+                op = event.get('op') if isinstance(event, dict) else None
+                self._handle_daemon_event(op, event, response)
+                handled[op] += 1
+                response['ok'] += 1
+            except (ValueError, TypeError, TimeoutError) as e:
+                if len(response['errors']) < MAX_ERRORS:
+                    response['errors'].append(str(e))
+        with self.daemon_lock:
+            self.daemon_events.update(handled)
+        return response
+       
+    def _handle_daemon_event(self, op, event, response):
+        if op == 'key':
+            name = event['key'] if isinstance(event.get('key'), str) else ''
+            if name == 'esc':
+                raise ValueError("esc 키는 보낼 수 없습니다 (종료는 quit)")
+            key = CharKey(name) if len(name) == 1 else getattr(self.key_codes, name, None) if name else None
+            if key is None:
+                raise ValueError(f"알 수 없는 키: {name!r}")
+            if not self.key_pipeline.push(time.perf_counter_ns(), key):
+                raise ValueError("키 입력 큐가 가득 찼습니다")
+        elif op in ('trigger', 'extend', 'stop'):
+            folder_key = event.get('folder')
+            if op == 'stop' and folder_key is None:
+                self.stop_all_folder_reactions()
+                return
+            folder_info = self.sound_folders.get(folder_key)
+            if folder_info is None:
+                raise ValueError(f"없는 폴더: {folder_key!r}")
+            if op == 'trigger':
+                if not folder_info['files']:
+                    raise ValueError(f"{folder_key} 폴더에 사운드 파일이 없습니다")
+                # 키보드 매칭과 같은 합치기/속도 제한 (한 요청에 같은 폴더 트리거가 여러 개여도 재시작 없이)
+                timestamp_ns = time.perf_counter_ns()
+                result = self.trigger_coalescer.decide(folder_key, timestamp_ns / 1e9)
+                triggers = response.setdefault('triggers', {})
+                triggers[result] = triggers.get(result, 0) + 1
+                if self.journal is not None:
+                    self.journal.record('match', timestamp_ns, folder=folder_key, pattern=None, daemon=True,
+                                        ok=result == TRIGGER_ACCEPTED)
+                if result == TRIGGER_ACCEPTED:
+                    self.play_reaction_sound(folder_key, folder_info['files'], timestamp_ns)
+            elif op == 'extend':
+                self.scheduler.call_soon(self._extend_reaction, folder_key)
+            else:
+                self.scheduler.call_soon(self.stop_folder_reaction, folder_key)
+        elif op == 'stats':
+            response['stats'] = json.loads(self.stats_json())
+        elif op == 'quit':
+            logs.app.info("프로그램을 종료합니다... (데몬 클라이언트 요청)")
+            self.is_running = False
+        elif op != 'ping':
+            raise ValueError(f"알 수 없는 이벤트: {op!r}")
+           
+    def _extend_reaction(self, folder_key):
+        """진행 중인 반응만 연장 (스케줄러 스레드, 반응이 없으면 무시)"""
+        if self.extend_folder_reaction(folder_key):
+            self.metrics.count('reaction_extended', folder_key)
+           
+    def stats_json(self):
+        """단계별 지연/카운터 + 채널/사운드 캐시 상태 (JSON 문자열)
+
+        데몬/HTTP 스레드에서 불려도 반응 목록과 카운터는 스케줄러 스레드에서 읽음 (순회 중 변경 방지).
+        """
+        return self.scheduler.call_and_wait(self._stats_json)
+       
+    def _stats_json(self):
+        return self.metrics.to_json(
+            channels=self.channel_manager.stats(),
+            sound_pool=self.sound_pool.stats(),
+            transcode=self.transcode_cache.stats() if self.transcode_cache is not None else None,
+            soundbank=self.sound_banks.stats() if self.sound_banks is not None else None,
+            journal=self.journal.stats() if self.journal is not None else None,
+            montage=self.montage_renderer.stats() if self.montage_renderer is not None else None,
+            typing=self.typing_dynamics.stats(time.perf_counter()),
+            dropped_keys=self.key_pipeline.dropped,
+            active_reactions=sorted(self.reactions),
+        )
+       
+    def dump_stats(self):
+        """F3: 통계를 JSON 파일로 저장하고 요약 출력"""
+        path = self.stats_settings['dump_path']
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self.stats_json())
+            os.replace(tmp_path, path)
+            logs.app.info(">> 통계 저장: %s", path)
+        except OSError as e:
+            logs.app.error("통계 저장 오류 (%s): %s", path, e)
+        self.print_runtime_stats()
+       
+    def print_runtime_stats(self):
+        """실행 통계 출력 (단계별 지연, 반응 카운터, 채널, 사운드 캐시)"""
+        for histogram in list(self.metrics.histograms.values()):
+            logs.app.info("-- %s", histogram.format())
+        reactions = self.metrics.counter('reaction_started')
+        if reactions:
+            logs.app.info("-- 반응: 시작 %d / 연장 %d / 재시작 %d, 일 재촉 %d회", sum(reactions.values()),
+                          sum(self.metrics.counter('reaction_extended').values()),
+                          sum(self.metrics.counter('reaction_restarted').values()),
+                          sum(self.metrics.counter('work_reminder').values()))
+        coalesced, limited = self.trigger_coalescer.coalesced, self.trigger_coalescer.limited
+        if coalesced or limited:
+            logs.app.info("-- 트리거: 합침 %d / 속도 제한 %d (통과 %d)", sum(coalesced.values()), sum(limited.values()),
+                          sum(self.trigger_coalescer.accepted.values()))
+        typing = self.typing_dynamics.stats(time.perf_counter())
+        if typing['keys']:
+            logs.app.info("-- 타이핑: %d타 (최근 %.0f타/분), 쉬는 시간 %d회 (평균 %.1f초), 속도 반응 %d회", typing['keys'],
+                          typing['keys_per_minute'], typing['pauses'], typing['pause_mean'], sum(typing['fired'].values()))
+        if self.key_pipeline.dropped:
+            logs.app.warning("-- 큐가 가득 차서 버린 키 입력: %d회", self.key_pipeline.dropped)
+        channel_stats = self.channel_manager.stats()
+        logs.app.info("-- 채널: 드롭 %d / 스틸 %d (재생 %d)", sum(channel_stats['dropped'].values()),
+                      sum(channel_stats['stolen'].values()), sum(channel_stats['plays'].values()))
+        if self.mixing_engine is not None:
+            logs.app.info("-- 믹싱: 블록 %d개 (평균 %.1fµs/블록), 출력 끊김 %d회", channel_stats['blocks'],
+                          channel_stats['render_us_per_block'], channel_stats['underruns'])
+        if self.transcode_cache is not None:
+            logs.app.info("-- PCM 변환 캐시: 적중 %d / 미스 %d, 변환 %d개 (실패 %d개)", self.transcode_cache.hits,
+                          self.transcode_cache.misses, self.transcode_cache.done, self.transcode_cache.failed)
+        if self.montage_renderer is not None:
+            montage_stats = self.montage_renderer.stats()
+            logs.app.info("-- 몽타주: 적중 %d / 미준비 %d, 렌더링 %d개 (평균 %.1fms)", sum(montage_stats['hits'].values()),
+                          sum(montage_stats['misses'].values()), montage_stats['rendered'],
+                          montage_stats['render_ms_per_montage'])
+        pool_stats = self.sound_pool.stats()
+        logs.app.info("-- 사운드 캐시: 적중 %d / 미스 %d / 제거 %d (%.1fMB)", pool_stats['hits'], pool_stats['misses'],
+                      pool_stats['evictions'], pool_stats['used_bytes'] / (1024 * 1024))
+       
     def run(self):
         """프로그램 실행"""
+        # 키 입력 소스 준비 (키보드면 여기서 pynput import, trace면 파일 읽기)
+        self.input_source = make_input_source(self.config['input'], self.on_key_press)
+        self.key_codes = self.input_source.key_codes
         self.show_instructions()
        
-        # 키보드 리스너 시작
-        with keyboard.Listener(on_press=self.on_key_press) as listener:
-            try:
-                while self.is_running:
-                    time.sleep(0.1)
-            except KeyboardInterrupt:
-                print("\n프로그램이 중단되었습니다.")
-            finally:
-                self.stop_ambient_music()
-                self.stop_work_timer()  # 일 재촉 타이머도 정지
-                self.stop_all_folder_threads()  # 모든 폴더 스레드 정지
-                listener.stop()
+        # 키 입력 시작 (빠른 시작 모드면 리스너가 켜진 뒤 폴더 스캔)
+        self.input_source.start()
+        if self.config['daemon']['enabled']:
+            self.start_daemon_server()
+        if not self.library_ready.is_set():
+            threading.Thread(target=self.load_library, name='aha-startup', daemon=True).start()
+        try:
+            while self.is_running:
+                time.sleep(0.1)
+        except KeyboardInterrupt:
+            logs.app.info("\n프로그램이 중단되었습니다.")
+        finally:
+            # 키 처리와 스케줄러를 먼저 멈춘 뒤 남은 재생을 이 스레드에서 정리
+            if self.daemon_server is not None:
+                self.daemon_server.stop()
+            self.key_pipeline.stop()
+            if self.config_call is not None:
+                self.config_call.cancel()
+            if self.library_watcher is not None:
+                self.library_watcher.stop()
+            self.loudness_analyzer.stop()
+            if self.transcode_cache is not None:
+                self.transcode_cache.stop()
+            if self.montage_renderer is not None:
+                self.montage_renderer.stop()
+            self.scheduler.stop()
+            if self.mixing_engine is not None:
+                self.mixing_engine.stop()
+            if self.stats_server is not None:
+                self.stats_server.stop()
+            self.stop_ambient_music()
+            self.stop_work_timer()  # 일 재촉 타이머도 정지
+            self._stop_all_folder_reactions()  # 모든 폴더 반응 정지
+            self.metadata_cache.save()  # 실행 중 새로 측정한 길이/재생 횟수 저장
+            if self.trace_recorder is not None:
+                self.trace_recorder.close()
+            self.print_runtime_stats()
+            if self.journal is not None:
+                self.journal.stop()  # 남은 기록까지 쓰고 닫기
+            self.input_source.stop()
+            logs.shutdown()  # 남은 로그 출력
 
 if __name__ == "__main__":
     try:
         program = AhaReactionProgram()
         program.run()
+    except ConfigError as e:
+        print(f"설정 파일 오류: {e}")
     except Exception as e:
         print(f"프로그램 실행 오류: {e}")
         print("pygame과 pynput 라이브러리가 설치되어 있는지 확인해주세요:")